@@ -12,7 +12,12 @@ from app.db.base_class import Base
 from app.models.user import User
 from app.models.tiktok_profile import TikTokProfile
 from app.models.tiktok_video import TikTokVideo
-from app.models.analytics import ProfileAnalytics, CreatorRecommendation
+from app.models.analytics import ProfileAnalytics, CreatorRecommendation, RecommendationTally
+from app.models.scrape_job import ScrapeJob
+from app.models.niche_insight import NicheInsight
+from app.models.video_hashtag import VideoHashtag
+from app.models.profile_vector import ProfileVector
+from app.models.follower_interaction import TikTokFollower, FollowerInteraction
 from app.core.config import settings
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,45 @@
+"""Backfill video posted_at from TikTok video ids
+
+Revision ID: 07a9c1e3f5b8
+Revises: f6b8d0e2a4c7
+Create Date: 2026-10-21 09:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '07a9c1e3f5b8'
+down_revision = 'f6b8d0e2a4c7'
+branch_labels = None
+depends_on = None
+
+# Scrapes never stored posted_at; the upper 32 bits of a TikTok video id are its upload
+# time in Unix seconds. Ids decoding to before TikTok's launch (2016-09-01) or into the
+# future (imported or synthetic ids) are left alone, as app.services.tiktok_scraper does.
+POSTGRES_SECONDS = "CASE WHEN video_id ~ '^[0-9]{1,19}$' THEN floor(video_id::numeric / 4294967296) END"
+POSTGRES_UPGRADE = (
+    f"UPDATE tiktok_videos SET posted_at = to_timestamp({POSTGRES_SECONDS}) "
+    f"WHERE posted_at IS NULL AND {POSTGRES_SECONDS} BETWEEN 1472688000 AND extract(epoch FROM now()) + 86400"
+)
+
+SQLITE_SECONDS = (
+    "CASE WHEN video_id <> '' AND video_id NOT GLOB '*[^0-9]*' AND length(video_id) <= 19 "
+    "THEN CAST(video_id AS INTEGER) >> 32 END"
+)
+SQLITE_UPGRADE = (
+    f"UPDATE tiktok_videos SET posted_at = datetime({SQLITE_SECONDS}, 'unixepoch') "
+    f"WHERE posted_at IS NULL AND {SQLITE_SECONDS} BETWEEN 1472688000 AND CAST(strftime('%s', 'now') AS INTEGER) + 86400"
+)
+
+
+def upgrade() -> None:
+    # Plain SQL, so it also runs from an offline --sql script
+    statement = {"postgresql": POSTGRES_UPGRADE, "sqlite": SQLITE_UPGRADE}.get(op.get_context().dialect.name)
+    if statement:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    # Backfilled and scraped timestamps are indistinguishable, and both are correct
+    pass
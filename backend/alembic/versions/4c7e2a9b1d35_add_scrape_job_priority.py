@@ -0,0 +1,26 @@
+"""Add priority to scrape_jobs
+
+Revision ID: 4c7e2a9b1d35
+Revises: 3a1f52c7d9e0
+Create Date: 2026-10-19 11:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c7e2a9b1d35'
+down_revision = '3a1f52c7d9e0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('scrape_jobs', sa.Column('priority', sa.String(), nullable=False, server_default='refresh'))
+    op.create_index(op.f('ix_scrape_jobs_priority'), 'scrape_jobs', ['priority'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_scrape_jobs_priority'), table_name='scrape_jobs')
+    op.drop_column('scrape_jobs', 'priority')
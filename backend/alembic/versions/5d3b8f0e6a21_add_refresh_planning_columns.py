@@ -0,0 +1,28 @@
+"""Add refresh planning columns
+
+Revision ID: 5d3b8f0e6a21
+Revises: 4c7e2a9b1d35
+Create Date: 2026-10-19 13:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d3b8f0e6a21'
+down_revision = '4c7e2a9b1d35'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('last_seen_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('tiktok_profiles', sa.Column('follower_velocity', sa.Float(), nullable=True))
+    op.create_index(op.f('ix_tiktok_profiles_last_scraped_at'), 'tiktok_profiles', ['last_scraped_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_tiktok_profiles_last_scraped_at'), table_name='tiktok_profiles')
+    op.drop_column('tiktok_profiles', 'follower_velocity')
+    op.drop_column('users', 'last_seen_at')
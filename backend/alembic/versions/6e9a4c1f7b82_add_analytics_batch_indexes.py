@@ -0,0 +1,26 @@
+"""Add indexes for batch analytics
+
+Revision ID: 6e9a4c1f7b82
+Revises: 5d3b8f0e6a21
+Create Date: 2026-10-19 15:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6e9a4c1f7b82'
+down_revision = '5d3b8f0e6a21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_tiktok_videos_profile_id'), 'tiktok_videos', ['profile_id'], unique=False)
+    op.create_index('ix_profile_analytics_profile_id_date', 'profile_analytics', ['profile_id', 'date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_profile_analytics_profile_id_date', table_name='profile_analytics')
+    op.drop_index(op.f('ix_tiktok_videos_profile_id'), table_name='tiktok_videos')
@@ -0,0 +1,36 @@
+"""Add niche insights
+
+Revision ID: 7f2d5b8c3e14
+Revises: 6e9a4c1f7b82
+Create Date: 2026-10-19 16:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7f2d5b8c3e14'
+down_revision = '6e9a4c1f7b82'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('niche_insights',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('niche', sa.String(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('best_practices', sa.Text(), nullable=False),
+    sa.Column('analyzed_creators', sa.Integer(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_niche_insights_id'), 'niche_insights', ['id'], unique=False)
+    op.create_index(op.f('ix_niche_insights_niche'), 'niche_insights', ['niche'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_niche_insights_niche'), table_name='niche_insights')
+    op.drop_index(op.f('ix_niche_insights_id'), table_name='niche_insights')
+    op.drop_table('niche_insights')
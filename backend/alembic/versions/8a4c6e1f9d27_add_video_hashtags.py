@@ -0,0 +1,150 @@
+"""Add video hashtag index and user niche
+
+Revision ID: 8a4c6e1f9d27
+Revises: 7f2d5b8c3e14
+Create Date: 2026-10-19 18:10:00.000000
+
+"""
+import json
+import re
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a4c6e1f9d27'
+down_revision = '7f2d5b8c3e14'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+# Frozen copies of app.core.hashtags and app.core.niches as of this revision,
+# so replaying the migration later backfills what the app did at the time
+HASHTAG = "hashtag"
+MENTION = "mention"
+_HASHTAGS = re.compile(r"(?<![\w#@])#(\w+)")
+_MENTIONS = re.compile(r"(?<![\w#@.])@([\w.]+)")
+MAX_TAG_LENGTH = 100
+
+NICHE_KEYWORDS = {
+    "fashion": ("fashion", "style", "outfit", "ootd", "clothes", "streetwear", "wardrobe", "thrift"),
+    "beauty": ("beauty", "makeup", "skincare", "glow", "hair", "nails", "cosmetics"),
+    "fitness": ("fitness", "gym", "workout", "training", "wellness", "health", "yoga", "running"),
+    "food": ("food", "cooking", "recipe", "recipes", "baking", "chef", "foodie", "kitchen"),
+    "lifestyle": ("lifestyle", "vlog", "routine", "day", "travel", "home", "student", "life"),
+    "tech": ("tech", "gadget", "gadgets", "phone", "coding", "software", "ai", "setup"),
+}
+DEFAULT_NICHE = "fashion"
+_WORDS = re.compile(r"[a-z]+")
+
+
+def _unique(tags):
+    return list(dict.fromkeys(tag for tag in tags if tag and len(tag) <= MAX_TAG_LENGTH))
+
+
+def extract_tags(text):
+    """(hashtags, mentions) found in the text"""
+    if not text:
+        return [], []
+    text = text.lower()
+    return _unique(_HASHTAGS.findall(text)), _unique([mention.rstrip(".") for mention in _MENTIONS.findall(text)])
+
+
+def resolve_niche(target_audience):
+    """Niche for a niche name or a free-text audience description, DEFAULT_NICHE if nothing matches"""
+    if not target_audience:
+        return DEFAULT_NICHE
+    text = target_audience.strip().lower()
+    if text in NICHE_KEYWORDS:
+        return text
+    words = set(_WORDS.findall(text))
+    best, best_hits = DEFAULT_NICHE, 0
+    for niche, keywords in NICHE_KEYWORDS.items():
+        hits = len(words.intersection(keywords))
+        if hits > best_hits:
+            best, best_hits = niche, hits
+    return best
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('niche', sa.String(), nullable=True))
+    op.create_index(op.f('ix_users_niche'), 'users', ['niche'], unique=False)
+    op.create_table('video_hashtags',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('video_id', sa.Integer(), nullable=False),
+    sa.Column('profile_id', sa.Integer(), nullable=False),
+    sa.Column('tag', sa.String(), nullable=False),
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.ForeignKeyConstraint(['profile_id'], ['tiktok_profiles.id'], ),
+    sa.ForeignKeyConstraint(['video_id'], ['tiktok_videos.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('video_id', 'kind', 'tag', name='uq_video_hashtags_video_kind_tag')
+    )
+    op.create_index(op.f('ix_video_hashtags_id'), 'video_hashtags', ['id'], unique=False)
+    op.create_index('ix_video_hashtags_kind_tag', 'video_hashtags', ['kind', 'tag'], unique=False)
+    op.create_index('ix_video_hashtags_profile_kind_tag', 'video_hashtags', ['profile_id', 'kind', 'tag'], unique=False)
+    # The backfill reads rows, so it needs a live database; an --sql script leaves niche
+    # NULL (the API falls back to resolve_niche) and indexes only videos stored from then on
+    if not context.is_offline_mode():
+        _backfill()
+
+
+def _backfill() -> None:
+    """Resolve existing users' niches and index existing videos' tags (and their hashtags JSON), in keyset batches"""
+    conn = op.get_bind()
+    users = sa.table('users', sa.column('id', sa.Integer), sa.column('target_audience', sa.Text),
+                     sa.column('niche', sa.String))
+    videos = sa.table('tiktok_videos', sa.column('id', sa.Integer), sa.column('profile_id', sa.Integer),
+                      sa.column('description', sa.Text), sa.column('hashtags', sa.Text))
+    video_hashtags = sa.table('video_hashtags', sa.column('video_id', sa.Integer), sa.column('profile_id', sa.Integer),
+                              sa.column('tag', sa.String), sa.column('kind', sa.String))
+
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(users.c.id, users.c.target_audience)
+            .where(users.c.id > last_id).order_by(users.c.id).limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        conn.execute(
+            users.update().where(users.c.id == sa.bindparam('uid')).values(niche=sa.bindparam('user_niche')),
+            [{'uid': row.id, 'user_niche': resolve_niche(row.target_audience)} for row in rows]
+        )
+        last_id = rows[-1].id
+
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(videos.c.id, videos.c.profile_id, videos.c.description)
+            .where(videos.c.id > last_id).order_by(videos.c.id).limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        tag_rows, hashtag_lists = [], []
+        for row in rows:
+            hashtags, mentions = extract_tags(row.description)
+            hashtag_lists.append({'vid': row.id, 'video_hashtags': json.dumps(hashtags)})
+            tag_rows.extend(
+                {'video_id': row.id, 'profile_id': row.profile_id, 'tag': tag, 'kind': kind}
+                for kind, tags in ((HASHTAG, hashtags), (MENTION, mentions))
+                for tag in tags
+            )
+        # New videos get the list from HashtagIndex; existing ones would otherwise keep it NULL
+        conn.execute(
+            videos.update().where(videos.c.id == sa.bindparam('vid')).values(hashtags=sa.bindparam('video_hashtags')),
+            hashtag_lists
+        )
+        if tag_rows:
+            conn.execute(video_hashtags.insert(), tag_rows)
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    op.drop_index('ix_video_hashtags_profile_kind_tag', table_name='video_hashtags')
+    op.drop_index('ix_video_hashtags_kind_tag', table_name='video_hashtags')
+    op.drop_index(op.f('ix_video_hashtags_id'), table_name='video_hashtags')
+    op.drop_table('video_hashtags')
+    op.drop_index(op.f('ix_users_niche'), table_name='users')
+    op.drop_column('users', 'niche')
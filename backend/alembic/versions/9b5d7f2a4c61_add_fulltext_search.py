@@ -0,0 +1,83 @@
+"""Add full-text search indexes
+
+Revision ID: 9b5d7f2a4c61
+Revises: 8a4c6e1f9d27
+Create Date: 2026-10-19 19:30:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '9b5d7f2a4c61'
+down_revision = '8a4c6e1f9d27'
+branch_labels = None
+depends_on = None
+
+# The DDL as of this revision (app.db.fulltext issues the current one for create_all)
+POSTGRES_UPGRADE = [
+    "ALTER TABLE tiktok_videos ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS "
+    "(to_tsvector('english', coalesce(description, ''))) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_tiktok_videos_search_vector ON tiktok_videos USING GIN (search_vector)",
+    # Names weigh more than bio text when ranking
+    "ALTER TABLE tiktok_profiles ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(tiktok_username, '') || ' ' || coalesce(display_name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(bio, '')), 'B')) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_tiktok_profiles_search_vector ON tiktok_profiles USING GIN (search_vector)",
+]
+
+POSTGRES_DOWNGRADE = [
+    "DROP INDEX IF EXISTS ix_tiktok_videos_search_vector",
+    "ALTER TABLE tiktok_videos DROP COLUMN IF EXISTS search_vector",
+    "DROP INDEX IF EXISTS ix_tiktok_profiles_search_vector",
+    "ALTER TABLE tiktok_profiles DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_UPGRADE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tiktok_videos_fts USING fts5(description, content='tiktok_videos', "
+    "content_rowid='id', tokenize='porter unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS tiktok_videos_fts_ai AFTER INSERT ON tiktok_videos BEGIN "
+    "INSERT INTO tiktok_videos_fts(rowid, description) VALUES (new.id, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS tiktok_videos_fts_ad AFTER DELETE ON tiktok_videos BEGIN "
+    "INSERT INTO tiktok_videos_fts(tiktok_videos_fts, rowid, description) VALUES ('delete', old.id, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS tiktok_videos_fts_au AFTER UPDATE OF description ON tiktok_videos BEGIN "
+    "INSERT INTO tiktok_videos_fts(tiktok_videos_fts, rowid, description) VALUES ('delete', old.id, old.description); "
+    "INSERT INTO tiktok_videos_fts(rowid, description) VALUES (new.id, new.description); END",
+    "INSERT INTO tiktok_videos_fts(tiktok_videos_fts) VALUES ('rebuild')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tiktok_profiles_fts USING fts5(tiktok_username, display_name, bio, "
+    "content='tiktok_profiles', content_rowid='id', tokenize='porter unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS tiktok_profiles_fts_ai AFTER INSERT ON tiktok_profiles BEGIN "
+    "INSERT INTO tiktok_profiles_fts(rowid, tiktok_username, display_name, bio) "
+    "VALUES (new.id, new.tiktok_username, new.display_name, new.bio); END",
+    "CREATE TRIGGER IF NOT EXISTS tiktok_profiles_fts_ad AFTER DELETE ON tiktok_profiles BEGIN "
+    "INSERT INTO tiktok_profiles_fts(tiktok_profiles_fts, rowid, tiktok_username, display_name, bio) "
+    "VALUES ('delete', old.id, old.tiktok_username, old.display_name, old.bio); END",
+    "CREATE TRIGGER IF NOT EXISTS tiktok_profiles_fts_au AFTER UPDATE OF tiktok_username, display_name, bio "
+    "ON tiktok_profiles BEGIN "
+    "INSERT INTO tiktok_profiles_fts(tiktok_profiles_fts, rowid, tiktok_username, display_name, bio) "
+    "VALUES ('delete', old.id, old.tiktok_username, old.display_name, old.bio); "
+    "INSERT INTO tiktok_profiles_fts(rowid, tiktok_username, display_name, bio) "
+    "VALUES (new.id, new.tiktok_username, new.display_name, new.bio); END",
+    "INSERT INTO tiktok_profiles_fts(tiktok_profiles_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DOWNGRADE = [
+    f"DROP {kind} IF EXISTS {name}"
+    for fts in ("tiktok_videos_fts", "tiktok_profiles_fts")
+    for kind, name in [("TRIGGER", f"{fts}_{suffix}") for suffix in ("ai", "ad", "au")] + [("TABLE", fts)]
+]
+
+
+def _run(postgres, sqlite) -> None:
+    dialect = op.get_context().dialect.name
+    for statement in {"postgresql": postgres, "sqlite": sqlite}.get(dialect, []):
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    # Also indexes existing rows (FTS5 'rebuild' / STORED generated columns)
+    _run(POSTGRES_UPGRADE, SQLITE_UPGRADE)
+
+
+def downgrade() -> None:
+    _run(POSTGRES_DOWNGRADE, SQLITE_DOWNGRADE)
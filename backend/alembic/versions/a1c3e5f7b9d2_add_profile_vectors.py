@@ -0,0 +1,35 @@
+"""Add profile similarity vectors
+
+Revision ID: a1c3e5f7b9d2
+Revises: 9b5d7f2a4c61
+Create Date: 2026-10-19 20:15:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c3e5f7b9d2'
+down_revision = '9b5d7f2a4c61'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Filled by the nightly batch (app.scheduler) and per profile on data changes
+    op.create_table('profile_vectors',
+    sa.Column('profile_id', sa.Integer(), nullable=False),
+    sa.Column('vector', sa.LargeBinary(), nullable=False),
+    sa.Column('feature_version', sa.Integer(), nullable=False),
+    sa.Column('engagement_rate', sa.Float(), nullable=True),
+    sa.Column('posts_per_week', sa.Float(), nullable=True),
+    sa.Column('themes', sa.Text(), nullable=True),
+    sa.Column('computed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['profile_id'], ['tiktok_profiles.id'], ),
+    sa.PrimaryKeyConstraint('profile_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('profile_vectors')
@@ -0,0 +1,96 @@
+"""Store recommendation factors/themes as JSON and add per-user tallies
+
+Revision ID: b2d4f6a8c0e3
+Revises: a1c3e5f7b9d2
+Create Date: 2026-10-19 21:05:00.000000
+
+"""
+from collections import Counter
+import json
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2d4f6a8c0e3'
+down_revision = 'a1c3e5f7b9d2'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def upgrade() -> None:
+    # SQLite keeps JSON as text, so only PostgreSQL needs the columns converted
+    if op.get_bind().dialect.name == 'postgresql':
+        for column in ('success_factors', 'content_themes'):
+            op.alter_column('creator_recommendations', column, type_=sa.JSON(),
+                            postgresql_using=f'{column}::json')
+
+    op.create_table('recommendation_tallies',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('value', sa.String(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'kind', 'value', name='uq_recommendation_tallies_user_kind_value')
+    )
+    op.create_index(op.f('ix_recommendation_tallies_id'), 'recommendation_tallies', ['id'], unique=False)
+    op.create_index('ix_recommendation_tallies_user_kind_count', 'recommendation_tallies',
+                    ['user_id', 'kind', 'count'], unique=False)
+    _backfill()
+
+
+def _as_list(value):
+    # Text on SQLite, already decoded on PostgreSQL
+    if isinstance(value, str):
+        return json.loads(value)
+    return value or []
+
+
+def _backfill() -> None:
+    """Count factors and themes of each user's active recommendations, in keyset batches of users"""
+    conn = op.get_bind()
+    recommendations = sa.table('creator_recommendations', sa.column('user_id', sa.Integer),
+                               sa.column('success_factors'), sa.column('content_themes'),
+                               sa.column('is_active', sa.Integer))
+    tallies = sa.table('recommendation_tallies', sa.column('user_id', sa.Integer), sa.column('kind', sa.String),
+                       sa.column('value', sa.String), sa.column('count', sa.Integer))
+
+    last_user_id = 0
+    while True:
+        user_ids = conn.execute(
+            sa.select(recommendations.c.user_id).distinct()
+            .where(recommendations.c.user_id > last_user_id, recommendations.c.is_active == 1)
+            .order_by(recommendations.c.user_id).limit(BACKFILL_BATCH_SIZE)
+        ).scalars().all()
+        if not user_ids:
+            break
+        counts = {}
+        for row in conn.execute(
+            sa.select(recommendations.c.user_id, recommendations.c.success_factors, recommendations.c.content_themes)
+            .where(recommendations.c.user_id.in_(user_ids), recommendations.c.is_active == 1)
+        ):
+            user_counts = counts.setdefault(row.user_id, Counter())
+            user_counts.update(('factor', factor) for factor in _as_list(row.success_factors))
+            user_counts.update(('theme', theme) for theme in _as_list(row.content_themes))
+        rows = [
+            {'user_id': user_id, 'kind': kind, 'value': value, 'count': count}
+            for user_id, user_counts in counts.items()
+            for (kind, value), count in user_counts.items()
+        ]
+        if rows:
+            conn.execute(tallies.insert(), rows)
+        last_user_id = user_ids[-1]
+
+
+def downgrade() -> None:
+    op.drop_index('ix_recommendation_tallies_user_kind_count', table_name='recommendation_tallies')
+    op.drop_index(op.f('ix_recommendation_tallies_id'), table_name='recommendation_tallies')
+    op.drop_table('recommendation_tallies')
+    if op.get_bind().dialect.name == 'postgresql':
+        for column in ('success_factors', 'content_themes'):
+            op.alter_column('creator_recommendations', column, type_=sa.String(),
+                            postgresql_using=f'{column}::text')
@@ -0,0 +1,27 @@
+"""Index creator recommendations by user and for retention cleanup
+
+Revision ID: c3e5a7b9d1f4
+Revises: b2d4f6a8c0e3
+Create Date: 2026-10-19 21:40:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3e5a7b9d1f4'
+down_revision = 'b2d4f6a8c0e3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_creator_recommendations_user_active', 'creator_recommendations',
+                    ['user_id', 'is_active'], unique=False)
+    op.create_index('ix_creator_recommendations_active_generated', 'creator_recommendations',
+                    ['is_active', 'generated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_creator_recommendations_active_generated', table_name='creator_recommendations')
+    op.drop_index('ix_creator_recommendations_user_active', table_name='creator_recommendations')
@@ -0,0 +1,54 @@
+"""Add follower interaction counters for engaged leads
+
+Revision ID: d4f6b8c0e2a5
+Revises: c3e5a7b9d1f4
+Create Date: 2026-10-19 22:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4f6b8c0e2a5'
+down_revision = 'c3e5a7b9d1f4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('tiktok_followers',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('username', sa.String(), nullable=False),
+    sa.Column('follower_count', sa.BigInteger(), nullable=True),
+    sa.Column('engagement_rate', sa.Float(), nullable=True),
+    sa.Column('bio', sa.Text(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_tiktok_followers_id'), 'tiktok_followers', ['id'], unique=False)
+    op.create_index(op.f('ix_tiktok_followers_username'), 'tiktok_followers', ['username'], unique=True)
+
+    # Filled by interaction_scrape jobs (app.services.scrape_jobs)
+    op.create_table('follower_interactions',
+    sa.Column('profile_id', sa.Integer(), nullable=False),
+    sa.Column('follower_id', sa.Integer(), nullable=False),
+    sa.Column('comment_count', sa.Integer(), nullable=False),
+    sa.Column('like_count', sa.Integer(), nullable=False),
+    sa.Column('share_count', sa.Integer(), nullable=False),
+    sa.Column('first_interaction_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('last_interaction_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['follower_id'], ['tiktok_followers.id'], ),
+    sa.ForeignKeyConstraint(['profile_id'], ['tiktok_profiles.id'], ),
+    sa.PrimaryKeyConstraint('profile_id', 'follower_id', name='pk_follower_interactions')
+    )
+
+    op.add_column('tiktok_videos', sa.Column('interactions_scraped_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('tiktok_videos', 'interactions_scraped_at')
+    op.drop_table('follower_interactions')
+    op.drop_index(op.f('ix_tiktok_followers_username'), table_name='tiktok_followers')
+    op.drop_index(op.f('ix_tiktok_followers_id'), table_name='tiktok_followers')
+    op.drop_table('tiktok_followers')
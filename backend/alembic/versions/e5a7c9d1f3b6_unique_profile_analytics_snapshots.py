@@ -0,0 +1,31 @@
+"""Make profile analytics snapshots unique per profile and day
+
+Revision ID: e5a7c9d1f3b6
+Revises: d4f6b8c0e2a5
+Create Date: 2026-10-20 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a7c9d1f3b6'
+down_revision = 'd4f6b8c0e2a5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keep the newest of any duplicate snapshots written before the constraint existed
+    op.execute(
+        "DELETE FROM profile_analytics WHERE id NOT IN "
+        "(SELECT MAX(id) FROM profile_analytics GROUP BY profile_id, date)"
+    )
+    op.drop_index('ix_profile_analytics_profile_id_date', table_name='profile_analytics')
+    op.create_unique_constraint('uq_profile_analytics_profile_id_date', 'profile_analytics', ['profile_id', 'date'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_profile_analytics_profile_id_date', 'profile_analytics', type_='unique')
+    op.create_index('ix_profile_analytics_profile_id_date', 'profile_analytics', ['profile_id', 'date'], unique=False)
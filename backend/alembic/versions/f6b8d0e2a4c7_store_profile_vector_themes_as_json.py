@@ -0,0 +1,29 @@
+"""Store profile vector themes as JSON
+
+Revision ID: f6b8d0e2a4c7
+Revises: e5a7c9d1f3b6
+Create Date: 2026-10-20 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6b8d0e2a4c7'
+down_revision = 'e5a7c9d1f3b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # SQLite keeps JSON as text, so only PostgreSQL needs the column converted
+    if op.get_bind().dialect.name == 'postgresql':
+        op.alter_column('profile_vectors', 'themes', type_=sa.JSON(),
+                        postgresql_using='themes::json')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.alter_column('profile_vectors', 'themes', type_=sa.Text(),
+                        postgresql_using='themes::text')
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, users, tiktok, analytics, recommendations, best_practices, engaged_leads
+from app.api.v1.endpoints import auth, users, tiktok, analytics, recommendations, best_practices, engaged_leads, search, exports, imports
 
 api_router = APIRouter()
 
@@ -10,3 +10,6 @@ api_router.include_router(analytics.router, prefix="/analytics", tags=["analytic
 api_router.include_router(recommendations.router, prefix="/recommendations", tags=["recommendations"])
 api_router.include_router(best_practices.router, prefix="/best-practices", tags=["best-practices"])
 api_router.include_router(engaged_leads.router, prefix="/engaged-leads", tags=["engaged-leads"])
+api_router.include_router(search.router, prefix="/search", tags=["search"])
+api_router.include_router(exports.router, prefix="/export", tags=["export"])
+api_router.include_router(imports.router, prefix="/import", tags=["import"])
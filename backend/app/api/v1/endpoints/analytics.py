@@ -1,15 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy import func, desc, select
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime, timedelta
 from app.db.session import get_db
 from app.models.user import User
-from app.models.tiktok_profile import TikTokProfile
 from app.models.tiktok_video import TikTokVideo
 from app.models.analytics import ProfileAnalytics
 from app.services.analytics_engine import AnalyticsEngine
+from app.services.hashtag_index import HashtagIndex, MAX_TAGS, TAG_KINDS
+from app.services.posting_patterns import PostingPatterns
+from app.services.profiles import get_user_profile, get_user_profile_id
+from app.services.engagement_trend import TREND_EWMA_SPAN, TREND_WINDOW, EngagementTrendEngine
+from app.core.niches import NICHES, resolve_niche
+from app.core.streaming import ndjson_response, stream_rows, wants_ndjson
 from app.api.v1.endpoints.users import get_current_user
 
 router = APIRouter()
@@ -32,6 +37,16 @@ class VideoPerformance(BaseModel):
     engagement_rate: Optional[float]
     posted_at: Optional[datetime]
 
+# Just the response fields, for streaming without loading whole videos
+VIDEO_PERFORMANCE_COLUMNS = [getattr(TikTokVideo, name) for name in VideoPerformance.model_fields]
+
+class HashtagPerformance(BaseModel):
+    tag: str
+    video_count: int
+    median_views: float
+    avg_views: float
+    avg_engagement_rate: float
+
 class GrowthMetrics(BaseModel):
     date: str
     followers: Optional[int]
@@ -46,9 +61,9 @@ async def get_analytics_overview(
     db: Session = Depends(get_db)
 ):
     """Get analytics overview for the user's TikTok profile"""
-    # Use the analytics engine for comprehensive calculations
+    # Use the analytics engine for comprehensive calculations (cached across workers)
     analytics_engine = AnalyticsEngine(db)
-    analytics_data = analytics_engine.calculate_profile_analytics(current_user.id)
+    analytics_data = analytics_engine.get_profile_analytics(current_user.id)
     
     if not analytics_data:
         raise HTTPException(
@@ -56,26 +71,8 @@ async def get_analytics_overview(
             detail="TikTok profile not found or no data available"
         )
     
-    # Get top performing video
-    profile = db.query(TikTokProfile).filter(
-        TikTokProfile.user_id == current_user.id
-    ).first()
-    
-    top_performing_video = None
-    if profile:
-        top_video = db.query(TikTokVideo).filter(
-            TikTokVideo.profile_id == profile.id
-        ).order_by(desc(TikTokVideo.view_count)).first()
-        
-        if top_video:
-            top_performing_video = {
-                "video_id": top_video.video_id,
-                "video_url": top_video.video_url,
-                "description": top_video.description,
-                "view_count": top_video.view_count,
-                "like_count": top_video.like_count,
-                "engagement_rate": top_video.engagement_rate
-            }
+    # The engine already ranked the videos, so reuse its top performer
+    top_performing_video = analytics_data.get('top_performing_video')
     
     return AnalyticsOverview(
         total_followers=analytics_data.get('total_followers'),
@@ -89,15 +86,14 @@ async def get_analytics_overview(
 
 @router.get("/videos/performance", response_model=List[VideoPerformance])
 async def get_video_performance(
+    request: Request,
     limit: int = 20,
     sort_by: str = "view_count",
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get video performance metrics"""
-    profile = db.query(TikTokProfile).filter(
-        TikTokProfile.user_id == current_user.id
-    ).first()
+    """Get video performance metrics; streamed one per line with Accept: application/x-ndjson"""
+    profile = get_user_profile(db, current_user.id)
     
     if not profile:
         raise HTTPException(
@@ -114,6 +110,12 @@ async def get_video_performance(
     elif sort_by == "posted_at":
         order_column = TikTokVideo.posted_at
     
+    if wants_ndjson(request):
+        stmt = select(*VIDEO_PERFORMANCE_COLUMNS).where(
+            TikTokVideo.profile_id == profile.id
+        ).order_by(desc(order_column)).limit(limit)
+        return ndjson_response(VideoPerformance(**row._mapping) for row in stream_rows(stmt))
+    
     videos = db.query(TikTokVideo).filter(
         TikTokVideo.profile_id == profile.id
     ).order_by(desc(order_column)).limit(limit).all()
@@ -130,6 +132,38 @@ async def get_video_performance(
         ) for video in videos
     ]
 
+@router.get("/hashtags", response_model=List[HashtagPerformance])
+async def get_hashtag_performance(
+    scope: str = Query("profile", pattern="^(profile|niche)$"),
+    kind: str = Query("hashtag", pattern=f"^({'|'.join(TAG_KINDS)})$"),
+    niche: Optional[str] = None,
+    min_videos: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=MAX_TAGS),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Views and engagement per hashtag (or mention) on the user's videos or across their niche"""
+    index = HashtagIndex(db)
+    
+    if scope == "niche":
+        niche = niche or current_user.niche or resolve_niche(current_user.target_audience)
+        if niche not in NICHES:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Unknown niche: {niche}"
+            )
+        return index.performance(niche=niche, kind=kind, min_videos=min_videos, limit=limit)
+    
+    profile_id = get_user_profile_id(db, current_user.id)
+    
+    if profile_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="TikTok profile not found"
+        )
+    
+    return index.performance(profile_id=profile_id, kind=kind, min_videos=min_videos, limit=limit)
+
 @router.get("/growth", response_model=List[GrowthMetrics])
 async def get_growth_metrics(
     days: int = 30,
@@ -151,6 +185,28 @@ async def get_growth_metrics(
         ) for item in timeline_data
     ]
 
+@router.get("/engagement-trend")
+async def get_engagement_trend(
+    window: int = Query(TREND_WINDOW, ge=2, le=100),
+    span: int = Query(TREND_EWMA_SPAN, ge=2, le=200),
+    series: bool = True,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Engagement rate in posting order with its rolling mean, EWMA and trend slope"""
+    profile_id = get_user_profile_id(db, current_user.id)
+    
+    if profile_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="TikTok profile not found"
+        )
+    
+    trend = EngagementTrendEngine(db).for_profile(profile_id, window=window, span=span, include_series=series)
+    if trend is None:
+        return {"videos": 0, "trend": "stable", "series": []}
+    return trend
+
 @router.get("/insights")
 async def get_performance_insights(
     current_user: User = Depends(get_current_user),
@@ -185,12 +241,20 @@ async def get_performance_insights(
         })
     
     # Add recommendations based on insights
-    if insights_data.get('posting_consistency') == 'irregular':
+    if insights_data.get('posting_consistency') in ('irregular', 'sporadic'):
         recommendations.append({
             "title": "Improve Posting Consistency",
             "description": "Try to maintain a regular posting schedule to keep your audience engaged."
         })
     
+    best_slots = insights_data.get('best_posting_slots') or []
+    if best_slots:
+        slots = ", ".join(f"{slot['day_name'].title()} {slot['hour']:02d}:00 UTC" for slot in best_slots)
+        recommendations.append({
+            "title": "Post At Your Best Times",
+            "description": f"Your videos posted around {slots} get the most views."
+        })
+    
     return {
         "insights": insights,
         "recommendations": recommendations,
@@ -202,6 +266,24 @@ async def get_performance_insights(
         }
     }
 
+@router.get("/insights/posting-patterns")
+async def get_posting_patterns(
+    # Real time zones are whole quarter hours; anything finer would only multiply cache keys
+    utc_offset_minutes: int = Query(0, ge=-720, le=840, multiple_of=15),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Hour-of-week heatmap of views and engagement, plus posting cadence (gaps, streaks, regularity)"""
+    profile_id = get_user_profile_id(db, current_user.id)
+    
+    if profile_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="TikTok profile not found"
+        )
+    
+    return PostingPatterns(db).get(profile_id, utc_offset_minutes)
+
 @router.post("/calculate")
 async def calculate_analytics(
     current_user: User = Depends(get_current_user),
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
+from datetime import datetime
 from app.db.session import get_db
 from app.core.security import create_access_token
 from app.models.user import User
@@ -32,7 +33,8 @@ async def login(
         # Create new user
         user = User(
             email=login_request.email,
-            name=login_request.name
+            name=login_request.name,
+            last_seen_at=datetime.utcnow()
         )
         db.add(user)
         db.commit()
@@ -40,6 +42,7 @@ async def login(
     else:
         # Update existing user info
         user.name = login_request.name
+        user.last_seen_at = datetime.utcnow()
         db.commit()
     
     # Create access token
@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import List, Optional
+from datetime import datetime
 from app.db.session import get_db
 from app.services.best_practices_analyzer import BestPracticesAnalyzer
 from app.api.v1.endpoints.users import get_current_user
@@ -21,25 +23,23 @@ class BestPracticesResponse(BaseModel):
     recommendations: List[BestPracticeRecommendation]
     analyzed_creators: int
     target_audience: str
+    version: Optional[int] = None  # niche insight version, None while it's being computed
+    computed_at: Optional[datetime] = None
     note: Optional[str] = None
 
 @router.get("/analyze", response_model=BestPracticesResponse)
 async def analyze_best_practices(
-    target_audience: str = "fashion",
+    target_audience: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Analyze top creators and extract best practices"""
+    """Best practices from top creators in a niche (defaults to the user's target audience)"""
     try:
         analyzer = BestPracticesAnalyzer(db)
         
-        # Analyze top creators in the target audience
-        analysis = await analyzer.analyze_top_creators(
-            user_id=current_user.id,
-            target_audience=target_audience
-        )
-        
-        await analyzer.close()
+        # Precomputed per niche in the background; only personalization happens here.
+        # A miss queues the computation, and publishing to the broker blocks, so not on the event loop
+        analysis = await run_in_threadpool(analyzer.get_best_practices, current_user, target_audience)
         
         return BestPracticesResponse(**analysis)
         
@@ -58,13 +58,8 @@ async def get_recommendations(
     try:
         analyzer = BestPracticesAnalyzer(db)
         
-        # Get quick recommendations without full analysis
-        analysis = await analyzer.analyze_top_creators(
-            user_id=current_user.id,
-            target_audience="fashion"
-        )
-        
-        await analyzer.close()
+        # The user's own niche, from their onboarding answers
+        analysis = await run_in_threadpool(analyzer.get_best_practices, current_user)
         
         return analysis.get('recommendations', [])
         
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 from typing import Dict
 from app.api.v1.endpoints.users import get_current_user
-from app.db.session import get_db
+from app.core.streaming import closing, ndjson_response, wants_ndjson
+from app.db.session import SessionLocal, get_db
 from app.models.user import User
-from app.services.engaged_leads_analyzer import EngagedLeadsAnalyzer
+from app.services.engaged_leads_analyzer import EngagedLeadsAnalyzer, MAX_LEADS
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,13 +14,19 @@ router = APIRouter()
 
 @router.get("/analyze", response_model=Dict)
 async def get_engaged_leads(
-    limit: int = 20,
+    request: Request,
+    limit: int = Query(20, ge=1, le=MAX_LEADS),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
-    Get most engaged followers from target audience for collaboration opportunities
+    Get most engaged followers from target audience for collaboration opportunities.
+    With Accept: application/x-ndjson the leads are streamed one per line, best
+    first, and the summary fields are sent as X-Total-Analyzed / X-Profile-Username headers.
     """
+    if wants_ndjson(request):
+        return _stream_engaged_leads(current_user.id, limit)
+    
     try:
         analyzer = EngagedLeadsAnalyzer(db)
         result = analyzer.get_engaged_leads(current_user.id, limit)
@@ -34,6 +41,20 @@ async def get_engaged_leads(
             detail="Failed to analyze engaged leads"
         )
 
+def _stream_engaged_leads(user_id: int, limit: int):
+    # Leads are built as they are sent, so they read through a session of their own
+    stream_db = SessionLocal()
+    try:
+        summary, leads = EngagedLeadsAnalyzer(stream_db).iter_engaged_leads(user_id, limit)
+    except Exception:
+        stream_db.close()
+        raise
+    logger.info(f"Streaming engaged leads analysis for user {user_id}")
+    return ndjson_response(closing(stream_db, leads), headers={
+        'X-Total-Analyzed': str(summary['total_analyzed']),
+        'X-Profile-Username': summary['profile_username']
+    })
+
 @router.get("/contact-suggestions/{username}")
 async def get_contact_suggestions(
     username: str,
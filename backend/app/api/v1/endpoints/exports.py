@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from app.core.streaming import closing
+from app.db.session import SessionLocal, get_db
+from app.models.user import User
+from app.models.tiktok_profile import TikTokProfile
+from app.services.profiles import get_user_profile
+from app.services.data_export import CSV, DATASETS, FILE_EXTENSIONS, FORMATS, MEDIA_TYPES, DataExporter
+from app.api.v1.endpoints.users import get_current_user
+
+router = APIRouter()
+
+@router.get("/{dataset}")
+async def export_dataset(
+    dataset: str,
+    format: str = Query(CSV, pattern=f"^({'|'.join(FORMATS)})$"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Download the user's full video history ("videos") or daily analytics ("analytics") as CSV, Parquet or Arrow"""
+    if dataset not in DATASETS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown dataset: {dataset}"
+        )
+
+    profile = get_user_profile(db, current_user.id, TikTokProfile.id, TikTokProfile.tiktok_username)
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="TikTok profile not found"
+        )
+
+    # The file is written while it is sent, so it reads through a session of its own
+    export_db = SessionLocal()
+    chunks = DataExporter(export_db).export(dataset, format, profile.id)
+    filename = f"{profile.tiktok_username}-{dataset}.{FILE_EXTENSIONS[format]}"
+    return StreamingResponse(
+        closing(export_db, chunks),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
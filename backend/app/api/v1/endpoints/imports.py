@@ -0,0 +1,47 @@
+import io
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from app.db.session import get_db
+from app.models.user import User
+from app.services.profiles import get_user_profile
+from app.services.data_import import CSV, DATASETS, FORMATS, BulkImporter
+from app.api.v1.endpoints.users import get_current_user
+
+router = APIRouter()
+
+@router.post("/{dataset}")
+async def import_dataset(
+    dataset: str,
+    file: UploadFile = File(...),
+    format: str = Query(CSV, pattern=f"^({'|'.join(FORMATS)})$"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Import historical videos ("videos") or daily analytics ("analytics") from a CSV, JSON Lines or JSON file"""
+    if dataset not in DATASETS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown dataset: {dataset}"
+        )
+
+    profile = get_user_profile(db, current_user.id)
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="TikTok profile not found"
+        )
+
+    # The upload is spooled to disk; it is decoded and imported chunk by chunk off the event loop
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", errors="replace", newline="")
+    try:
+        report = await run_in_threadpool(BulkImporter(db).run, profile, dataset, stream, format)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    finally:
+        # The upload is closed by the framework, not by the wrapper
+        stream.detach()
+    return report
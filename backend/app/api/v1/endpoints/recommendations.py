@@ -5,10 +5,10 @@ from pydantic import BaseModel
 from typing import List, Optional
 from app.db.session import get_db
 from app.models.user import User
-from app.models.tiktok_profile import TikTokProfile
-from app.models.analytics import CreatorRecommendation
+from app.models.analytics import CreatorRecommendation, RecommendationTally
+from app.services.profiles import get_user_profile
+from app.services.creator_similarity import CreatorRecommender, CreatorVectorStore, TALLY_FACTOR, TALLY_THEME
 from app.api.v1.endpoints.users import get_current_user
-import json
 
 router = APIRouter()
 
@@ -36,9 +36,7 @@ async def get_creator_recommendations(
     db: Session = Depends(get_db)
 ):
     """Get recommended creators to follow and learn from"""
-    profile = db.query(TikTokProfile).filter(
-        TikTokProfile.user_id == current_user.id
-    ).first()
+    profile = get_user_profile(db, current_user.id)
     
     if not profile:
         raise HTTPException(
@@ -47,15 +45,17 @@ async def get_creator_recommendations(
         )
     
     # Get existing recommendations
-    recommendations = db.query(CreatorRecommendation).filter(
+    active_recommendations = db.query(CreatorRecommendation).filter(
         CreatorRecommendation.user_id == current_user.id,
         CreatorRecommendation.is_active == 1
-    ).order_by(desc(CreatorRecommendation.similarity_score)).limit(limit).all()
+    ).order_by(desc(CreatorRecommendation.similarity_score)).limit(limit)
+    recommendations = active_recommendations.all()
     
-    # If no recommendations exist, generate some sample ones
+    # First visit: find the most similar creators
     if not recommendations:
-        sample_recommendations = await generate_sample_recommendations(current_user, db)
-        recommendations = sample_recommendations
+        CreatorRecommender(db).recommend(current_user.id, profile, limit=limit)
+        db.commit()
+        recommendations = active_recommendations.all()
     
     return [
         CreatorRecommendationResponse(
@@ -66,8 +66,8 @@ async def get_creator_recommendations(
             similarity_score=rec.similarity_score,
             engagement_score=rec.engagement_score,
             growth_score=rec.growth_score,
-            success_factors=json.loads(rec.success_factors) if rec.success_factors else [],
-            content_themes=json.loads(rec.content_themes) if rec.content_themes else [],
+            success_factors=rec.success_factors or [],
+            content_themes=rec.content_themes or [],
             posting_frequency=rec.posting_frequency
         ) for rec in recommendations
     ]
@@ -78,30 +78,16 @@ async def get_recommendation_insights(
     db: Session = Depends(get_db)
 ):
     """Get insights based on recommended creators"""
-    recommendations = db.query(CreatorRecommendation).filter(
-        CreatorRecommendation.user_id == current_user.id,
-        CreatorRecommendation.is_active == 1
-    ).limit(5).all()
+    # Counts are maintained when recommendations are stored
+    tallies = db.query(RecommendationTally.kind, RecommendationTally.value, RecommendationTally.count).filter(
+        RecommendationTally.user_id == current_user.id
+    ).order_by(desc(RecommendationTally.count), RecommendationTally.value).all()
     
-    if not recommendations:
-        return []
+    top_factors = [(tally.value, tally.count) for tally in tallies if tally.kind == TALLY_FACTOR][:3]
+    top_themes = [(tally.value, tally.count) for tally in tallies if tally.kind == TALLY_THEME][:2]
     
     insights = []
     
-    # Analyze common success factors
-    all_success_factors = []
-    for rec in recommendations:
-        if rec.success_factors:
-            factors = json.loads(rec.success_factors)
-            all_success_factors.extend(factors)
-    
-    # Find most common success factors
-    factor_counts = {}
-    for factor in all_success_factors:
-        factor_counts[factor] = factor_counts.get(factor, 0) + 1
-    
-    top_factors = sorted(factor_counts.items(), key=lambda x: x[1], reverse=True)[:3]
-    
     for factor, count in top_factors:
         insights.append(RecommendationInsight(
             title=f"Common Success Pattern: {factor}",
@@ -109,19 +95,6 @@ async def get_recommendation_insights(
             actionable_tip=get_actionable_tip_for_factor(factor)
         ))
     
-    # Analyze content themes
-    all_themes = []
-    for rec in recommendations:
-        if rec.content_themes:
-            themes = json.loads(rec.content_themes)
-            all_themes.extend(themes)
-    
-    theme_counts = {}
-    for theme in all_themes:
-        theme_counts[theme] = theme_counts.get(theme, 0) + 1
-    
-    top_themes = sorted(theme_counts.items(), key=lambda x: x[1], reverse=True)[:2]
-    
     for theme, count in top_themes:
         insights.append(RecommendationInsight(
             title=f"Popular Content Theme: {theme}",
@@ -137,9 +110,7 @@ async def refresh_recommendations(
     db: Session = Depends(get_db)
 ):
     """Refresh creator recommendations based on current profile and preferences"""
-    profile = db.query(TikTokProfile).filter(
-        TikTokProfile.user_id == current_user.id
-    ).first()
+    profile = get_user_profile(db, current_user.id)
     
     if not profile:
         raise HTTPException(
@@ -147,90 +118,17 @@ async def refresh_recommendations(
             detail="TikTok profile not found"
         )
     
-    # Deactivate old recommendations
-    old_recommendations = db.query(CreatorRecommendation).filter(
-        CreatorRecommendation.user_id == current_user.id
-    ).all()
-    
-    for rec in old_recommendations:
-        rec.is_active = 0
-    
-    # Generate new recommendations
-    new_recommendations = await generate_sample_recommendations(current_user, db)
+    # Replace the active recommendations using fresh profile data
+    CreatorVectorStore(db).refresh([profile.id])
+    count = CreatorRecommender(db).recommend(current_user.id, profile)
     
     db.commit()
     
     return {
         "message": "Recommendations refreshed successfully",
-        "count": len(new_recommendations)
+        "count": count
     }
 
-async def generate_sample_recommendations(user: User, db: Session) -> List[CreatorRecommendation]:
-    """Generate sample creator recommendations based on user's niche"""
-    # This would typically use ML algorithms to find similar creators
-    # For now, we'll create sample recommendations based on common niches
-    
-    sample_creators = [
-        {
-            "username": "charlidamelio",
-            "display_name": "Charli D'Amelio",
-            "avatar_url": "https://example.com/charli.jpg",
-            "similarity_score": 0.85,
-            "engagement_score": 0.92,
-            "growth_score": 0.88,
-            "success_factors": ["Consistent posting", "Trending sounds", "Dance content"],
-            "content_themes": ["Dance", "Lifestyle", "Trends"],
-            "posting_frequency": "2-3 times daily"
-        },
-        {
-            "username": "khaby.lame",
-            "display_name": "Khabane Lame",
-            "avatar_url": "https://example.com/khaby.jpg",
-            "similarity_score": 0.78,
-            "engagement_score": 0.89,
-            "growth_score": 0.95,
-            "success_factors": ["Relatable content", "No dialogue needed", "Universal humor"],
-            "content_themes": ["Comedy", "Life hacks", "Reactions"],
-            "posting_frequency": "1-2 times daily"
-        },
-        {
-            "username": "zach.king",
-            "display_name": "Zach King",
-            "avatar_url": "https://example.com/zach.jpg",
-            "similarity_score": 0.72,
-            "engagement_score": 0.87,
-            "growth_score": 0.82,
-            "success_factors": ["High production value", "Magic editing", "Storytelling"],
-            "content_themes": ["Magic", "Illusions", "Creative editing"],
-            "posting_frequency": "3-4 times weekly"
-        }
-    ]
-    
-    recommendations = []
-    for creator_data in sample_creators:
-        recommendation = CreatorRecommendation(
-            user_id=user.id,
-            recommended_username=creator_data["username"],
-            recommended_display_name=creator_data["display_name"],
-            recommended_avatar_url=creator_data["avatar_url"],
-            similarity_score=creator_data["similarity_score"],
-            engagement_score=creator_data["engagement_score"],
-            growth_score=creator_data["growth_score"],
-            success_factors=json.dumps(creator_data["success_factors"]),
-            content_themes=json.dumps(creator_data["content_themes"]),
-            posting_frequency=creator_data["posting_frequency"]
-        )
-        
-        db.add(recommendation)
-        recommendations.append(recommendation)
-    
-    db.commit()
-    
-    for rec in recommendations:
-        db.refresh(rec)
-    
-    return recommendations
-
 def get_actionable_tip_for_factor(factor: str) -> str:
     """Get actionable tips based on success factors"""
     tips = {
@@ -240,7 +138,8 @@ def get_actionable_tip_for_factor(factor: str) -> str:
         "Relatable content": "Focus on everyday situations your audience can connect with and relate to.",
         "High production value": "Invest time in good lighting, clear audio, and smooth editing to make your content stand out.",
         "Storytelling": "Structure your videos with a clear beginning, middle, and end to keep viewers engaged.",
-        "Universal humor": "Create content that doesn't rely on language barriers - visual comedy works globally."
+        "Universal humor": "Create content that doesn't rely on language barriers - visual comedy works globally.",
+        "High engagement": "End videos with a question or prompt and reply to comments to keep the conversation going."
     }
     
     return tips.get(factor, "Study this creator's approach and adapt it to your own content style.")
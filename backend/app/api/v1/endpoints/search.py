@@ -0,0 +1,80 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+from app.db.session import get_db
+from app.models.user import User
+from app.services.profiles import get_user_profile_id
+from app.services.search import SearchService, MAX_RESULTS
+from app.core.niches import NICHES, resolve_niche
+from app.api.v1.endpoints.users import get_current_user
+
+router = APIRouter()
+
+class VideoSearchResult(BaseModel):
+    video_id: str
+    video_url: str
+    description: Optional[str]
+    snippet: Optional[str]
+    view_count: Optional[int]
+    posted_at: Optional[datetime]
+    score: float
+
+class CreatorSearchResult(BaseModel):
+    tiktok_username: str
+    display_name: Optional[str]
+    bio: Optional[str]
+    snippet: Optional[str]
+    follower_count: Optional[int]
+    score: float
+
+def _check_niche(niche: str) -> str:
+    if niche not in NICHES:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown niche: {niche}"
+        )
+    return niche
+
+@router.get("/videos", response_model=List[VideoSearchResult])
+async def search_videos(
+    q: str = Query(..., min_length=1, max_length=200),
+    scope: str = Query("mine", pattern="^(mine|niche|all)$"),
+    niche: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=MAX_RESULTS),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Search video descriptions: the user's own videos, their niche's, or all"""
+    search = SearchService(db)
+
+    if scope == "niche":
+        niche = _check_niche(niche or current_user.niche or resolve_niche(current_user.target_audience))
+        return search.search_videos(q, niche=niche, limit=limit)
+
+    if scope == "all":
+        return search.search_videos(q, limit=limit)
+
+    profile_id = get_user_profile_id(db, current_user.id)
+
+    if profile_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="TikTok profile not found"
+        )
+
+    return search.search_videos(q, profile_id=profile_id, limit=limit)
+
+@router.get("/creators", response_model=List[CreatorSearchResult])
+async def search_creators(
+    q: str = Query(..., min_length=1, max_length=200),
+    niche: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=MAX_RESULTS),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Search creators by username, display name and bio"""
+    if niche is not None:
+        _check_niche(niche)
+    return SearchService(db).search_profiles(q, niche=niche, limit=limit)
@@ -1,5 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import List, Optional
@@ -7,8 +9,13 @@ from app.db.session import get_db
 from app.models.user import User
 from app.models.tiktok_profile import TikTokProfile
 from app.models.tiktok_video import TikTokVideo
+from app.models.scrape_job import ScrapeJob
 from app.services.tiktok_scraper import TikTokScraper
+from app.services.profiles import get_user_profile
+from app.services.scrape_jobs import ScrapeJobQueue
+from app.services.scrape_scheduler import INTERACTIVE, REFRESH
 from app.api.v1.endpoints.users import get_current_user
+from app.core.streaming import ndjson_response, stream_rows, wants_ndjson
 from datetime import datetime
 
 router = APIRouter()
@@ -38,13 +45,45 @@ class TikTokVideoResponse(BaseModel):
     engagement_rate: Optional[float]
     posted_at: Optional[datetime]
 
+# Just the response fields, for streaming without loading whole videos
+VIDEO_RESPONSE_COLUMNS = [getattr(TikTokVideo, name) for name in TikTokVideoResponse.model_fields]
+
 class ScrapeProfileRequest(BaseModel):
     username: str
 
+class ScrapeJobResponse(BaseModel):
+    id: int
+    job_type: str
+    priority: str
+    profile_id: int
+    status: str
+    progress: int
+    message: Optional[str]
+    error: Optional[str]
+    attempts: int
+    created_at: Optional[datetime]
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+def _job_response(job: ScrapeJob) -> ScrapeJobResponse:
+    return ScrapeJobResponse(
+        id=job.id,
+        job_type=job.job_type,
+        priority=job.priority,
+        profile_id=job.profile_id,
+        status=job.status,
+        progress=job.progress,
+        message=job.message,
+        error=job.error,
+        attempts=job.attempts,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at
+    )
+
 @router.post("/scrape-profile")
 async def scrape_tiktok_profile(
     request: ScrapeProfileRequest,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -58,12 +97,13 @@ async def scrape_tiktok_profile(
     ).first()
     
     if existing_profile:
-        # Update existing profile in background
-        background_tasks.add_task(update_profile_data, existing_profile.id, db)
-        return {"message": "Profile update started", "profile_id": existing_profile.id}
+        # Update existing profile on a worker; publishing to the broker blocks, so not on the event loop
+        job = await run_in_threadpool(ScrapeJobQueue(db).enqueue, ScrapeJob.PROFILE_UPDATE, existing_profile, current_user.id, priority=REFRESH)
+        return {"message": "Profile update started", "profile_id": existing_profile.id, "job_id": job.id}
     
     # Create new profile and scrape data
-    scraper = TikTokScraper()
+    # Onboarding: the user is waiting, so this jumps ahead of batch work
+    scraper = TikTokScraper(priority=INTERACTIVE, user_id=current_user.id)
     profile_data = await scraper.get_profile_data(username)
     await scraper.close()
     
@@ -92,11 +132,12 @@ async def scrape_tiktok_profile(
     db.commit()
     db.refresh(new_profile)
     
-    # Scrape recent videos in background
-    background_tasks.add_task(scrape_recent_videos, new_profile.id, username, db)
+    # Scrape recent videos on a worker
+    job = await run_in_threadpool(ScrapeJobQueue(db).enqueue, ScrapeJob.VIDEO_SCRAPE, new_profile, current_user.id, priority=INTERACTIVE)
     
     return {
         "message": "Profile scraped successfully",
+        "job_id": job.id,
         "profile": TikTokProfileResponse(
             id=new_profile.id,
             tiktok_username=new_profile.tiktok_username,
@@ -118,9 +159,7 @@ async def get_user_tiktok_profile(
     db: Session = Depends(get_db)
 ):
     """Get user's TikTok profile data"""
-    profile = db.query(TikTokProfile).filter(
-        TikTokProfile.user_id == current_user.id
-    ).first()
+    profile = get_user_profile(db, current_user.id)
     
     if not profile:
         raise HTTPException(
@@ -144,14 +183,13 @@ async def get_user_tiktok_profile(
 
 @router.get("/videos", response_model=List[TikTokVideoResponse])
 async def get_user_videos(
+    request: Request,
     limit: int = 10,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get user's TikTok videos"""
-    profile = db.query(TikTokProfile).filter(
-        TikTokProfile.user_id == current_user.id
-    ).first()
+    """Get user's TikTok videos; streamed one per line with Accept: application/x-ndjson"""
+    profile = get_user_profile(db, current_user.id)
     
     if not profile:
         raise HTTPException(
@@ -159,6 +197,12 @@ async def get_user_videos(
             detail="TikTok profile not found"
         )
     
+    if wants_ndjson(request):
+        stmt = select(*VIDEO_RESPONSE_COLUMNS).where(
+            TikTokVideo.profile_id == profile.id
+        ).order_by(TikTokVideo.posted_at.desc()).limit(limit)
+        return ndjson_response(TikTokVideoResponse(**row._mapping) for row in stream_rows(stmt))
+    
     videos = db.query(TikTokVideo).filter(
         TikTokVideo.profile_id == profile.id
     ).order_by(TikTokVideo.posted_at.desc()).limit(limit).all()
@@ -180,14 +224,11 @@ async def get_user_videos(
 
 @router.post("/refresh-profile")
 async def refresh_profile_data(
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Refresh user's TikTok profile data"""
-    profile = db.query(TikTokProfile).filter(
-        TikTokProfile.user_id == current_user.id
-    ).first()
+    profile = get_user_profile(db, current_user.id)
     
     if not profile:
         raise HTTPException(
@@ -195,61 +236,24 @@ async def refresh_profile_data(
             detail="TikTok profile not found"
         )
     
-    # Update profile data in background
-    background_tasks.add_task(update_profile_data, profile.id, db)
+    # Update profile data on a worker
+    job = await run_in_threadpool(ScrapeJobQueue(db).enqueue, ScrapeJob.PROFILE_UPDATE, profile, current_user.id, priority=REFRESH)
     
-    return {"message": "Profile refresh started"}
+    return {"message": "Profile refresh started", "job_id": job.id}
 
-async def update_profile_data(profile_id: int, db: Session):
-    """Background task to update profile data"""
-    profile = db.query(TikTokProfile).filter(TikTokProfile.id == profile_id).first()
-    if not profile:
-        return
-    
-    scraper = TikTokScraper()
-    try:
-        profile_data = await scraper.get_profile_data(profile.tiktok_username)
-        if profile_data:
-            profile.display_name = profile_data.get('display_name')
-            profile.bio = profile_data.get('bio')
-            profile.follower_count = profile_data.get('follower_count')
-            profile.following_count = profile_data.get('following_count')
-            profile.likes_count = profile_data.get('likes_count')
-            profile.video_count = profile_data.get('video_count')
-            profile.avatar_url = profile_data.get('avatar_url')
-            profile.is_verified = profile_data.get('is_verified', False)
-            profile.last_scraped_at = datetime.utcnow()
-            
-            db.commit()
-    finally:
-        await scraper.close()
-
-async def scrape_recent_videos(profile_id: int, username: str, db: Session):
-    """Background task to scrape recent videos"""
-    scraper = TikTokScraper()
-    try:
-        videos_data = await scraper.get_recent_videos(username, limit=20)
-        
-        for video_data in videos_data:
-            # Extract video ID from URL
-            video_id = video_data['video_url'].split('/')[-1]
-            
-            # Check if video already exists
-            existing_video = db.query(TikTokVideo).filter(
-                TikTokVideo.video_id == video_id
-            ).first()
-            
-            if not existing_video:
-                new_video = TikTokVideo(
-                    profile_id=profile_id,
-                    video_id=video_id,
-                    video_url=video_data['video_url'],
-                    description=video_data.get('description'),
-                    view_count=video_data.get('view_count'),
-                    last_scraped_at=datetime.utcnow()
-                )
-                db.add(new_video)
-        
-        db.commit()
-    finally:
-        await scraper.close()
+@router.get("/jobs/{job_id}", response_model=ScrapeJobResponse)
+async def get_scrape_job(
+    job_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get the status and progress of a scrape job"""
+    job = ScrapeJobQueue(db).get_job(job_id, current_user.id)
+    
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Scrape job not found"
+        )
+    
+    return _job_response(job)
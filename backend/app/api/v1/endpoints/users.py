@@ -6,6 +6,7 @@ from typing import Optional
 from app.db.session import get_db
 from app.models.user import User
 from app.core.security import verify_token
+from app.core.niches import resolve_niche
 
 router = APIRouter()
 security = HTTPBearer()
@@ -78,6 +79,7 @@ async def complete_onboarding(
     current_user.tiktok_username = onboarding_data.tiktok_username.lstrip('@')
     current_user.offer_description = onboarding_data.offer_description
     current_user.target_audience = onboarding_data.target_audience
+    current_user.niche = resolve_niche(onboarding_data.target_audience)
     
     db.commit()
     db.refresh(current_user)
@@ -112,6 +114,7 @@ async def update_user(
     
     if user_update.target_audience is not None:
         current_user.target_audience = user_update.target_audience
+        current_user.niche = resolve_niche(user_update.target_audience)
     
     if user_update.weekly_updates_enabled is not None:
         current_user.weekly_updates_enabled = user_update.weekly_updates_enabled
@@ -0,0 +1,48 @@
+"""
+Batch analytics entry point.
+
+Recomputes today's analytics snapshot for every profile in a process pool:
+    python -m app.batch --workers 8
+An interrupted run resumes from BATCH_ANALYTICS_CHECKPOINT unless --restart
+is given. With --recommendations it instead recomputes every similarity
+vector, replaces every user's creator recommendations and purges old
+inactive ones:
+    python -m app.batch --recommendations
+app.scheduler also runs both nightly at BATCH_ANALYTICS_TIME.
+"""
+import argparse
+import json
+import logging
+from app.db import base  # noqa: F401 - registers every model with the mappers
+from app.db.session import SessionLocal, engine
+from app.services.analytics_batch import AnalyticsBatchPipeline
+from app.services.creator_similarity import CreatorRecommender, CreatorVectorStore, purge_inactive_recommendations
+
+def refresh_recommendations() -> dict:
+    db = SessionLocal()
+    try:
+        vectors = CreatorVectorStore(db).refresh()
+        stats = CreatorRecommender(db).refresh_all()
+        return {"vectors": vectors, **stats, "purged": purge_inactive_recommendations(db)}
+    finally:
+        db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute analytics snapshots for all profiles")
+    parser.add_argument("--workers", type=int, help="Pool processes (default BATCH_ANALYTICS_WORKERS or CPU count)")
+    parser.add_argument("--chunk-size", type=int, help="Profiles per chunk")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    parser.add_argument("--recommendations", action="store_true",
+                        help="Refresh similarity vectors and creator recommendations instead")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.recommendations:
+        print(json.dumps(refresh_recommendations(), indent=2))
+        return
+
+    pipeline = AnalyticsBatchPipeline(engine, workers=args.workers, chunk_size=args.chunk_size)
+    print(json.dumps(pipeline.run(resume=not args.restart), indent=2))
+
+if __name__ == "__main__":
+    main()
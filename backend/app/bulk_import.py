@@ -0,0 +1,57 @@
+"""
+Bulk import entry point.
+
+Loads historical videos or daily analytics snapshots for one creator:
+    python -m app.bulk_import --username some_creator --dataset videos --input videos.csv
+Formats are csv, jsonl and json (an array of objects), guessed from the file
+extension unless --format is given. Rows already stored are skipped, so an
+interrupted import can be rerun. The same import is served by
+POST /api/v1/import/{dataset}.
+"""
+import argparse
+import dataclasses
+import json
+import logging
+import os
+import sys
+from app.db import base  # noqa: F401 - registers every model with the mappers
+from app.db.session import SessionLocal
+from app.models.tiktok_profile import TikTokProfile
+from app.services.data_import import CSV, DATASETS, FORMATS, IMPORT_CHUNK_SIZE, BulkImporter
+
+def main():
+    parser = argparse.ArgumentParser(description="Import a creator's historical data from CSV or JSON")
+    parser.add_argument("--username", required=True, help="TikTok username of the profile")
+    parser.add_argument("--dataset", choices=sorted(DATASETS), default="videos")
+    parser.add_argument("--input", help="File to read (default stdin)")
+    parser.add_argument("--format", choices=FORMATS, help="Input format (default from the file extension, else csv)")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE, help="Rows validated and written per batch")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    fmt = args.format
+    if fmt is None:
+        extension = os.path.splitext(args.input or "")[1].lstrip(".").lower()
+        fmt = {"ndjson": "jsonl"}.get(extension, extension) if extension in FORMATS + ("ndjson",) else CSV
+
+    db = SessionLocal()
+    try:
+        profile = db.query(TikTokProfile).filter(
+            TikTokProfile.tiktok_username == args.username.lstrip('@')
+        ).order_by(TikTokProfile.id).first()
+        if profile is None:
+            parser.error(f"No profile @{args.username}")
+
+        stream = open(args.input, encoding="utf-8-sig", newline="") if args.input else sys.stdin
+        try:
+            report = BulkImporter(db, chunk_size=args.chunk_size).run(profile, args.dataset, stream, fmt)
+        finally:
+            if args.input:
+                stream.close()
+    finally:
+        db.close()
+
+    print(json.dumps(dataclasses.asdict(report), indent=2))
+
+if __name__ == "__main__":
+    main()
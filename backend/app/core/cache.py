@@ -0,0 +1,326 @@
+"""
+Pluggable cache shared by all worker processes.
+
+Backends:
+  - "redis":  Redis at settings.REDIS_URL, shared across containers
+  - "shm":    files on a tmpfs (/dev/shm), shared by the workers of one container
+  - "memory": per-process dict, for local development and tests
+
+Values must be JSON-serializable. Select the backend with CACHE_BACKEND.
+"""
+import errno
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend:
+    """Interface every cache backend implements"""
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        raise NotImplementedError
+
+    def add(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        """Store the value only if the key is absent; return True if it was stored"""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def get_or_set(self, key: str, compute: Callable[[], Any], ttl: Optional[int] = None) -> Any:
+        """Return the cached value, computing and storing it on a miss"""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            if value is not None:
+                self.set(key, value, ttl)
+        return value
+
+
+class MemoryCache(CacheBackend):
+    def __init__(self):
+        self._data: Dict[str, Tuple[Optional[float], Any]] = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key: str) -> Optional[Tuple[Optional[float], Any]]:
+        entry = self._data.get(key)
+        if entry is not None and entry[0] is not None and entry[0] < time.time():
+            del self._data[key]
+            return None
+        return entry
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._live(key)
+            return entry[1] if entry else None
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        with self._lock:
+            self._data[key] = (time.time() + ttl if ttl else None, value)
+
+    def add(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        with self._lock:
+            if self._live(key) is not None:
+                return False
+            self._data[key] = (time.time() + ttl if ttl else None, value)
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+
+# Seconds between sweeps of the shm cache directory by each process
+SWEEP_INTERVAL = 60
+# Expiry stamped on shm entries without a TTL, so they sort after every TTL'd one
+NO_EXPIRY_SECONDS = 10 * 365 * 86400
+
+
+class SharedMemoryCache(CacheBackend):
+    """
+    One file per key on a tmpfs directory. Writes go to a temp file and are
+    renamed into place, so readers in other processes never see partial data.
+
+    Each file's mtime is its expiry time, so a sweep (every SWEEP_INTERVAL
+    seconds per process) finds expired entries from stat() alone and, while
+    the directory holds more than max_bytes, evicts the entries expiring
+    soonest. A write that finds the tmpfs full (Docker's /dev/shm is 64 MB)
+    sweeps and retries once; any other failure is logged and the value is
+    just not cached.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None):
+        if directory is None:
+            base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+            directory = os.path.join(base, "tiktok-compass-cache")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._swept_at = 0.0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest())
+
+    @staticmethod
+    def _expires_at(ttl: Optional[int]) -> Optional[float]:
+        return time.time() + ttl if ttl else None
+
+    @staticmethod
+    def _encode(value: Any, expires_at: Optional[float]) -> bytes:
+        return json.dumps({"expires_at": expires_at, "value": value}).encode()
+
+    @staticmethod
+    def _stamp(path: str, expires_at: Optional[float]) -> None:
+        stamp = expires_at if expires_at is not None else time.time() + NO_EXPIRY_SECONDS
+        os.utime(path, (stamp, stamp))
+
+    def _read(self, path: str) -> Optional[Dict]:
+        try:
+            with open(path, "rb") as f:
+                entry = json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+        if entry["expires_at"] is not None and entry["expires_at"] < time.time():
+            return None
+        return entry
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._read(self._path(key))
+        return entry["value"] if entry else None
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        self._write(key, lambda: self._replace(key, value, ttl), None)
+
+    def _replace(self, key: str, value: Any, ttl: Optional[int]) -> None:
+        expires_at = self._expires_at(ttl)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(self._encode(value, expires_at))
+            self._stamp(tmp_path, expires_at)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def add(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        # Callers use add() to claim work; if the claim can't be stored, let them do it
+        return self._write(key, lambda: self._create(key, value, ttl), True)
+
+    def _create(self, key: str, value: Any, ttl: Optional[int]) -> bool:
+        path = self._path(key)
+        if os.path.exists(path) and self._read(path) is None:
+            # Expired entry - clear it so the exclusive create below can win
+            self._unlink(path)
+        try:
+            fd, expires_at = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL), self._expires_at(ttl)
+        except FileExistsError:
+            return False
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(self._encode(value, expires_at))
+            self._stamp(path, expires_at)
+        except OSError:
+            self._unlink(path)
+            raise
+        return True
+
+    def _write(self, key: str, write: Callable[[], Any], failed: Any) -> Any:
+        """Run a write, sweeping first when due and once more if the tmpfs is full"""
+        if time.monotonic() - self._swept_at >= SWEEP_INTERVAL:
+            self.sweep()
+        try:
+            return write()
+        except OSError as e:
+            if e.errno == errno.ENOSPC:
+                self.sweep()
+                try:
+                    return write()
+                except OSError as retry_error:
+                    e = retry_error
+            logger.warning(f"Could not cache {key}: {e}")
+            return failed
+
+    def sweep(self) -> None:
+        """Delete expired entries, then the soonest-expiring ones while above max_bytes"""
+        self._swept_at = time.monotonic()
+        now = time.time()
+        live, total = [], 0
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError as e:
+            logger.warning(f"Could not sweep cache directory {self.directory}: {e}")
+            return
+        for entry in entries:
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            if entry.name.startswith(".tmp-"):
+                # Left behind by a writer that died; a live one renames it within moments
+                if stat.st_ctime < now - SWEEP_INTERVAL:
+                    self._unlink(entry.path)
+            elif stat.st_mtime < now:
+                self._unlink(entry.path)
+            else:
+                # Allocated size: tmpfs charges whole pages even for tiny entries
+                size = getattr(stat, "st_blocks", 0) * 512 or stat.st_size
+                live.append((stat.st_mtime, size, entry.path))
+                total += size
+        if self.max_bytes and total > self.max_bytes:
+            # Evict down to 80% so the next writes don't immediately trigger another eviction
+            live.sort()
+            for _, size, path in live:
+                if total <= self.max_bytes * 0.8:
+                    break
+                self._unlink(path)
+                total -= size
+
+    @staticmethod
+    def _unlink(path: str) -> None:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    def delete(self, key: str) -> None:
+        self._unlink(self._path(key))
+
+
+class RedisCache(CacheBackend):
+    """
+    Redis at the given URL. While Redis is unreachable every read is a miss
+    and writes are logged and dropped, so requests fall back to computing.
+    """
+
+    def __init__(self, url: str):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self._errors = redis.RedisError
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = self.client.get(key)
+        except self._errors as e:
+            logger.warning(f"Could not read {key} from the cache: {e}")
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        try:
+            self.client.set(key, json.dumps(value), ex=ttl)
+        except self._errors as e:
+            logger.warning(f"Could not cache {key}: {e}")
+
+    def add(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        try:
+            return bool(self.client.set(key, json.dumps(value), ex=ttl, nx=True))
+        except self._errors as e:
+            # As with shm: callers use add() to claim work; if the claim can't be stored, let them do it
+            logger.warning(f"Could not cache {key}: {e}")
+            return True
+
+    def delete(self, key: str) -> None:
+        try:
+            self.client.delete(key)
+        except self._errors as e:
+            logger.warning(f"Could not delete {key} from the cache: {e}")
+
+
+_cache: Optional[CacheBackend] = None
+_cache_lock = threading.Lock()
+
+
+def create_cache(backend: str) -> CacheBackend:
+    if backend == "redis":
+        return RedisCache(settings.REDIS_URL)
+    if backend == "shm":
+        return SharedMemoryCache(settings.CACHE_DIR, settings.CACHE_MAX_BYTES)
+    if backend == "memory":
+        return MemoryCache()
+    raise ValueError(f"Unknown CACHE_BACKEND: {backend}")
+
+
+def get_cache() -> CacheBackend:
+    """Process-wide cache instance, created on first use"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = create_cache(settings.CACHE_BACKEND)
+    return _cache
+
+
+# Versions of scopes nobody touched for this long are dropped; that only
+# retires the cache entries keyed by them, which expire sooner anyway
+DATA_VERSION_TTL = 7 * 86400
+
+
+def _data_version_key(scope: str) -> str:
+    return f"data-version:{scope}"
+
+
+def data_version(scope: str) -> str:
+    """
+    Opaque token for the current version of some data (e.g. "profile:42").
+    Cache keys that embed it go stale as soon as bump_data_version runs;
+    a lost token is simply replaced, which also retires the old keys.
+    """
+    return get_cache().get_or_set(_data_version_key(scope), lambda: f"{time.time_ns():x}", DATA_VERSION_TTL)
+
+
+def bump_data_version(scope: str) -> None:
+    get_cache().set(_data_version_key(scope), f"{time.time_ns():x}", DATA_VERSION_TTL)
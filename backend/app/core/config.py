@@ -1,41 +1,40 @@
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
 from typing import Optional
 import os
 
-# Fix malformed DATABASE_URL that starts with https://
-# This logic must be outside the Settings class to avoid Pydantic validation
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./test.db")
+DEFAULT_DATABASE_URL = "sqlite:///./test.db"
 
-# Debug: Print original DATABASE_URL
-print(f"DEBUG: Original DATABASE_URL = {DATABASE_URL}")
+def resolve_database_url(database_url: Optional[str]) -> str:
+    """
+    Return a usable database URL.
 
-# Check if DATABASE_URL is malformed (starts with https://)
-if DATABASE_URL and DATABASE_URL.startswith("https://"):
-    print("DEBUG: Detected malformed DATABASE_URL starting with https://, constructing from Railway variables...")
+    Railway sometimes exposes DATABASE_URL as an https:// link; in that case the
+    URL is rebuilt from the separate PG* variables. Only reads the environment;
+    nothing is printed so importing the config stays side-effect free.
+    """
+    if not database_url:
+        return DEFAULT_DATABASE_URL
     
-    # Railway provides database variables separately, construct proper URL
-    PGHOST = os.getenv("PGHOST", "localhost")
-    PGUSER = os.getenv("PGUSER", "postgres")
-    PGPASSWORD = os.getenv("PGPASSWORD", "")
-    PGDATABASE = os.getenv("PGDATABASE", "postgres")
-    PGPORT = os.getenv("PGPORT", "5432")
+    if not database_url.startswith("https://"):
+        return database_url
     
     # URL encode password for special characters
     from urllib.parse import quote_plus
-    encoded_password = quote_plus(PGPASSWORD)
-    
-    DATABASE_URL = f"postgresql://{PGUSER}:{encoded_password}@{PGHOST}:{PGPORT}/{PGDATABASE}"
-    print(f"DEBUG: Constructed DATABASE_URL = {DATABASE_URL}")
-else:
-    print("DEBUG: DATABASE_URL looks valid, using as-is")
+    password = quote_plus(os.getenv("PGPASSWORD", ""))
+    user = os.getenv("PGUSER", "postgres")
+    host = os.getenv("PGHOST", "localhost")
+    port = os.getenv("PGPORT", "5432")
+    database = os.getenv("PGDATABASE", "postgres")
+    return f"postgresql://{user}:{password}@{host}:{port}/{database}"
 
 class Settings(BaseSettings):
     # API Configuration
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "TikTok Creator Compass"
     
-    # Database - use the corrected DATABASE_URL
-    DATABASE_URL: Optional[str] = DATABASE_URL
+    # Database - malformed Railway URLs are corrected by the validator below
+    DATABASE_URL: Optional[str] = DEFAULT_DATABASE_URL
     
     # Security - make optional with fallback
     SECRET_KEY: Optional[str] = os.getenv("SECRET_KEY", "fallback-secret-key-for-health-checks")
@@ -50,14 +49,82 @@ class Settings(BaseSettings):
     # Redis - make optional with fallback
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
     
+    # Scrape job queue - broker defaults to REDIS_URL; "memory://" or "filesystem://" for tests
+    CELERY_BROKER_URL: Optional[str] = None
+    CELERY_FILESYSTEM_DIR: str = "/tmp/tiktok-compass-broker"  # used by the filesystem:// broker
+    SCRAPE_JOB_MAX_RETRIES: int = 3
+    SCRAPE_MAX_ACTIVE_JOBS_PER_USER: int = 2  # further jobs wait as "deferred" (interactive jobs exempt, scheduled jobs not counted)
+    
+    # Scrape scheduler - concurrent scrapes per process, some held back for interactive work
+    SCRAPE_CONCURRENCY: int = 4
+    SCRAPE_INTERACTIVE_RESERVED: int = 1
+    
+    # Periodic refresh planner (python -m app.scheduler)
+    REFRESH_SCRAPES_PER_HOUR: int = 120  # global budget of page loads by scheduled scrape jobs
+    REFRESH_PLAN_INTERVAL_MINUTES: int = 10
+    REFRESH_MIN_INTERVAL_HOURS: float = 1.0  # never rescrape faster than this
+    REFRESH_MAX_INTERVAL_HOURS: float = 168.0  # dormant profiles still refresh weekly
+    REFRESH_BATCH_SIZE: int = 1000
+    
+    # Nightly batch analytics (python -m app.batch, or scheduled by app.scheduler)
+    BATCH_ANALYTICS_TIME: str = "03:00"  # daily start time, scheduler's local clock
+    BATCH_ANALYTICS_WORKERS: Optional[int] = None  # processes, defaults to CPU count
+    BATCH_ANALYTICS_CHUNK_SIZE: int = 500  # profiles per chunk
+    BATCH_ANALYTICS_CHECKPOINT: str = "./analytics-batch-checkpoint.json"
+    
+    # Niche best-practices insights, recomputed on the "niche" worker queue
+    NICHE_INSIGHTS_REFRESH_HOURS: int = 24
+    NICHE_INSIGHTS_CACHE_TTL: int = 3600  # seconds an insight is served from cache before re-reading the table
+    NICHE_ANALYSIS_CONCURRENCY: int = 3  # creators scraped at once per niche
+    NICHE_ANALYSIS_TIME_LIMIT: float = 300.0  # seconds; finished creators are kept, the rest dropped
+    
+    # Creator similarity index behind recommendations
+    SIMILARITY_INDEX_TTL: int = 3600  # seconds a process keeps its vector matrix before reloading
+    SIMILARITY_ANN_MIN_PROFILES: int = 200000  # approximate (faiss HNSW) search from this many vectors, if installed
+    RECOMMENDATIONS_PER_USER: int = 10
+    RECOMMENDATION_RETENTION_DAYS: int = 30  # deactivated recommendations are deleted after this
+    
+    # Follower interactions behind engaged leads (interaction_scrape jobs)
+    INTERACTION_SCRAPE_VIDEOS: int = 5  # most recent videos whose comments are checked
+    INTERACTION_COMMENTS_PER_VIDEO: int = 50
+    INTERACTION_PROFILE_LOOKUPS: int = 10  # new commenters per job whose profile is scraped for lead scoring
+    
+    # Shared cache - "shm" (per-container tmpfs), "redis" (cross-container) or "memory" (per-process).
+    # Celery workers hand their results to the API through it, so they require "redis" (see app.worker)
+    CACHE_BACKEND: str = "shm"
+    CACHE_DIR: Optional[str] = None
+    CACHE_MAX_BYTES: int = 32 * 1024 * 1024  # shm backend evicts above this (Docker's /dev/shm is 64 MB)
+    SCRAPE_CACHE_TTL: int = 900  # seconds a scraped profile/video list is reused
+    ANALYTICS_CACHE_TTL: int = 300  # seconds computed analytics are served from cache
+    ANALYTICS_PRECOMPUTED_TTL: int = 86400  # recomputed on every data change, so kept longer
+    ANALYTICS_RECOMPUTE_DEBOUNCE: int = 10  # seconds to collapse repeated change events per profile
+    
+    # Production server (serve.py)
+    PORT: int = 8000
+    WEB_CONCURRENCY: Optional[int] = None  # worker processes, defaults to CPU count
+    MAX_REQUESTS: int = 1000  # recycle a worker after this many requests (0 disables)
+    MAX_REQUESTS_JITTER: int = 100
+    GRACEFUL_TIMEOUT: int = 30
+    WORKER_TIMEOUT: int = 120
+    METRICS_DIR: Optional[str] = None  # where workers merge /metrics series; serve.py defaults it to a temp dir
+    
     # Environment
     ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
     DEBUG: bool = os.getenv("DEBUG", "true").lower() == "true"
     
+    # Observability - allow per-request timing breakdowns via the X-Debug-Timing header.
+    # Off by default: the breakdown exposes internal service and query timings to any client
+    DEBUG_TIMING_HEADER_ENABLED: bool = os.getenv("DEBUG_TIMING_HEADER_ENABLED", "false").lower() == "true"
+    
     # CORS
     FRONTEND_URL: str = os.getenv("FRONTEND_URL", "http://localhost:3000")
     ALLOWED_HOSTS: list = ["*"]
     
+    @field_validator("DATABASE_URL")
+    @classmethod
+    def _resolve_database_url(cls, value: Optional[str]) -> str:
+        return resolve_database_url(value)
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -0,0 +1,32 @@
+"""
+Hashtag and mention parsing for video descriptions.
+
+Tags are normalized to lowercase without the leading "#"/"@" and
+de-duplicated in order of first appearance. Used when scraped videos are
+stored (see app.services.hashtag_index) and by the backfill migration.
+"""
+from typing import List, Optional, Tuple
+import re
+
+HASHTAG = "hashtag"
+MENTION = "mention"
+
+# A "#" or "@" that starts a token; "a#b" and emails are not tags
+_HASHTAGS = re.compile(r"(?<![\w#@])#(\w+)")
+# TikTok usernames allow letters, digits, "_" and "."
+_MENTIONS = re.compile(r"(?<![\w#@.])@([\w.]+)")
+
+# Longer tags are spam or concatenated text, not something to report on
+MAX_TAG_LENGTH = 100
+
+def _unique(tags: List[str]) -> List[str]:
+    return list(dict.fromkeys(tag for tag in tags if tag and len(tag) <= MAX_TAG_LENGTH))
+
+def extract_tags(text: Optional[str]) -> Tuple[List[str], List[str]]:
+    """(hashtags, mentions) found in the text"""
+    if not text:
+        return [], []
+    text = text.lower()
+    hashtags = _unique(_HASHTAGS.findall(text))
+    mentions = _unique([mention.rstrip(".") for mention in _MENTIONS.findall(text)])
+    return hashtags, mentions
@@ -0,0 +1,75 @@
+"""
+Multi-pattern keyword matcher.
+
+Compiles a table of labelled terms once, then finds every term in a text in
+a single pass: the text is split into words by one regex and the words are
+looked up in a hash table of terms, so the cost doesn't grow with the number
+of terms. Matching is case-insensitive and whole-word: "day" matches "Days"
+and "#day" but not "today". Single symbols such as emojis match anywhere.
+Terms spanning several tokens (phrases, multi-codepoint emojis) fall back to
+one combined regex.
+"""
+from typing import Dict, Iterable, List, Mapping, Set, Tuple
+import re
+
+_WORDS = re.compile(r"\w+")
+_PLURAL_SUFFIXES = ("s", "es")
+
+class KeywordMatcher:
+    def __init__(self, table: Mapping[str, Iterable[str]]):
+        """table maps each label to the terms that signal it; a term may serve several labels"""
+        labels_by_term: Dict[str, List[str]] = {}
+        for label, terms in table.items():
+            for term in terms:
+                labels = labels_by_term.setdefault(term.lower(), [])
+                if label not in labels:
+                    labels.append(label)
+
+        self._words: Dict[str, Tuple[str, ...]] = {}
+        self._symbols: Dict[str, Tuple[str, ...]] = {}
+        phrases: Dict[str, Tuple[str, ...]] = {}
+        for term, labels in labels_by_term.items():
+            if _WORDS.fullmatch(term):
+                self._add_word(term, tuple(labels))
+                if term[-1].isalpha():
+                    for suffix in _PLURAL_SUFFIXES:
+                        self._add_word(term + suffix, tuple(labels))
+            elif len(term) == 1 and not term.isspace():
+                self._symbols[term] = tuple(labels)
+            else:
+                phrases[term] = tuple(labels)
+
+        self._phrases = phrases
+        self._phrase_pattern = re.compile(
+            "|".join(self._phrase_regex(term) for term in sorted(phrases, key=len, reverse=True))
+        ) if phrases else None
+
+    @staticmethod
+    def _phrase_regex(term: str) -> str:
+        # Whole words at the edges, like single-word terms
+        pattern = f"(?:{re.escape(term)})"
+        if re.match(r"\w", term):
+            pattern = r"(?<!\w)" + pattern
+        if re.search(r"\w$", term):
+            pattern += r"(?!\w)"
+        return pattern
+
+    def _add_word(self, word: str, labels: Tuple[str, ...]):
+        existing = self._words.get(word, ())
+        self._words[word] = existing + tuple(label for label in labels if label not in existing)
+
+    def matches(self, text: str) -> Set[str]:
+        """Labels with at least one term in the text"""
+        found: Set[str] = set()
+        if not text:
+            return found
+        text = text.lower()
+        for word in self._words.keys() & _WORDS.findall(text):
+            found.update(self._words[word])
+        for symbol, labels in self._symbols.items():
+            if symbol in text:
+                found.update(labels)
+        if self._phrase_pattern is not None:
+            for match in self._phrase_pattern.finditer(text):
+                found.update(self._phrases[match.group()])
+        return found
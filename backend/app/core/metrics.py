@@ -0,0 +1,488 @@
+"""
+In-process request metrics.
+
+Records per-route latency histograms, database query counts/time and the time
+spent inside instrumented services (TikTokScraper, AnalyticsEngine), and renders
+them in the Prometheus text exposition format for the /metrics endpoint.
+
+Under serve.py every worker process has its own registry, so the registry is
+shared through a directory (METRICS_DIR): each process writes a snapshot of
+its series there at most every FLUSH_INTERVAL seconds and on exit, and
+/metrics, whichever worker serves it, sums the snapshots of all processes.
+Snapshots of recycled workers are kept, so counters don't drop when
+MAX_REQUESTS restarts a worker. Collector series that describe one process
+(the scrape scheduler) carry a worker label instead.
+"""
+import atexit
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: snapshots are summed but never folded
+    fcntl = None
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+# Request header that asks for a timing breakdown in the response
+DEBUG_TIMING_HEADER = "X-Debug-Timing"
+_DEBUG_TIMING_HEADER_RAW = DEBUG_TIMING_HEADER.lower().encode()
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+# Route label used for work that happens outside of an HTTP request
+BACKGROUND_ROUTE = "background"
+
+# Seconds between snapshots of a worker's series in the shared directory
+FLUSH_INTERVAL = 1.0
+
+logger = logging.getLogger(__name__)
+
+
+class RequestTimings:
+    """Mutable timing accumulator for the request currently being served"""
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.service_time: Dict[str, float] = defaultdict(float)
+        self.service_calls: Dict[str, int] = defaultdict(int)
+
+    def server_timing(self, total: float) -> str:
+        """Format the breakdown as a Server-Timing header value (durations in ms)"""
+        parts = [
+            f"total;dur={total * 1000:.1f}",
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.db_queries} queries"',
+        ]
+        for service, seconds in sorted(self.service_time.items()):
+            parts.append(
+                f'{service};dur={seconds * 1000:.1f};desc="{self.service_calls[service]} calls"'
+            )
+        return ", ".join(parts)
+
+
+_current_timings: contextvars.ContextVar[Optional[RequestTimings]] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+
+def start_request() -> Tuple[RequestTimings, contextvars.Token]:
+    """Begin collecting timings for a new request"""
+    timings = RequestTimings()
+    return timings, _current_timings.set(timings)
+
+
+def end_request(token: contextvars.Token) -> None:
+    _current_timings.reset(token)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current_timings.get()
+
+
+class Histogram:
+    def __init__(self, buckets: Iterable[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _labels(**labels) -> str:
+    escaped = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        escaped.append(f'{key}="{value}"')
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_bound(bound: float) -> str:
+    return str(int(bound)) if float(bound).is_integer() else repr(bound)
+
+
+class MetricsRegistry:
+    """Thread-safe store for all metrics exposed on /metrics"""
+
+    def __init__(self):
+        self._collectors: List[Callable[[], Iterable[str]]] = []
+        self._shared_dir: Optional[str] = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self._lock = threading.Lock()
+        self.request_latency: Dict[Tuple[str, str, str], Histogram] = {}
+        self.request_queries: Dict[Tuple[str, str], Histogram] = {}
+        self.db_queries: Dict[str, int] = defaultdict(int)
+        self.db_time: Dict[str, float] = defaultdict(float)
+        self.service_calls: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.service_time: Dict[Tuple[str, str], float] = defaultdict(float)
+        self._flushed_at = 0.0
+        self._flush_timer: Optional[threading.Timer] = None
+
+    def share(self, directory: str) -> None:
+        """Aggregate with every other process sharing directory (one per server worker)"""
+        if self._shared_dir is not None:
+            return
+        os.makedirs(directory, exist_ok=True)
+        self._shared_dir = directory
+        # A forked worker starts from zero; what the parent recorded is in the parent's snapshot
+        os.register_at_fork(after_in_child=self._reset)
+        atexit.register(self.flush)
+
+    @property
+    def shared(self) -> bool:
+        return self._shared_dir is not None
+
+    def _snapshot_path(self) -> str:
+        return os.path.join(self._shared_dir, f"metrics-{os.getpid()}.json")
+
+    def observe_request(self, method: str, route: str, status_code: int,
+                        duration: float, timings: RequestTimings) -> None:
+        with self._lock:
+            key = (method, route, str(status_code))
+            if key not in self.request_latency:
+                self.request_latency[key] = Histogram(LATENCY_BUCKETS)
+            self.request_latency[key].observe(duration)
+
+            if (method, route) not in self.request_queries:
+                self.request_queries[(method, route)] = Histogram(QUERY_COUNT_BUCKETS)
+            self.request_queries[(method, route)].observe(timings.db_queries)
+
+            self.db_queries[route] += timings.db_queries
+            self.db_time[route] += timings.db_time
+            for service, seconds in timings.service_time.items():
+                self.service_calls[(route, service)] += timings.service_calls[service]
+                self.service_time[(route, service)] += seconds
+        self._maybe_flush()
+
+    def observe_background(self, db_queries: int = 0, db_time: float = 0.0,
+                           service: Optional[str] = None, seconds: float = 0.0) -> None:
+        """Record work that ran outside of an HTTP request"""
+        with self._lock:
+            self.db_queries[BACKGROUND_ROUTE] += db_queries
+            self.db_time[BACKGROUND_ROUTE] += db_time
+            if service:
+                self.service_calls[(BACKGROUND_ROUTE, service)] += 1
+                self.service_time[(BACKGROUND_ROUTE, service)] += seconds
+        self._maybe_flush()
+
+    def _maybe_flush(self) -> None:
+        if self._shared_dir is None:
+            return
+        wait = self._flushed_at + FLUSH_INTERVAL - time.monotonic()
+        if wait <= 0:
+            self.flush()
+        elif self._flush_timer is None:
+            # An idle worker still publishes its last requests
+            self._flush_timer = threading.Timer(wait, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def flush(self) -> None:
+        """Write this process's series to the shared directory (atomically replacing its last snapshot)"""
+        if self._shared_dir is None:
+            return
+        with self._lock:
+            self._flushed_at = time.monotonic()
+            self._flush_timer = None
+            snapshot = self._snapshot()
+        path = self._snapshot_path()
+        try:
+            with open(f"{path}.tmp", "w") as f:
+                json.dump(snapshot, f)
+            os.replace(f"{path}.tmp", path)
+        except OSError as e:
+            logger.warning(f"Could not write metrics snapshot {path}: {e}")
+
+    def _snapshot(self) -> Dict:
+        def histogram(hist: Histogram) -> Dict:
+            return {"counts": hist.counts, "sum": hist.sum, "count": hist.count}
+
+        return {
+            "request_latency": [[*key, histogram(hist)] for key, hist in self.request_latency.items()],
+            "request_queries": [[*key, histogram(hist)] for key, hist in self.request_queries.items()],
+            "db_queries": list(self.db_queries.items()),
+            "db_time": list(self.db_time.items()),
+            "service_calls": [[*key, value] for key, value in self.service_calls.items()],
+            "service_time": [[*key, value] for key, value in self.service_time.items()],
+        }
+
+    def _merge(self, snapshot: Dict) -> None:
+        def histogram(series: Dict, key: Tuple, buckets: Iterable[float], data: Dict) -> None:
+            if key not in series:
+                series[key] = Histogram(buckets)
+            hist = series[key]
+            hist.counts = [a + b for a, b in zip(hist.counts, data["counts"])]
+            hist.sum += data["sum"]
+            hist.count += data["count"]
+
+        for *key, data in snapshot["request_latency"]:
+            histogram(self.request_latency, tuple(key), LATENCY_BUCKETS, data)
+        for *key, data in snapshot["request_queries"]:
+            histogram(self.request_queries, tuple(key), QUERY_COUNT_BUCKETS, data)
+        for route, count in snapshot["db_queries"]:
+            self.db_queries[route] += count
+        for route, seconds in snapshot["db_time"]:
+            self.db_time[route] += seconds
+        for route, service, count in snapshot["service_calls"]:
+            self.service_calls[(route, service)] += count
+        for route, service, seconds in snapshot["service_time"]:
+            self.service_time[(route, service)] += seconds
+
+    def _aggregate(self) -> "MetricsRegistry":
+        """
+        A registry holding the sum of every process's latest snapshot. Snapshots
+        of exited processes are folded into one retired snapshot on the way, so
+        recycling workers doesn't grow the directory.
+        """
+        self.flush()
+        total, retired = MetricsRegistry(), MetricsRegistry()
+        retired_path = os.path.join(self._shared_dir, "retired.json")
+        with open(os.path.join(self._shared_dir, ".lock"), "w") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            exited = []
+            for name in os.listdir(self._shared_dir):
+                if name != "retired.json" and not (name.startswith("metrics-") and name.endswith(".json")):
+                    continue
+                path = os.path.join(self._shared_dir, name)
+                try:
+                    with open(path) as f:
+                        snapshot = json.load(f)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Skipping unreadable metrics snapshot {name}: {e}")
+                    continue
+                total._merge(snapshot)
+                if name == "retired.json" or not _process_alive(int(name[len("metrics-"):-len(".json")])):
+                    retired._merge(snapshot)
+                    exited.append(path)
+            if fcntl is not None and (len(exited) > 1 or (exited and exited[0] != retired_path)):
+                with open(f"{retired_path}.tmp", "w") as f:
+                    json.dump(retired._snapshot(), f)
+                os.replace(f"{retired_path}.tmp", retired_path)
+                for path in exited:
+                    if path != retired_path:
+                        os.remove(path)
+        return total
+
+    def add_collector(self, collector: Callable[[], Iterable[str]]) -> None:
+        """Register a callable that yields extra exposition lines at scrape time"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = self._aggregate()._render_series() if self.shared else self._render_series()
+        for collector in list(self._collectors):
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+    def _render_series(self) -> List[str]:
+        lines: List[str] = []
+        with self._lock:
+            lines.append("# HELP http_request_duration_seconds Request latency by route")
+            lines.append("# TYPE http_request_duration_seconds histogram")
+            for (method, route, status_code), hist in sorted(self.request_latency.items()):
+                lines.extend(self._render_histogram(
+                    "http_request_duration_seconds", hist,
+                    method=method, route=route, status=status_code,
+                ))
+
+            lines.append("# HELP http_request_db_queries Database queries issued per request")
+            lines.append("# TYPE http_request_db_queries histogram")
+            for (method, route), hist in sorted(self.request_queries.items()):
+                lines.extend(self._render_histogram(
+                    "http_request_db_queries", hist, method=method, route=route,
+                ))
+
+            lines.append("# HELP db_queries_total Database queries by route")
+            lines.append("# TYPE db_queries_total counter")
+            for route, count in sorted(self.db_queries.items()):
+                lines.append(f"db_queries_total{_labels(route=route)} {count}")
+
+            lines.append("# HELP db_query_seconds_total Time spent in database queries by route")
+            lines.append("# TYPE db_query_seconds_total counter")
+            for route, seconds in sorted(self.db_time.items()):
+                lines.append(f"db_query_seconds_total{_labels(route=route)} {seconds:.6f}")
+
+            lines.append("# HELP service_calls_total Instrumented service calls by route")
+            lines.append("# TYPE service_calls_total counter")
+            for (route, service), count in sorted(self.service_calls.items()):
+                lines.append(f"service_calls_total{_labels(route=route, service=service)} {count}")
+
+            lines.append("# HELP service_seconds_total Time spent in instrumented services by route")
+            lines.append("# TYPE service_seconds_total counter")
+            for (route, service), seconds in sorted(self.service_time.items()):
+                lines.append(
+                    f"service_seconds_total{_labels(route=route, service=service)} {seconds:.6f}"
+                )
+        return lines
+
+    @staticmethod
+    def _render_histogram(name: str, hist: Histogram, **labels) -> List[str]:
+        return render_histogram(name, hist, **labels)
+
+
+def render_histogram(name: str, hist: Histogram, **labels) -> List[str]:
+    """Exposition lines for one histogram series, for use by collectors"""
+    lines = []
+    for bound, count in zip(hist.buckets, hist.counts):
+        lines.append(f"{name}_bucket{_labels(**labels, le=_format_bound(bound))} {count}")
+    lines.append(f'{name}_bucket{_labels(**labels, le="+Inf")} {hist.count}')
+    lines.append(f"{name}_sum{_labels(**labels)} {hist.sum:.6f}")
+    lines.append(f"{name}_count{_labels(**labels)} {hist.count}")
+    return lines
+
+
+def render_gauge(name: str, value: float, **labels) -> str:
+    return f"{name}{_labels(**labels)} {value}"
+
+
+registry = MetricsRegistry()
+
+
+def process_labels() -> Dict[str, str]:
+    """Labels for collector series describing this process alone: the worker's pid once shared"""
+    return {"worker": str(os.getpid())} if registry.shared else {}
+
+
+def _record_service(service: str, seconds: float) -> None:
+    timings = current_timings()
+    if timings is not None:
+        timings.service_time[service] += seconds
+        timings.service_calls[service] += 1
+    else:
+        registry.observe_background(service=service, seconds=seconds)
+
+
+def timed_service(service: str):
+    """Decorator recording how long a (sync or async) service method takes"""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    _record_service(service, time.perf_counter() - start)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _record_service(service, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+class MetricsMiddleware:
+    """
+    Records latency, DB queries and service time for every HTTP request.
+
+    Plain ASGI rather than BaseHTTPMiddleware: it adds no extra task per
+    request, keeps streaming responses streaming, and lets uvicorn count
+    completed responses for --limit-max-requests worker recycling.
+    """
+
+    def __init__(self, app, debug_header_enabled: bool = False):
+        self.app = app
+        self.debug_header_enabled = debug_header_enabled
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings, token = start_request()
+        start = time.perf_counter()
+        status_code = 500
+        want_breakdown = self.debug_header_enabled and any(
+            name == _DEBUG_TIMING_HEADER_RAW for name, _ in scope.get("headers", [])
+        )
+
+        async def send_with_metrics(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if want_breakdown:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", timings.server_timing(time.perf_counter() - start))
+                    headers.append("X-DB-Query-Count", str(timings.db_queries))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            # Label by route template so /users/1 and /users/2 share a series
+            route = scope.get("route")
+            registry.observe_request(
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                status_code,
+                time.perf_counter() - start,
+                timings,
+            )
+            end_request(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_start_time")
+    if not start_times:
+        return
+    elapsed = time.perf_counter() - start_times.pop()
+
+    timings = current_timings()
+    if timings is not None:
+        timings.db_queries += 1
+        timings.db_time += elapsed
+    else:
+        registry.observe_background(db_queries=1, db_time=elapsed)
+
+
+def _handle_error(exception_context):
+    # Failed statements never reach after_cursor_execute; drop their start time
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        conn.info["query_start_time"].pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attach query counting/timing hooks to an engine"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
@@ -0,0 +1,92 @@
+"""
+Niche taxonomy.
+
+Best-practices insights depend only on the niche, not on the user, so they
+are computed once per niche in the background (see
+app.services.niche_insights). A user's free-text target audience is mapped
+onto one of these niches; each niche lists the keywords that identify it,
+the reference creators analyzed for it, and any content themes of its own on
+top of DEFAULT_THEMES. Bios and video descriptions are scanned with matchers
+compiled once per niche from these tables.
+"""
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Dict, Mapping, Optional, Tuple
+import re
+from app.core.keyword_matcher import KeywordMatcher
+
+# Bio elements counted for every niche, on top of the niche's first keywords
+BIO_KEYWORDS = ("brand", "collab", "dm", "business")
+BIO_EMOJIS = ("✨", "💫", "🌟", "💖", "👑", "🔥", "💯")
+BIO_NICHE_KEYWORDS = 4
+
+# Content themes detected in video descriptions for every niche
+DEFAULT_THEMES: Dict[str, Tuple[str, ...]] = {
+    "dance": ("dance", "dancing", "choreography"),
+    "fashion": ("outfit", "ootd", "style", "fashion"),
+    "lifestyle": ("day", "morning", "routine", "life"),
+    "beauty": ("makeup", "skincare", "beauty", "glow"),
+    "trending": ("trend", "viral", "challenge"),
+}
+
+@dataclass(frozen=True)
+class Niche:
+    name: str
+    label: str
+    keywords: Tuple[str, ...]
+    creators: Tuple[str, ...]
+    themes: Mapping[str, Tuple[str, ...]] = field(default_factory=dict)  # extends DEFAULT_THEMES
+
+    @cached_property
+    def bio_matcher(self) -> KeywordMatcher:
+        table = {keyword: (keyword,) for keyword in self.keywords[:BIO_NICHE_KEYWORDS] + BIO_KEYWORDS}
+        table.update({f"emoji_{emoji}": (emoji,) for emoji in BIO_EMOJIS})
+        return KeywordMatcher(table)
+
+    @cached_property
+    def theme_matcher(self) -> KeywordMatcher:
+        return KeywordMatcher({**DEFAULT_THEMES, **self.themes})
+
+NICHES: Dict[str, Niche] = {niche.name: niche for niche in (
+    Niche("fashion", "Fashion & Style",
+          ("fashion", "style", "outfit", "ootd", "clothes", "streetwear", "wardrobe", "thrift"),
+          ("wisdm8", "alixearle", "brittany_xavier", "jessicawang", "lissyroddyy")),
+    Niche("beauty", "Beauty & Skincare",
+          ("beauty", "makeup", "skincare", "glow", "hair", "nails", "cosmetics"),
+          ("mikaylanogueira", "hyram", "jamescharles", "nikkietutorials", "meredithduxbury")),
+    Niche("fitness", "Fitness & Wellness",
+          ("fitness", "gym", "workout", "training", "wellness", "health", "yoga", "running"),
+          ("blogilates", "demibagby", "stephaniebuttermore", "chloeting", "joeywittler"),
+          {"workouts": ("workout", "gym", "training", "cardio", "pilates"), "wellness": ("wellness", "selfcare", "mindset")}),
+    Niche("food", "Food & Cooking",
+          ("food", "cooking", "recipe", "recipes", "baking", "chef", "foodie", "kitchen"),
+          ("gordonramsayofficial", "cookingwithlynja", "nick.digiovanni", "feelgoodfoodie", "newt"),
+          {"recipes": ("recipe", "easyrecipe", "cooking", "baking"), "food_reviews": ("review", "tastetest", "foodie")}),
+    Niche("lifestyle", "Lifestyle & Vlogs",
+          ("lifestyle", "vlog", "routine", "day", "travel", "home", "student", "life"),
+          ("emmachamberlain", "brookemonk", "dixiedamelio", "avani", "brentrivera")),
+    Niche("tech", "Tech & Gadgets",
+          ("tech", "gadget", "gadgets", "phone", "coding", "software", "ai", "setup"),
+          ("mkbhd", "unboxtherapy", "ijustine", "tech.with.jono", "mrwhosetheboss"),
+          {"reviews": ("review", "unboxing", "comparison"), "setups": ("setup", "desk", "gadget")}),
+)}
+
+DEFAULT_NICHE = "fashion"
+
+_WORDS = re.compile(r"[a-z]+")
+
+def resolve_niche(target_audience: Optional[str]) -> str:
+    """Niche for a niche name or a free-text audience description, DEFAULT_NICHE if nothing matches"""
+    if not target_audience:
+        return DEFAULT_NICHE
+    text = target_audience.strip().lower()
+    if text in NICHES:
+        return text
+
+    words = set(_WORDS.findall(text))
+    best, best_hits = DEFAULT_NICHE, 0
+    for niche in NICHES.values():
+        hits = len(words.intersection(niche.keywords))
+        if hits > best_hits:
+            best, best_hits = niche.name, hits
+    return best
@@ -0,0 +1,62 @@
+"""
+Opt-in NDJSON streaming for list endpoints.
+
+A client sending `Accept: application/x-ndjson` gets one JSON object per
+line, written as rows come off a DB cursor or a generator instead of after
+the whole list is built, so time to first byte and memory don't grow with
+`limit`. Lines are sent in small batches to keep per-write overhead low.
+"""
+from typing import Any, Dict, Iterable, Iterator, Optional
+import json
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+from app.db.session import SessionLocal
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Rows per write; the first write goes out after this many rows at most
+FLUSH_ROWS = 100
+# Rows fetched per round trip by stream_rows
+CURSOR_BATCH_SIZE = 1000
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+def _encode(row: Any) -> bytes:
+    if isinstance(row, BaseModel):
+        return row.model_dump_json().encode() + b"\n"
+    # Plain dicts skip jsonable_encoder unless they hold a datetime or similar
+    return json.dumps(row, ensure_ascii=False, default=jsonable_encoder).encode() + b"\n"
+
+def ndjson_lines(rows: Iterable[Any], flush_rows: int = FLUSH_ROWS) -> Iterator[bytes]:
+    """Encode pydantic models or dicts as NDJSON, `flush_rows` lines per chunk"""
+    buffer = []
+    for row in rows:
+        buffer.append(_encode(row))
+        if len(buffer) >= flush_rows:
+            yield b"".join(buffer)
+            buffer.clear()
+    if buffer:
+        yield b"".join(buffer)
+
+def ndjson_response(rows: Iterable[Any], headers: Optional[Dict[str, str]] = None) -> StreamingResponse:
+    return StreamingResponse(ndjson_lines(rows), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+def closing(db: Session, rows: Iterable[Any]) -> Iterator[Any]:
+    """Yield rows, then close the session they are read with (also if the client disconnects)"""
+    try:
+        yield from rows
+    finally:
+        db.close()
+
+def stream_rows(stmt, batch_size: int = CURSOR_BATCH_SIZE) -> Iterator:
+    """
+    Rows of a select() through a server-side cursor (where the driver has one),
+    on a session of its own that lives as long as the response body rather
+    than the request's
+    """
+    db = SessionLocal()
+    return closing(db, db.execute(stmt.execution_options(yield_per=batch_size)))
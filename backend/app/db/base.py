@@ -4,4 +4,10 @@ from app.db.base_class import Base  # noqa
 from app.models.user import User  # noqa
 from app.models.tiktok_profile import TikTokProfile  # noqa
 from app.models.tiktok_video import TikTokVideo  # noqa
-from app.models.analytics import ProfileAnalytics, CreatorRecommendation  # noqa
+from app.models.analytics import ProfileAnalytics, CreatorRecommendation, RecommendationTally  # noqa
+from app.models.scrape_job import ScrapeJob  # noqa
+from app.models.niche_insight import NicheInsight  # noqa
+from app.models.video_hashtag import VideoHashtag  # noqa
+from app.models.profile_vector import ProfileVector  # noqa
+from app.models.follower_interaction import TikTokFollower, FollowerInteraction  # noqa
+from app.db import fulltext  # noqa - full-text index DDL for create_all
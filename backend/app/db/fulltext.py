@@ -0,0 +1,103 @@
+"""
+Full-text indexes over video descriptions and profile bios.
+
+The database keeps the indexes in step with every write (scrape upserts,
+imports, manual edits), so application code never has to sync them:
+  - SQLite: FTS5 external-content tables (tiktok_videos_fts,
+    tiktok_profiles_fts) maintained by triggers
+  - PostgreSQL: generated tsvector columns (search_vector) with GIN indexes
+
+The DDL runs after create_all creates the base tables (see the listeners at
+the bottom); create_fulltext_indexes() adds it to an existing database. The
+Alembic migration (9b5d7f2a4c61) keeps its own frozen copy, so change both.
+"""
+from typing import List
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+from app.models.tiktok_profile import TikTokProfile
+from app.models.tiktok_video import TikTokVideo
+
+VIDEOS_FTS = "tiktok_videos_fts"
+PROFILES_FTS = "tiktok_profiles_fts"
+
+# Porter stemming so "outfits" finds "outfit", like PostgreSQL's english config
+_SQLITE_TOKENIZER = "porter unicode61 remove_diacritics 2"
+
+def _sqlite_fts(fts: str, table: str, columns: List[str]) -> List[str]:
+    cols = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+    delete_old = f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values});"
+    insert_new = f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content='{table}', "
+        f"content_rowid='id', tokenize='{_SQLITE_TOKENIZER}')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN {delete_old} {insert_new} END",
+        # Index rows that existed before the table was created
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+SQLITE_DDL = {
+    TikTokVideo.__tablename__: _sqlite_fts(VIDEOS_FTS, "tiktok_videos", ["description"]),
+    TikTokProfile.__tablename__: _sqlite_fts(PROFILES_FTS, "tiktok_profiles", ["tiktok_username", "display_name", "bio"]),
+}
+
+POSTGRES_DDL = {
+    TikTokVideo.__tablename__: [
+        "ALTER TABLE tiktok_videos ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS "
+        "(to_tsvector('english', coalesce(description, ''))) STORED",
+        "CREATE INDEX IF NOT EXISTS ix_tiktok_videos_search_vector ON tiktok_videos USING GIN (search_vector)",
+    ],
+    TikTokProfile.__tablename__: [
+        # Names weigh more than bio text when ranking
+        "ALTER TABLE tiktok_profiles ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('simple', coalesce(tiktok_username, '') || ' ' || coalesce(display_name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(bio, '')), 'B')) STORED",
+        "CREATE INDEX IF NOT EXISTS ix_tiktok_profiles_search_vector ON tiktok_profiles USING GIN (search_vector)",
+    ],
+}
+
+def _sqlite_drop(fts: str) -> List[str]:
+    # The triggers reference the base table, so they go before it
+    return [f"DROP TRIGGER IF EXISTS {fts}_{suffix}" for suffix in ("ai", "ad", "au")] + [f"DROP TABLE IF EXISTS {fts}"]
+
+SQLITE_DROP = {
+    TikTokVideo.__tablename__: _sqlite_drop(VIDEOS_FTS),
+    TikTokProfile.__tablename__: _sqlite_drop(PROFILES_FTS),
+}
+
+POSTGRES_DROP = {
+    table: [f"DROP INDEX IF EXISTS ix_{table}_search_vector", f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector"]
+    for table in (TikTokVideo.__tablename__, TikTokProfile.__tablename__)
+}
+
+def _statements(dialect: str, table: str, drop: bool = False) -> List[str]:
+    if dialect == "sqlite":
+        return (SQLITE_DROP if drop else SQLITE_DDL).get(table, [])
+    if dialect == "postgresql":
+        return (POSTGRES_DROP if drop else POSTGRES_DDL).get(table, [])
+    return []
+
+def create_fulltext_indexes(conn: Connection) -> None:
+    for table in (TikTokVideo.__tablename__, TikTokProfile.__tablename__):
+        for statement in _statements(conn.dialect.name, table):
+            conn.exec_driver_sql(statement)
+
+def drop_fulltext_indexes(conn: Connection) -> None:
+    for table in (TikTokVideo.__tablename__, TikTokProfile.__tablename__):
+        for statement in _statements(conn.dialect.name, table, drop=True):
+            conn.exec_driver_sql(statement)
+
+def _after_create(target, connection: Connection, **kw) -> None:
+    for statement in _statements(connection.dialect.name, target.name):
+        connection.exec_driver_sql(statement)
+
+def _before_drop(target, connection: Connection, **kw) -> None:
+    for statement in _statements(connection.dialect.name, target.name, drop=True):
+        connection.exec_driver_sql(statement)
+
+for _table in (TikTokVideo.__table__, TikTokProfile.__table__):
+    event.listen(_table, "after_create", _after_create)
+    event.listen(_table, "before_drop", _before_drop)
@@ -0,0 +1,155 @@
+"""
+Query counting helpers for catching N+1 patterns and query-count regressions.
+
+Usage in a test:
+
+    with QueryCounter(engine) as counter:
+        client.get("/api/v1/analytics/overview", headers=headers)
+    counter.assert_max_queries(3)
+    counter.assert_no_n_plus_one()
+
+`QUERY_BUDGETS` declares the allowed number of statements per endpoint and
+`check_query_budgets` enforces them against a client in one pass.
+"""
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Maximum number of SQL statements each endpoint may issue (including auth)
+QUERY_BUDGETS: Dict[Tuple[str, str], int] = {
+    ("GET", "/api/v1/users/me"): 1,
+    ("GET", "/api/v1/tiktok/profile"): 2,
+    ("GET", "/api/v1/tiktok/videos"): 3,
+    ("GET", "/api/v1/analytics/overview"): 3,
+    ("GET", "/api/v1/analytics/videos/performance"): 3,
+    ("GET", "/api/v1/analytics/insights"): 5,
+    ("GET", "/api/v1/analytics/insights/posting-patterns"): 4,
+    ("GET", "/api/v1/analytics/hashtags"): 3,
+    ("GET", "/api/v1/analytics/engagement-trend"): 3,
+    ("GET", "/api/v1/recommendations/creators"): 3,
+    ("GET", "/api/v1/recommendations/insights"): 2,
+    ("GET", "/api/v1/best-practices/analyze"): 3,
+    ("GET", "/api/v1/best-practices/recommendations"): 3,
+    ("GET", "/api/v1/search/videos?q=outfit"): 3,
+    ("GET", "/api/v1/search/creators?q=budget"): 2,
+    ("GET", "/api/v1/engaged-leads/analyze"): 4,
+}
+
+# A statement repeated this many times with different parameters is an N+1
+N_PLUS_ONE_THRESHOLD = 3
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_BIND_PARAM = re.compile(r"%\(\w+\)s|%s|:\w+|\$\d+|\?")
+_PARAM_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+
+
+def normalize_statement(statement: str) -> str:
+    """Reduce a SQL statement to its shape so calls differing only in parameters match"""
+    normalized = _WHITESPACE.sub(" ", statement.strip())
+    normalized = _STRING_LITERAL.sub("?", normalized)
+    normalized = _BIND_PARAM.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    # IN lists of different lengths are the same query
+    return _PARAM_LIST.sub("(?...)", normalized)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class NPlusOneDetected(AssertionError):
+    pass
+
+
+@dataclass
+class RecordedQuery:
+    statement: str
+    parameters: object
+    executemany: bool
+
+
+class QueryCounter:
+    """Context manager that records every statement executed on an engine"""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.queries: List[RecordedQuery] = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.queries.append(RecordedQuery(statement, parameters, executemany))
+
+    def __enter__(self) -> "QueryCounter":
+        self.queries = []
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._record)
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    def repeated_statements(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> List[Tuple[str, int]]:
+        """Statements issued at least `threshold` times that differ only in parameters"""
+        shapes = Counter(normalize_statement(query.statement) for query in self.queries)
+        return [(shape, count) for shape, count in shapes.most_common() if count >= threshold]
+
+    def assert_max_queries(self, budget: int, label: Optional[str] = None) -> None:
+        if self.count > budget:
+            raise QueryBudgetExceeded(
+                f"{label or 'Block'} issued {self.count} queries (budget {budget}):\n"
+                + self.report()
+            )
+
+    def assert_no_n_plus_one(self, threshold: int = N_PLUS_ONE_THRESHOLD,
+                             label: Optional[str] = None) -> None:
+        repeated = self.repeated_statements(threshold)
+        if repeated:
+            details = "\n".join(f"  {count}x {shape}" for shape, count in repeated)
+            raise NPlusOneDetected(f"{label or 'Block'} repeated statements:\n{details}")
+
+    def report(self) -> str:
+        return "\n".join(
+            f"  {i + 1}. {_WHITESPACE.sub(' ', query.statement.strip())}"
+            for i, query in enumerate(self.queries)
+        )
+
+
+def check_query_budgets(client, engine: Engine, headers: Optional[Dict[str, str]] = None,
+                        budgets: Optional[Dict[Tuple[str, str], int]] = None) -> Dict[Tuple[str, str], int]:
+    """
+    Call every budgeted endpoint and fail if any does not answer 2xx, exceeds its
+    budget or shows an N+1 (an error response says nothing about the real path's queries).
+
+    Returns the observed query count per endpoint so callers can report them.
+    """
+    budgets = budgets if budgets is not None else QUERY_BUDGETS
+    observed = {}
+    failures = []
+
+    for (method, path), budget in budgets.items():
+        with QueryCounter(engine) as counter:
+            response = client.request(method, path, headers=headers)
+        observed[(method, path)] = counter.count
+        label = f"{method} {path}"
+        if not 200 <= response.status_code < 300:
+            failures.append(f"{label} answered {response.status_code}: {response.text[:200]}")
+            continue
+        for check in (lambda: counter.assert_max_queries(budget, label),
+                      lambda: counter.assert_no_n_plus_one(label=label)):
+            try:
+                check()
+            except AssertionError as e:
+                failures.append(str(e))
+
+    if failures:
+        raise QueryBudgetExceeded("\n\n".join(failures))
+
+    return observed
@@ -0,0 +1,23 @@
+"""
+INSERT ... ON CONFLICT for the databases the app runs on. PostgreSQL and
+SQLite share the syntax, but SQLAlchemy builds it from each dialect's own
+insert() construct.
+"""
+from typing import Iterable
+from sqlalchemy.sql.dml import Insert
+
+def dialect_insert(dialect: str, table) -> Insert:
+    """insert(table) with on_conflict_do_update/on_conflict_do_nothing, for a dialect name"""
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
+def upsert(dialect: str, table, index_elements: Iterable[str], update_columns: Iterable[str]) -> Insert:
+    """Insert rows, or overwrite update_columns of the row already holding the same index_elements"""
+    stmt = dialect_insert(dialect, table)
+    return stmt.on_conflict_do_update(
+        index_elements=list(index_elements),
+        set_={column: stmt.excluded[column] for column in update_columns}
+    )
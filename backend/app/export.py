@@ -0,0 +1,52 @@
+"""
+Data export entry point.
+
+Writes one creator's videos or daily analytics snapshots to a file:
+    python -m app.export --username some_creator --dataset videos --format parquet --output videos.parquet
+Formats are csv, parquet and arrow (Arrow IPC stream); the same export is
+served by GET /api/v1/export/{dataset}.
+"""
+import argparse
+import json
+import logging
+import sys
+from app.db import base  # noqa: F401 - registers every model with the mappers
+from app.db.session import SessionLocal
+from app.models.tiktok_profile import TikTokProfile
+from app.services.data_export import CSV, DATASETS, EXPORT_CHUNK_SIZE, FORMATS, DataExporter
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a creator's data as CSV, Parquet or Arrow")
+    parser.add_argument("--username", required=True, help="TikTok username of the profile")
+    parser.add_argument("--dataset", choices=sorted(DATASETS), default="videos")
+    parser.add_argument("--format", choices=FORMATS, default=CSV)
+    parser.add_argument("--output", help="File to write (default stdout)")
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE, help="Rows per chunk / row group")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    db = SessionLocal()
+    try:
+        profile = db.query(TikTokProfile.id).filter(
+            TikTokProfile.tiktok_username == args.username.lstrip('@')
+        ).order_by(TikTokProfile.id).first()
+        if profile is None:
+            parser.error(f"No profile @{args.username}")
+        profile_id = profile.id
+
+        output = open(args.output, "wb") if args.output else sys.stdout.buffer
+        written = 0
+        try:
+            for chunk in DataExporter(db, chunk_size=args.chunk_size).export(args.dataset, args.format, profile_id):
+                output.write(chunk)
+                written += len(chunk)
+        finally:
+            if args.output:
+                output.close()
+    finally:
+        db.close()
+
+    print(json.dumps({"dataset": args.dataset, "format": args.format, "bytes": written}), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
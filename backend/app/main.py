@@ -1,6 +1,11 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+import logging
 import os
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
 
 # Create a simple health check app first
 app = FastAPI(
@@ -18,6 +23,14 @@ async def health_check():
 async def root():
     return {"message": "TikTok Creator Compass API", "version": "1.0.0"}
 
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
+# Whether clients may request a timing breakdown; replaced by the setting once config loads
+debug_timing_enabled = os.getenv("DEBUG_TIMING_HEADER_ENABLED", "false").lower() == "true"
+
 # Try to load config and API routes, but don't crash if they fail
 try:
     from app.core.config import settings
@@ -25,6 +38,9 @@ try:
     
     # Update app with full config
     app.openapi_url = f"{settings.API_V1_STR}/openapi.json"
+    debug_timing_enabled = settings.DEBUG_TIMING_HEADER_ENABLED
+    if settings.METRICS_DIR:
+        metrics.registry.share(settings.METRICS_DIR)
     
     # Set up CORS
     app.add_middleware(
@@ -36,10 +52,10 @@ try:
     )
     
     app.include_router(api_router, prefix=settings.API_V1_STR)
-    print(f"API routes loaded successfully with prefix: {settings.API_V1_STR}")
+    logger.info(f"API routes loaded successfully with prefix: {settings.API_V1_STR}")
     
 except Exception as e:
-    print(f"Warning: Could not load full configuration: {e}")
+    logger.warning(f"Could not load full configuration: {e}")
     # Add basic CORS for health checks
     app.add_middleware(
         CORSMiddleware,
@@ -53,6 +69,9 @@ except Exception as e:
     try:
         from app.api.v1.api import api_router
         app.include_router(api_router, prefix="/api/v1")
-        print("API routes loaded with default prefix")
+        logger.info("API routes loaded with default prefix")
     except Exception as e2:
-        print(f"Failed to load API routes: {e2}")
+        logger.error(f"Failed to load API routes: {e2}")
+
+# Added last so it is the outermost middleware and timings cover the whole request
+app.add_middleware(metrics.MetricsMiddleware, debug_header_enabled=debug_timing_enabled)
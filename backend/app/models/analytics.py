@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Date
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Date, Index, JSON, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
@@ -33,6 +33,9 @@ class ProfileAnalytics(Base):
     
     # Relationships
     profile = relationship("TikTokProfile", back_populates="analytics")
+    
+    # One snapshot per profile per day; writers upsert on it
+    __table_args__ = (UniqueConstraint("profile_id", "date", name="uq_profile_analytics_profile_id_date"),)
 
 class CreatorRecommendation(Base):
     __tablename__ = "creator_recommendations"
@@ -51,8 +54,8 @@ class CreatorRecommendation(Base):
     growth_score = Column(Float, nullable=True)
     
     # Insights about what they do well
-    success_factors = Column(String, nullable=True)  # JSON string
-    content_themes = Column(String, nullable=True)  # JSON string
+    success_factors = Column(JSON, nullable=True)  # list of factor names
+    content_themes = Column(JSON, nullable=True)  # list of theme names
     posting_frequency = Column(String, nullable=True)
     
     # Recommendation metadata
@@ -61,3 +64,26 @@ class CreatorRecommendation(Base):
     
     # Relationships
     user = relationship("User")
+    
+    __table_args__ = (
+        Index("ix_creator_recommendations_user_active", "user_id", "is_active"),
+        # Retention cleanup of deactivated rows
+        Index("ix_creator_recommendations_active_generated", "is_active", "generated_at"),
+    )
+
+class RecommendationTally(Base):
+    """How many of a user's active recommendations share a success factor or theme"""
+    __tablename__ = "recommendation_tallies"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    kind = Column(String, nullable=False)  # "factor" or "theme"
+    value = Column(String, nullable=False)
+    count = Column(Integer, nullable=False)
+
+    # Rewritten whenever the user's recommendations are (see app.services.creator_similarity)
+    __table_args__ = (
+        UniqueConstraint("user_id", "kind", "value", name="uq_recommendation_tallies_user_kind_value"),
+        Index("ix_recommendation_tallies_user_kind_count", "user_id", "kind", "count"),
+    )
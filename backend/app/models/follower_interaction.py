@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, BigInteger, Float, ForeignKey, PrimaryKeyConstraint
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+class TikTokFollower(Base):
+    """Interned TikTok account seen interacting with a tracked profile"""
+    __tablename__ = "tiktok_followers"
+
+    id = Column(Integer, primary_key=True, index=True)
+    username = Column(String, unique=True, index=True, nullable=False)  # lowercase, without "@"
+
+    # Filled when a scrape batch carries them
+    follower_count = Column(BigInteger, nullable=True)
+    engagement_rate = Column(Float, nullable=True)
+    bio = Column(Text, nullable=True)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class FollowerInteraction(Base):
+    """Running interaction counters of one follower on one profile (see app.services.follower_interactions)"""
+    __tablename__ = "follower_interactions"
+
+    profile_id = Column(Integer, ForeignKey("tiktok_profiles.id"), nullable=False)
+    follower_id = Column(Integer, ForeignKey("tiktok_followers.id"), nullable=False)
+
+    comment_count = Column(Integer, nullable=False, default=0)
+    like_count = Column(Integer, nullable=False, default=0)
+    share_count = Column(Integer, nullable=False, default=0)
+
+    first_interaction_at = Column(DateTime(timezone=True), nullable=False)
+    last_interaction_at = Column(DateTime(timezone=True), nullable=False)
+
+    # Keyed so a profile's followers are one range scan in follower_id order
+    __table_args__ = (
+        PrimaryKeyConstraint("profile_id", "follower_id", name="pk_follower_interactions"),
+    )
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+class NicheInsight(Base):
+    __tablename__ = "niche_insights"
+
+    id = Column(Integer, primary_key=True, index=True)
+    niche = Column(String, unique=True, index=True, nullable=False)  # key in app.core.niches.NICHES
+
+    # Bumped on every recompute so cached copies can be told apart
+    version = Column(Integer, nullable=False, default=1)
+
+    # Aggregated best practices from the niche's reference creators
+    best_practices = Column(Text, nullable=False)  # JSON string
+    analyzed_creators = Column(Integer, nullable=False, default=0)
+
+    computed_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, DateTime, Float, LargeBinary, JSON, ForeignKey
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+class ProfileVector(Base):
+    """Similarity feature vector of a profile (see app.services.creator_similarity)"""
+    __tablename__ = "profile_vectors"
+
+    profile_id = Column(Integer, ForeignKey("tiktok_profiles.id"), primary_key=True)
+
+    # Unit-length float32 array; rows from an older FEATURE_VERSION are recomputed
+    vector = Column(LargeBinary, nullable=False)
+    feature_version = Column(Integer, nullable=False)
+
+    # Raw features behind the vector, used to describe a recommended creator
+    engagement_rate = Column(Float, nullable=True)
+    posts_per_week = Column(Float, nullable=True)
+    themes = Column(JSON, nullable=True)  # list of theme names, most frequent first
+
+    computed_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
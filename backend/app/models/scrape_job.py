@@ -0,0 +1,44 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.db.base_class import Base
+
+class ScrapeJob(Base):
+    __tablename__ = "scrape_jobs"
+
+    # Job statuses
+    DEFERRED = "deferred"  # held back until the user has a free job slot
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    ACTIVE_STATUSES = (DEFERRED, QUEUED, RUNNING)
+
+    # Job types
+    PROFILE_UPDATE = "profile_update"
+    VIDEO_SCRAPE = "video_scrape"
+    INTERACTION_SCRAPE = "interaction_scrape"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    profile_id = Column(Integer, ForeignKey("tiktok_profiles.id"), nullable=False, index=True)
+    job_type = Column(String, nullable=False)
+    priority = Column(String, nullable=False, default="refresh", index=True)  # scheduler class
+
+    # Set while the job is queued/running so the same work is never queued twice;
+    # cleared when the job finishes (NULLs don't collide in the unique index)
+    idempotency_key = Column(String, unique=True, nullable=True)
+
+    # Progress reporting
+    status = Column(String, nullable=False, default=QUEUED, index=True)
+    progress = Column(Integer, nullable=False, default=0)  # 0-100
+    message = Column(String, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Relationships
+    profile = relationship("TikTokProfile")
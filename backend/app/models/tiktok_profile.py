@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, BigInteger, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, BigInteger, ForeignKey, Float
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
@@ -21,7 +21,8 @@ class TikTokProfile(Base):
     is_verified = Column(Boolean, default=False)
     
     # Profile metadata
-    last_scraped_at = Column(DateTime(timezone=True), nullable=True)
+    last_scraped_at = Column(DateTime(timezone=True), nullable=True, index=True)
+    follower_velocity = Column(Float, nullable=True)  # smoothed followers/day between scrapes
     is_active = Column(Boolean, default=True)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -7,7 +7,7 @@ class TikTokVideo(Base):
     __tablename__ = "tiktok_videos"
 
     id = Column(Integer, primary_key=True, index=True)
-    profile_id = Column(Integer, ForeignKey("tiktok_profiles.id"), nullable=False)
+    profile_id = Column(Integer, ForeignKey("tiktok_profiles.id"), nullable=False, index=True)
     
     # Video identifiers
     video_id = Column(String, unique=True, index=True, nullable=False)
@@ -31,6 +31,7 @@ class TikTokVideo(Base):
     # Video metadata
     posted_at = Column(DateTime(timezone=True), nullable=True)
     last_scraped_at = Column(DateTime(timezone=True), nullable=True)
+    interactions_scraped_at = Column(DateTime(timezone=True), nullable=True)  # comments up to here are recorded
     is_active = Column(Boolean, default=True)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
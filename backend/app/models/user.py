@@ -15,11 +15,15 @@ class User(Base):
     # Onboarding questions
     offer_description = Column(Text, nullable=True)
     target_audience = Column(Text, nullable=True)
+    niche = Column(String, nullable=True, index=True)  # target_audience resolved by app.core.niches
     
     # User preferences
     is_active = Column(Boolean, default=True)
     weekly_updates_enabled = Column(Boolean, default=True)
     
+    # Activity - set at login, used to keep active users' profiles fresher
+    last_seen_at = Column(DateTime(timezone=True), nullable=True)
+    
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
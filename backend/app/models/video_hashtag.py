@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.orm import relationship
+from app.db.base_class import Base
+
+class VideoHashtag(Base):
+    """Inverted index of the hashtags and mentions in video descriptions"""
+    __tablename__ = "video_hashtags"
+
+    id = Column(Integer, primary_key=True, index=True)
+    video_id = Column(Integer, ForeignKey("tiktok_videos.id"), nullable=False)
+    # Denormalized from the video so per-profile stats don't need the join to filter
+    profile_id = Column(Integer, ForeignKey("tiktok_profiles.id"), nullable=False)
+
+    tag = Column(String, nullable=False)  # lowercase, without "#"/"@"
+    kind = Column(String, nullable=False)  # app.core.hashtags.HASHTAG or MENTION
+
+    # Relationships
+    video = relationship("TikTokVideo")
+
+    __table_args__ = (
+        UniqueConstraint("video_id", "kind", "tag", name="uq_video_hashtags_video_kind_tag"),
+        Index("ix_video_hashtags_kind_tag", "kind", "tag"),
+        Index("ix_video_hashtags_profile_kind_tag", "profile_id", "kind", "tag"),
+    )
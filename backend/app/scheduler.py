@@ -0,0 +1,90 @@
+"""
+Periodic refresh scheduler.
+
+Every REFRESH_PLAN_INTERVAL_MINUTES it asks the RefreshPlanner for the most
+overdue profiles and queues scheduled-priority scrape jobs for them, within
+REFRESH_SCRAPES_PER_HOUR. Once a day at BATCH_ANALYTICS_TIME it also runs
+the batch analytics pipeline (app.batch) followed by a recompute of all
+creator similarity vectors and recommendations in a background thread, and every
+hour it queues a recompute of niche insights older than
+NICHE_INSIGHTS_REFRESH_HOURS.
+Run exactly one instance next to the Celery workers:
+    python -m app.scheduler
+    python -m app.scheduler --once   # single cycle, e.g. from cron
+"""
+import argparse
+import logging
+import threading
+import time
+from app.batch import refresh_recommendations
+from app.core.config import settings
+from app.db.session import SessionLocal, engine
+from app.services.analytics_batch import AnalyticsBatchPipeline
+from app.services.niche_insights import NicheInsightStore, request_niche_refresh
+from app.services.refresh_planner import RefreshPlanner
+
+logger = logging.getLogger(__name__)
+
+def run_refresh_cycle():
+    db = SessionLocal()
+    try:
+        return RefreshPlanner(db).run()
+    except Exception as e:
+        # Keep the loop alive; the next cycle retries
+        logger.error(f"Refresh cycle failed: {str(e)}")
+    finally:
+        db.close()
+
+def run_niche_refresh():
+    db = SessionLocal()
+    try:
+        niches = NicheInsightStore(db).stale_niches()
+    except Exception as e:
+        logger.error(f"Niche insights refresh failed: {str(e)}")
+        return
+    finally:
+        db.close()
+    for niche in niches:
+        request_niche_refresh(niche)
+    if niches:
+        logger.info(f"Queued niche insights refresh for {', '.join(niches)}")
+
+def run_batch_analytics():
+    try:
+        AnalyticsBatchPipeline(engine).run()
+    except Exception as e:
+        # The checkpoint lets tomorrow's (or a manual) run pick up from here
+        logger.error(f"Batch analytics failed: {str(e)}")
+    run_recommendation_refresh()
+
+def run_recommendation_refresh():
+    try:
+        logger.info(f"Recommendations refreshed: {refresh_recommendations()}")
+    except Exception as e:
+        logger.error(f"Recommendation refresh failed: {str(e)}")
+
+def start_batch_analytics():
+    """Run the nightly batch without holding up refresh cycles"""
+    threading.Thread(target=run_batch_analytics, name="batch-analytics", daemon=True).start()
+
+def main():
+    parser = argparse.ArgumentParser(description="Queue refresh scrapes for stale profiles")
+    parser.add_argument("--once", action="store_true", help="Run a single cycle and exit")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    run_refresh_cycle()
+    run_niche_refresh()
+    if args.once:
+        return
+
+    import schedule
+    schedule.every(settings.REFRESH_PLAN_INTERVAL_MINUTES).minutes.do(run_refresh_cycle)
+    schedule.every().day.at(settings.BATCH_ANALYTICS_TIME).do(start_batch_analytics)
+    schedule.every().hour.do(run_niche_refresh)
+    while True:
+        schedule.run_pending()
+        time.sleep(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Batch analytics pipeline.
+
+Recomputes today's ProfileAnalytics snapshot for every profile:
+  - profile ids are read in keyset chunks, and each chunk's video columns are
+    streamed with a server-side cursor (no ORM objects)
+  - chunks are computed in a process pool with the same pure functions the
+    online AnalyticsEngine uses (app.services.analytics_metrics); the day's
+    follower growth comes from the profile's smoothed follower velocity
+  - results are bulk-upserted over that day's rows for the chunk
+  - the last fully written profile id is checkpointed to a JSON file, so an
+    interrupted run resumes where it stopped
+"""
+from typing import Dict, Iterator, List, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import date, datetime
+import json
+import logging
+import multiprocessing
+import os
+import time
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+from app.db.upsert import upsert
+from app.models.analytics import ProfileAnalytics
+from app.models.tiktok_profile import TikTokProfile
+from app.models.tiktok_video import TikTokVideo
+from app.services.analytics_metrics import VideoStats, profile_snapshot
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per round trip from the video cursor
+STREAM_BATCH_SIZE = 5000
+
+# (profile id, follower velocity, videos) per profile
+Chunk = List[Tuple[int, Optional[float], List[VideoStats]]]
+
+def compute_chunk(chunk: Chunk) -> List[Dict]:
+    """Snapshot rows for one chunk of profiles (runs in a pool process)"""
+    return [
+        {"profile_id": profile_id, **profile_snapshot(videos, follower_velocity)}
+        for profile_id, follower_velocity, videos in chunk
+    ]
+
+class AnalyticsBatchPipeline:
+    def __init__(self, engine: Engine, workers: Optional[int] = None, chunk_size: Optional[int] = None,
+                 checkpoint_path: Optional[str] = None):
+        self.engine = engine
+        self.workers = workers or settings.BATCH_ANALYTICS_WORKERS or multiprocessing.cpu_count()
+        self.chunk_size = chunk_size or settings.BATCH_ANALYTICS_CHUNK_SIZE
+        self.checkpoint_path = checkpoint_path or settings.BATCH_ANALYTICS_CHECKPOINT
+
+    def run(self, snapshot_date: Optional[date] = None, resume: bool = True) -> Dict:
+        """Compute and store snapshots for all profiles; returns throughput stats"""
+        snapshot_date = snapshot_date or datetime.utcnow().date()
+        start_after = self._load_checkpoint(snapshot_date) if resume else 0
+        if start_after:
+            logger.info(f"Resuming batch analytics for {snapshot_date} after profile {start_after}")
+
+        started = time.perf_counter()
+        processed = 0
+        # Chunks finish out of order; the checkpoint only advances over a contiguous prefix
+        written_ends: Dict[int, int] = {}
+        next_to_checkpoint = 0
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            in_flight = {}
+            for sequence, chunk in enumerate(self._chunks(start_after)):
+                future = pool.submit(compute_chunk, chunk)
+                in_flight[future] = sequence
+
+                # Bound memory: keep at most two chunks per worker queued
+                while len(in_flight) >= self.workers * 2:
+                    processed += self._drain(in_flight, snapshot_date, written_ends)
+                    next_to_checkpoint = self._advance_checkpoint(snapshot_date, written_ends, next_to_checkpoint)
+
+            while in_flight:
+                processed += self._drain(in_flight, snapshot_date, written_ends)
+                next_to_checkpoint = self._advance_checkpoint(snapshot_date, written_ends, next_to_checkpoint)
+
+        elapsed = time.perf_counter() - started
+        self._clear_checkpoint()
+        stats = {
+            "snapshot_date": snapshot_date.isoformat(),
+            "profiles": processed,
+            "seconds": round(elapsed, 3),
+            "profiles_per_second": round(processed / elapsed, 1) if elapsed else None,
+            "workers": self.workers,
+            "resumed_after_profile": start_after,
+        }
+        logger.info(f"Batch analytics finished: {stats}")
+        return stats
+
+    def _chunks(self, start_after: int) -> Iterator[Chunk]:
+        """Profiles in id order, each chunk with their follower velocity and videos' metric columns"""
+        last_id = start_after
+        with self.engine.connect() as conn:
+            while True:
+                velocities = dict(conn.execute(
+                    select(TikTokProfile.id, TikTokProfile.follower_velocity)
+                    .where(TikTokProfile.id > last_id)
+                    .order_by(TikTokProfile.id)
+                    .limit(self.chunk_size)
+                ).all())
+                if not velocities:
+                    return
+                profile_ids = list(velocities)
+
+                videos: Dict[int, List[VideoStats]] = {profile_id: [] for profile_id in profile_ids}
+                # yield_per streams through a server-side cursor where the driver supports one
+                result = conn.execute(
+                    select(
+                        TikTokVideo.profile_id,
+                        TikTokVideo.id,
+                        TikTokVideo.video_id,
+                        TikTokVideo.view_count,
+                        TikTokVideo.like_count,
+                        TikTokVideo.comment_count,
+                        TikTokVideo.share_count,
+                        TikTokVideo.posted_at
+                    ).where(TikTokVideo.profile_id.in_(profile_ids)).execution_options(yield_per=STREAM_BATCH_SIZE)
+                )
+                for profile_id, *columns, posted_at in result:
+                    videos[profile_id].append(VideoStats(*columns, posted_at=posted_at))
+                # Release the read transaction before the chunk is written elsewhere
+                conn.commit()
+
+                yield [(profile_id, velocities[profile_id], stats) for profile_id, stats in videos.items()]
+                last_id = profile_ids[-1]
+
+    def _drain(self, in_flight: Dict, snapshot_date: date, written_ends: Dict[int, int]) -> int:
+        """Write whichever chunks have finished; returns the number of profiles written"""
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        written = 0
+        for future in done:
+            sequence = in_flight.pop(future)
+            rows = future.result()
+            self._write(rows, snapshot_date)
+            written_ends[sequence] = rows[-1]["profile_id"]
+            written += len(rows)
+        return written
+
+    def _write(self, rows: List[Dict], snapshot_date: date):
+        """Upsert the day's snapshots for these profiles in one statement"""
+        for row in rows:
+            row["date"] = snapshot_date
+        columns = [column for column in rows[0] if column not in ("profile_id", "date")]
+        with self.engine.begin() as conn:
+            conn.execute(upsert(self.engine.dialect.name, ProfileAnalytics, ["profile_id", "date"], columns), rows)
+
+    def _advance_checkpoint(self, snapshot_date: date, written_ends: Dict[int, int], next_sequence: int) -> int:
+        last_profile_id = None
+        while next_sequence in written_ends:
+            last_profile_id = written_ends.pop(next_sequence)
+            next_sequence += 1
+        if last_profile_id is not None:
+            self._save_checkpoint(snapshot_date, last_profile_id)
+        return next_sequence
+
+    def _load_checkpoint(self, snapshot_date: date) -> int:
+        try:
+            with open(self.checkpoint_path) as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        # A checkpoint from another day's run is stale
+        if checkpoint.get("snapshot_date") != snapshot_date.isoformat():
+            return 0
+        return int(checkpoint.get("last_profile_id", 0))
+
+    def _save_checkpoint(self, snapshot_date: date, last_profile_id: int):
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"snapshot_date": snapshot_date.isoformat(), "last_profile_id": last_profile_id}, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _clear_checkpoint(self):
+        try:
+            os.remove(self.checkpoint_path)
+        except FileNotFoundError:
+            pass
@@ -6,11 +6,21 @@ from app.models.user import User
 from app.models.tiktok_profile import TikTokProfile
 from app.models.tiktok_video import TikTokVideo
 from app.models.analytics import ProfileAnalytics
+from app.db.upsert import upsert
+from app.core.cache import get_cache
+from app.core.config import settings
+from app.core.metrics import timed_service
+from app.services import analytics_metrics
+from app.services.posting_patterns import PostingPatterns
+from app.services.profiles import get_user_profile
 import statistics
 import logging
 
 logger = logging.getLogger(__name__)
 
+def analytics_cache_key(profile_id: int) -> str:
+    return f"analytics:profile:{profile_id}"
+
 class AnalyticsEngine:
     """
     Analytics engine for calculating TikTok growth metrics and insights
@@ -19,51 +29,88 @@ class AnalyticsEngine:
     def __init__(self, db: Session):
         self.db = db
     
+    @timed_service("analytics_engine")
     def calculate_profile_analytics(self, user_id: int) -> Optional[Dict]:
         """Calculate comprehensive analytics for a user's TikTok profile"""
         try:
             # Get user's TikTok profile
-            profile = self.db.query(TikTokProfile).filter(
-                TikTokProfile.user_id == user_id
-            ).first()
+            profile = self._get_user_profile(user_id)
             
             if not profile:
                 return None
             
-            # Get historical analytics for growth calculation (skip for now since no ProfileAnalytics table)
-            previous_analytics = []
-            
-            # Calculate current metrics
-            current_metrics = self._calculate_current_metrics(profile)
-            
-            # Calculate growth metrics
-            growth_metrics = self._calculate_growth_metrics(profile, previous_analytics)
-            
-            # Calculate video performance metrics
-            video_metrics = self._calculate_video_metrics(profile.id)
+            return self.calculate_for_profile(profile, store=True)
             
-            # Calculate engagement metrics
-            engagement_metrics = self._calculate_engagement_metrics(profile.id)
+        except Exception as e:
+            logger.error(f"Error calculating analytics for user {user_id}: {str(e)}")
+            return None
+    
+    @timed_service("analytics_engine")
+    def get_profile_analytics(self, user_id: int) -> Optional[Dict]:
+        """Analytics for a user's profile, served from the shared cache when warm"""
+        try:
+            profile = self._get_user_profile(user_id)
             
-            # Combine all metrics
-            analytics = {
-                **current_metrics,
-                **growth_metrics,
-                **video_metrics,
-                **engagement_metrics,
-                'profile_id': profile.id,
-                'calculated_at': datetime.utcnow().isoformat()
-            }
+            if not profile:
+                return None
             
-            # Store analytics in database
-            self._store_analytics(profile.id, analytics)
+            cached = get_cache().get(analytics_cache_key(profile.id))
+            if cached is not None:
+                return cached
             
-            return analytics
+            return self.calculate_for_profile(profile)
             
         except Exception as e:
-            logger.error(f"Error calculating analytics for user {user_id}: {str(e)}")
+            logger.error(f"Error loading analytics for user {user_id}: {str(e)}")
             return None
     
+    def calculate_for_profile(self, profile: TikTokProfile, store: bool = False) -> Dict:
+        """
+        Calculate analytics for a profile and refresh the shared cache.
+        With store=True the result is also written as today's analytics
+        snapshot and cached until the next data change replaces it.
+        """
+        # Get historical analytics for growth calculation (skip for now since no ProfileAnalytics table)
+        previous_analytics = []
+        
+        # Calculate current metrics
+        current_metrics = self._calculate_current_metrics(profile)
+        
+        # Calculate growth metrics
+        growth_metrics = self._calculate_growth_metrics(profile, previous_analytics)
+        
+        # Load the profile's videos once and share them between the metric passes
+        videos = self._get_profile_videos(profile.id)
+        
+        # Calculate video performance metrics
+        video_metrics = self._calculate_video_metrics(videos)
+        
+        # Calculate engagement metrics
+        engagement_metrics = self._calculate_engagement_metrics(videos)
+        
+        # Combine all metrics
+        analytics = {
+            **current_metrics,
+            **growth_metrics,
+            **video_metrics,
+            **engagement_metrics,
+            'profile_id': profile.id,
+            'calculated_at': datetime.utcnow().isoformat()
+        }
+        
+        if store:
+            self._store_analytics(profile, analytics, videos)
+            ttl = settings.ANALYTICS_PRECOMPUTED_TTL
+        else:
+            ttl = settings.ANALYTICS_CACHE_TTL
+        
+        get_cache().set(analytics_cache_key(profile.id), analytics, ttl)
+        
+        return analytics
+    
+    def _get_user_profile(self, user_id: int) -> Optional[TikTokProfile]:
+        return get_user_profile(self.db, user_id)
+    
     def _calculate_current_metrics(self, profile: TikTokProfile) -> Dict:
         """Calculate current profile metrics"""
         return {
@@ -136,141 +183,38 @@ class AnalyticsEngine:
         
         return growth_metrics
     
-    def _calculate_video_metrics(self, profile_id: int) -> Dict:
-        """Calculate video performance metrics"""
-        videos = self.db.query(TikTokVideo).filter(
+    def _get_profile_videos(self, profile_id: int) -> List[TikTokVideo]:
+        """Load a profile's videos, best performing first"""
+        return self.db.query(TikTokVideo).filter(
             TikTokVideo.profile_id == profile_id
         ).order_by(desc(TikTokVideo.view_count)).all()
-        
-        if not videos:
-            return {
-                'avg_views': 0,
-                'avg_likes': 0,
-                'best_performing_video_views': 0,
-                'worst_performing_video_views': 0,
-                'total_videos': 0,
-                'top_performing_video': None
-            }
-        
-        # Calculate averages
-        total_views = sum(video.view_count or 0 for video in videos)
-        total_likes = sum(video.like_count or 0 for video in videos)
-        
-        avg_views = total_views / len(videos) if videos else 0
-        avg_likes = total_likes / len(videos) if videos else 0
-        
-        # Get best and worst performing videos
-        best_video = videos[0] if videos else None
-        worst_video = videos[-1] if videos else None
-        
-        # Create top performing video object
-        top_video = None
-        if best_video:
-            top_video = {
-                'video_id': str(best_video.id),
-                'video_url': best_video.video_url or f'https://tiktok.com/@profile/video/{best_video.id}',
-                'description': best_video.description or 'No description available',
-                'view_count': best_video.view_count or 0,
-                'like_count': best_video.like_count or 0,
-                'comment_count': best_video.comment_count or 0,
-                'share_count': best_video.share_count or 0,
-                'engagement_rate': self._calculate_single_video_engagement(best_video)
-            }
-        
-        return {
-            'avg_views': round(avg_views),
-            'avg_likes': round(avg_likes),
-            'best_performing_video_views': best_video.view_count if best_video else 0,
-            'worst_performing_video_views': worst_video.view_count if worst_video else 0,
-            'total_videos': len(videos),
-            'top_performing_video': top_video
-        }
+    
+    def _calculate_video_metrics(self, videos: List[TikTokVideo]) -> Dict:
+        """Calculate video performance metrics from videos sorted by views (descending)"""
+        return analytics_metrics.video_metrics(videos)
     
     def _calculate_single_video_engagement(self, video: 'TikTokVideo') -> float:
         """Calculate engagement rate for a single video"""
-        if not video.view_count or video.view_count == 0:
-            return 0.0
-        
-        total_engagement = (video.like_count or 0) + (video.comment_count or 0) + (video.share_count or 0)
-        return round((total_engagement / video.view_count) * 100, 2)
+        return analytics_metrics.single_video_engagement(video)
     
-    def _calculate_engagement_metrics(self, profile_id: int) -> Dict:
+    def _calculate_engagement_metrics(self, videos: List[TikTokVideo]) -> Dict:
         """Calculate engagement rate and related metrics"""
-        videos = self.db.query(TikTokVideo).filter(
-            TikTokVideo.profile_id == profile_id
-        ).all()
-        
-        if not videos:
-            return {
-                'avg_engagement_rate': 0.0,
-                'engagement_trend': 'stable'
-            }
-        
-        # Calculate engagement rates for each video
-        engagement_rates = []
-        total_views = 0
-        videos_with_data = 0
-        
-        for video in videos:
-            if video.view_count and video.view_count > 0:
-                total_views += video.view_count
-                videos_with_data += 1
-                
-                # If we have engagement data, calculate rate
-                if video.like_count is not None or video.comment_count is not None or video.share_count is not None:
-                    total_engagement = (video.like_count or 0) + (video.comment_count or 0) + (video.share_count or 0)
-                    engagement_rate = (total_engagement / video.view_count) * 100
-                    engagement_rates.append(engagement_rate)
-        
-        # If no engagement data available, estimate based on industry averages
-        if not engagement_rates and videos_with_data > 0:
-            # TikTok average engagement rate is 3-9%, use conservative 4%
-            estimated_rate = 4.0
-            return {
-                'avg_engagement_rate': estimated_rate,
-                'engagement_trend': 'stable',
-                'is_estimated': True,
-                'total_videos_analyzed': videos_with_data,
-                'avg_views': total_views / videos_with_data if videos_with_data > 0 else 0
-            }
-        
-        if not engagement_rates:
-            return {
-                'avg_engagement_rate': 0.0,
-                'engagement_trend': 'stable',
-                'is_estimated': False
-            }
-        
-        avg_engagement = statistics.mean(engagement_rates)
-        
-        # Determine engagement trend (simplified)
-        trend = 'stable'
-        if len(engagement_rates) >= 3:
-            recent_avg = statistics.mean(engagement_rates[-3:])
-            older_avg = statistics.mean(engagement_rates[:-3]) if len(engagement_rates) > 3 else recent_avg
-            
-            if recent_avg > older_avg * 1.1:
-                trend = 'increasing'
-            elif recent_avg < older_avg * 0.9:
-                trend = 'decreasing'
-        
-        return {
-            'avg_engagement_rate': round(avg_engagement, 2),
-            'engagement_trend': trend,
-            'max_engagement_rate': max(engagement_rates),
-            'min_engagement_rate': min(engagement_rates)
-        }
+        return analytics_metrics.engagement_metrics(videos)
     
-    def _store_analytics(self, profile_id: int, analytics: Dict) -> None:
-        """Store calculated analytics in database - skip for now"""
-        # Skip storing analytics until ProfileAnalytics table is properly configured
-        pass
+    def _store_analytics(self, profile: TikTokProfile, analytics: Dict, videos: List[TikTokVideo]) -> None:
+        """Write analytics as the profile's snapshot for today (one row per day)"""
+        fields = analytics_metrics.snapshot_fields(analytics, videos, profile.follower_velocity)
+        # Upsert: the nightly batch or a concurrent recompute may have written today's row
+        self.db.execute(
+            upsert(self.db.get_bind().dialect.name, ProfileAnalytics, ["profile_id", "date"], fields),
+            {"profile_id": profile.id, "date": datetime.utcnow().date(), **fields}
+        )
+        self.db.commit()
     
+    @timed_service("analytics_engine")
     def get_growth_timeline(self, user_id: int, days: int = 30) -> List[Dict]:
         """Get growth timeline for charts and graphs"""
-        profile = self.db.query(TikTokProfile).filter(
-            TikTokProfile.user_id == user_id
-        ).first()
+        profile = get_user_profile(self.db, user_id)
         
         if not profile:
             return []
@@ -290,11 +234,10 @@ class AnalyticsEngine:
         
         return timeline
     
+    @timed_service("analytics_engine")
     def get_content_insights(self, user_id: int) -> Dict:
         """Analyze content patterns and provide insights"""
-        profile = self.db.query(TikTokProfile).filter(
-            TikTokProfile.user_id == user_id
-        ).first()
+        profile = get_user_profile(self.db, user_id)
         
         if not profile:
             return {}
@@ -307,25 +250,18 @@ class AnalyticsEngine:
             return {'message': 'No video data available for analysis'}
         
         # Analyze posting patterns, hashtags, descriptions, etc.
+        posting = PostingPatterns(self.db).get(profile.id)
         insights = {
             'total_videos_analyzed': len(videos),
             'avg_description_length': statistics.mean([len(v.description or '') for v in videos]),
             'videos_with_descriptions': len([v for v in videos if v.description]),
-            'posting_consistency': self._analyze_posting_consistency(videos),
+            'posting_consistency': posting['cadence']['consistency'],
+            'best_posting_slots': posting['heatmap']['best_slots'],
             'performance_insights': self._generate_performance_insights(videos)
         }
         
         return insights
     
-    def _analyze_posting_consistency(self, videos: List[TikTokVideo]) -> str:
-        """Analyze how consistently the user posts content"""
-        if len(videos) < 3:
-            return 'insufficient_data'
-        
-        # This would analyze posting dates if available
-        # For now, return a placeholder
-        return 'regular'  # Could be 'regular', 'irregular', 'sporadic'
-    
     def _generate_performance_insights(self, videos: List[TikTokVideo]) -> List[str]:
         """Generate actionable insights based on video performance"""
         insights = []
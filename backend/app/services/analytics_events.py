@@ -0,0 +1,67 @@
+"""
+"Profile data changed" events.
+
+Scrapes publish an event once they commit new profile or video data. The
+event schedules one recompute of the profile's analytics and similarity
+vector on a worker, ANALYTICS_RECOMPUTE_DEBOUNCE seconds later, so the
+dashboard reads a precomputed snapshot instead of paying for the
+calculation itself. Events that arrive while a recompute is pending are
+folded into it. The pending marker lives in the cache, which publishers
+(API and workers) and the recompute share through CACHE_BACKEND=redis.
+"""
+from typing import Optional
+import logging
+from app.core.cache import bump_data_version, get_cache
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.tiktok_profile import TikTokProfile
+from app.services.analytics_engine import AnalyticsEngine, analytics_cache_key
+from app.services.creator_similarity import CreatorVectorStore
+from app.services.posting_patterns import profile_data_scope
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DATA_CHANGED = "profile_data_changed"
+
+# Lets a pending marker expire if its task is lost, so later events aren't swallowed
+PENDING_GRACE_SECONDS = 300
+
+def recompute_pending_key(profile_id: int) -> str:
+    return f"analytics:recompute-pending:{profile_id}"
+
+def publish_profile_data_changed(profile_id: int) -> bool:
+    """Schedule a debounced analytics recompute; returns False if one is already pending"""
+    # Versioned results (posting patterns, ...) are stale from now on, recompute or not
+    bump_data_version(profile_data_scope(profile_id))
+    cache = get_cache()
+    pending_key = recompute_pending_key(profile_id)
+    if not cache.add(pending_key, PROFILE_DATA_CHANGED, settings.ANALYTICS_RECOMPUTE_DEBOUNCE + PENDING_GRACE_SECONDS):
+        return False
+
+    # Imported here so publishers only load Celery once they have an event to send
+    from app.worker import recompute_profile_analytics
+    try:
+        recompute_profile_analytics.apply_async(args=[profile_id], countdown=settings.ANALYTICS_RECOMPUTE_DEBOUNCE)
+    except Exception as e:
+        logger.error(f"Could not queue analytics recompute for profile {profile_id}: {str(e)}")
+        # Fall back to invalidation so the next read computes fresh numbers
+        cache.delete(pending_key)
+        cache.delete(analytics_cache_key(profile_id))
+        return False
+    return True
+
+def handle_profile_data_changed(profile_id: int) -> Optional[dict]:
+    """Recompute a profile's analytics snapshot and cache entry (runs on a worker)"""
+    # Clear the marker first: changes committed after this point publish a new event
+    get_cache().delete(recompute_pending_key(profile_id))
+
+    db = SessionLocal()
+    try:
+        profile = db.query(TikTokProfile).filter(TikTokProfile.id == profile_id).first()
+        if not profile:
+            return None
+        analytics = AnalyticsEngine(db).calculate_for_profile(profile, store=True)
+        CreatorVectorStore(db).refresh([profile_id])
+        return analytics
+    finally:
+        db.close()
@@ -0,0 +1,169 @@
+"""
+Pure analytics calculations shared by AnalyticsEngine and the batch pipeline.
+
+Functions take any sequence of video-like objects exposing view_count,
+like_count, comment_count, share_count and posted_at (ORM TikTokVideo rows or the
+plain VideoStats tuples the batch workers receive), so they can run in
+worker processes without a database session.
+"""
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Sequence
+import statistics
+from app.services.engagement_trend import video_trend
+
+class VideoStats(NamedTuple):
+    """Picklable stand-in for the TikTokVideo columns the metrics read"""
+    id: int
+    video_id: str
+    view_count: Optional[int]
+    like_count: Optional[int]
+    comment_count: Optional[int]
+    share_count: Optional[int]
+    video_url: Optional[str] = None
+    description: Optional[str] = None
+    posted_at: Optional[datetime] = None
+
+def video_metrics(videos: Sequence) -> Dict:
+    """Calculate video performance metrics from videos sorted by views (descending)"""
+    if not videos:
+        return {
+            'avg_views': 0,
+            'avg_likes': 0,
+            'best_performing_video_views': 0,
+            'worst_performing_video_views': 0,
+            'total_videos': 0,
+            'top_performing_video': None
+        }
+
+    # Calculate averages
+    total_views = sum(video.view_count or 0 for video in videos)
+    total_likes = sum(video.like_count or 0 for video in videos)
+
+    avg_views = total_views / len(videos) if videos else 0
+    avg_likes = total_likes / len(videos) if videos else 0
+
+    # Get best and worst performing videos
+    best_video = videos[0] if videos else None
+    worst_video = videos[-1] if videos else None
+
+    # Create top performing video object
+    top_video = None
+    if best_video:
+        top_video = {
+            'video_id': best_video.video_id,
+            'video_url': best_video.video_url or f'https://tiktok.com/@profile/video/{best_video.id}',
+            'description': best_video.description or 'No description available',
+            'view_count': best_video.view_count or 0,
+            'like_count': best_video.like_count or 0,
+            'comment_count': best_video.comment_count or 0,
+            'share_count': best_video.share_count or 0,
+            'engagement_rate': single_video_engagement(best_video)
+        }
+
+    return {
+        'avg_views': round(avg_views),
+        'avg_likes': round(avg_likes),
+        'best_performing_video_views': best_video.view_count if best_video else 0,
+        'worst_performing_video_views': worst_video.view_count if worst_video else 0,
+        'total_videos': len(videos),
+        'top_performing_video': top_video
+    }
+
+def single_video_engagement(video) -> float:
+    """Calculate engagement rate for a single video"""
+    if not video.view_count or video.view_count == 0:
+        return 0.0
+
+    total_engagement = (video.like_count or 0) + (video.comment_count or 0) + (video.share_count or 0)
+    return round((total_engagement / video.view_count) * 100, 2)
+
+def engagement_metrics(videos: Sequence) -> Dict:
+    """Calculate engagement rate and related metrics"""
+    if not videos:
+        return {
+            'avg_engagement_rate': 0.0,
+            'engagement_trend': 'stable'
+        }
+
+    # Calculate engagement rates for each video
+    engagement_rates = []
+    total_views = 0
+    videos_with_data = 0
+
+    for video in videos:
+        if video.view_count and video.view_count > 0:
+            total_views += video.view_count
+            videos_with_data += 1
+
+            # If we have engagement data, calculate rate
+            if video.like_count is not None or video.comment_count is not None or video.share_count is not None:
+                total_engagement = (video.like_count or 0) + (video.comment_count or 0) + (video.share_count or 0)
+                engagement_rate = (total_engagement / video.view_count) * 100
+                engagement_rates.append(engagement_rate)
+
+    # If no engagement data available, estimate based on industry averages
+    if not engagement_rates and videos_with_data > 0:
+        # TikTok average engagement rate is 3-9%, use conservative 4%
+        estimated_rate = 4.0
+        return {
+            'avg_engagement_rate': estimated_rate,
+            'engagement_trend': 'stable',
+            'is_estimated': True,
+            'total_videos_analyzed': videos_with_data,
+            'avg_views': total_views / videos_with_data if videos_with_data > 0 else 0
+        }
+
+    if not engagement_rates:
+        return {
+            'avg_engagement_rate': 0.0,
+            'engagement_trend': 'stable',
+            'is_estimated': False
+        }
+
+    avg_engagement = statistics.mean(engagement_rates)
+
+    # Trend over posting time (videos arrive in any order, e.g. by views)
+    trend = video_trend(videos) or {}
+
+    return {
+        'avg_engagement_rate': round(avg_engagement, 2),
+        'engagement_trend': trend.get('trend', 'stable'),
+        'engagement_trend_confidence': trend.get('confidence'),
+        'engagement_slope_per_week': trend.get('slope_per_week'),
+        'rolling_engagement_rate': trend.get('rolling_mean'),
+        'ewma_engagement_rate': trend.get('ewma'),
+        'max_engagement_rate': max(engagement_rates),
+        'min_engagement_rate': min(engagement_rates)
+    }
+
+def daily_follower_growth(follower_velocity: Optional[float]) -> Optional[int]:
+    """A day's follower growth from the profile's smoothed followers/day; None until scrapes have measured it"""
+    return None if follower_velocity is None else round(follower_velocity)
+
+def snapshot_fields(analytics: Dict, videos: Sequence, follower_velocity: Optional[float] = None) -> Dict:
+    """Column values of a ProfileAnalytics snapshot for computed analytics"""
+    count = len(videos)
+    total_views = sum(video.view_count or 0 for video in videos)
+    total_likes = sum(video.like_count or 0 for video in videos)
+    return {
+        'avg_views': analytics.get('avg_views'),
+        'avg_likes': analytics.get('avg_likes'),
+        'avg_comments': sum(video.comment_count or 0 for video in videos) / count if count else 0,
+        'avg_shares': sum(video.share_count or 0 for video in videos) / count if count else 0,
+        'avg_engagement_rate': analytics.get('avg_engagement_rate'),
+        'total_views_period': total_views,
+        'total_likes_period': total_likes,
+        'follower_growth': daily_follower_growth(follower_velocity),
+    }
+
+def profile_snapshot(videos: List, follower_velocity: Optional[float] = None) -> Dict:
+    """
+    Snapshot columns computed from a profile's videos and follower velocity,
+    matching what AnalyticsEngine.calculate_for_profile stores
+    """
+    videos = sorted(videos, key=lambda video: video.view_count or 0, reverse=True)
+    analytics = {
+        **video_metrics(videos),
+        **engagement_metrics(videos),
+    }
+    return snapshot_fields(analytics, videos, follower_velocity)
@@ -1,102 +1,159 @@
 import asyncio
-from typing import List, Dict, Optional
+import time
+from typing import List, Dict, Optional, Tuple
+from collections import Counter
 from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.niches import NICHES, Niche, resolve_niche
 from app.services.tiktok_scraper import TikTokScraper
+from app.services.scrape_scheduler import NICHE
+from app.services.niche_insights import NicheInsightStore, request_niche_refresh
 from app.models.user import User
 from app.models.tiktok_profile import TikTokProfile
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Reference creators scraped per niche, to stay within rate limits
+CREATORS_PER_NICHE = 5
+
 class BestPracticesAnalyzer:
     """Analyzes top creators to extract actionable best practices"""
     
     def __init__(self, db: Session):
         self.db = db
-        self.scraper = TikTokScraper()
+        self.scraper = None
     
-    async def analyze_top_creators(self, user_id: int, target_audience: str = "fashion") -> Dict:
-        """Analyze top creators in target audience and extract best practices"""
+    def get_best_practices(self, user: User, target_audience: Optional[str] = None) -> Dict:
+        """Precomputed best practices for the user's niche, personalized for the user"""
+        niche = resolve_niche(target_audience) if target_audience else (user.niche or resolve_niche(user.target_audience))
         try:
-            # Get top creators in fashion/style niche
-            top_creators = self._get_top_creators_list(target_audience)
-            
-            # Analyze their profiles and extract insights
-            best_practices = await self._extract_best_practices(top_creators)
-            
-            # Generate personalized recommendations
-            recommendations = self._generate_recommendations(user_id, best_practices)
-            
-            return {
-                'best_practices': best_practices,
-                'recommendations': recommendations,
-                'analyzed_creators': len(top_creators),
-                'target_audience': target_audience
-            }
-            
+            insight = NicheInsightStore(self.db).get(niche)
         except Exception as e:
-            logger.error(f"Error analyzing best practices: {str(e)}")
-            return self._get_fallback_best_practices(target_audience)
+            logger.error(f"Error loading insights for niche {niche}: {str(e)}")
+            insight = None
+        
+        if insight is None:
+            # First request for this niche: compute it in the background meanwhile
+            request_niche_refresh(niche)
+            return self._get_fallback_best_practices(niche)
+        
+        best_practices = insight['best_practices']
+        bio = user.tiktok_profile.bio if user.tiktok_profile else None
+        analysis = {
+            'best_practices': best_practices,
+            'recommendations': self._generate_recommendations(best_practices, NICHES[niche], bio),
+            'analyzed_creators': insight['analyzed_creators'],
+            'target_audience': niche,
+            'version': insight['version'],
+            'computed_at': insight['computed_at']
+        }
+        total_creators = len(self._get_top_creators_list(niche))
+        if insight['analyzed_creators'] < total_creators:
+            # The analysis hit its time limit or some creators couldn't be scraped
+            analysis['note'] = f"Partial results from {insight['analyzed_creators']} of {total_creators} top creators"
+        return analysis
     
-    async def _get_top_creators_list(self, niche: str) -> List[str]:
-        """Get list of top creators in the specified niche by scraping data"""
-        creators = await self.scraper.get_top_creators(niche)
+    async def analyze_niche(self, niche: str, time_limit: Optional[float] = None) -> Dict:
+        """Scrape and analyze a niche's top creators (background work, see niche_insights)"""
+        # Many-creator analysis yields to onboarding and refreshes
+        self.scraper = self.scraper or TikTokScraper(priority=NICHE)
+        top_creators = self._get_top_creators_list(niche)
+        if time_limit is None:
+            time_limit = settings.NICHE_ANALYSIS_TIME_LIMIT
+        best_practices, analyzed = await self._extract_best_practices(top_creators, NICHES[niche], time_limit)
+        return {
+            'best_practices': best_practices,
+            'analyzed_creators': analyzed,
+            'niche': niche
+        }
+    
+    def _get_top_creators_list(self, niche: str) -> List[str]:
+        """Reference creators for the niche from the taxonomy"""
+        return list(NICHES[niche].creators[:CREATORS_PER_NICHE])
+    
+    async def _extract_best_practices(self, creators: List[str], niche: Niche,
+                                      time_limit: Optional[float] = None) -> Tuple[Dict, int]:
+        """
+        Extract best practices from top creators; also returns how many were analyzed.
+        Creators are analyzed concurrently into independent partial results that
+        are merged at the end. Whatever has finished when time_limit (seconds)
+        runs out is used; the rest is cancelled, and the scraper's deadline
+        makes their browser threads stop at the same time.
+        """
+        semaphore = asyncio.Semaphore(settings.NICHE_ANALYSIS_CONCURRENCY)
+        if time_limit is not None:
+            self.scraper.deadline = time.monotonic() + time_limit
+        
+        async def analyze(creator: str) -> Optional[Dict]:
+            async with semaphore:
+                return await self._analyze_creator(creator, niche)
         
-        if niche == "fashion":
-            return creators[:5]  # Analyze top 5 to avoid rate limits
+        tasks = [asyncio.create_task(analyze(creator)) for creator in creators]
+        if not tasks:
+            return self._summarize_practices(self._merge_practices([])), 0
+        done, pending = await asyncio.wait(tasks, timeout=time_limit)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.warning(f"Best practices time limit reached; using {len(done)} of {len(tasks)} creators")
+            # Cancelled tasks return promptly; their slots are released as their threads exit
+            await asyncio.gather(*pending, return_exceptions=True)
         
-        return creators[:3]  # Default fallback
+        partials = [task.result() for task in done if task.result() is not None]
+        return self._summarize_practices(self._merge_practices(partials)), len(partials)
     
-    async def _extract_best_practices(self, creators: List[str]) -> Dict:
-        """Extract best practices from top creators"""
+    async def _analyze_creator(self, creator: str, niche: Niche) -> Optional[Dict]:
+        """Practices of a single creator; None if the creator couldn't be scraped"""
         practices = {
-            'posting_frequency': {},
             'content_themes': {},
             'engagement_strategies': {},
             'bio_patterns': {},
             'follower_ranges': {}
         }
-        
-        for creator in creators:
-            try:
-                # Get creator profile data
-                profile_data = await self.scraper.get_profile_data(creator)
-                if not profile_data:
-                    continue
-                
-                # Analyze bio patterns
-                bio = profile_data.get('bio', '').lower()
-                self._analyze_bio_patterns(bio, practices['bio_patterns'])
-                
-                # Analyze follower count ranges
-                followers = profile_data.get('follower_count', 0)
-                self._categorize_follower_range(followers, practices['follower_ranges'])
-                
-                # Get recent videos for content analysis
-                videos = await self.scraper.get_recent_videos(creator, limit=5)
-                self._analyze_content_themes(videos, practices['content_themes'])
-                
-                # Analyze engagement patterns
-                self._analyze_engagement_patterns(videos, practices['engagement_strategies'])
-                
-            except Exception as e:
-                logger.warning(f"Failed to analyze creator {creator}: {str(e)}")
-                continue
-        
-        return self._summarize_practices(practices)
+        try:
+            # Profile and recent videos are independent pages, fetch them together
+            profile_data, videos = await asyncio.gather(
+                self.scraper.get_profile_data(creator),
+                self.scraper.get_recent_videos(creator, limit=5)
+            )
+            if not profile_data:
+                return None
+            
+            # Analyze bio patterns
+            bio = profile_data.get('bio') or ''
+            self._analyze_bio_patterns(bio, practices['bio_patterns'], niche)
+            
+            # Analyze follower count ranges
+            followers = profile_data.get('follower_count') or 0
+            self._categorize_follower_range(followers, practices['follower_ranges'])
+            
+            # Analyze content themes and engagement patterns of recent videos
+            self._analyze_content_themes(videos, practices['content_themes'], niche)
+            self._analyze_engagement_patterns(videos, practices['engagement_strategies'])
+            return practices
+            
+        except Exception as e:
+            logger.warning(f"Failed to analyze creator {creator}: {str(e)}")
+            return None
+    
+    def _merge_practices(self, partials: List[Dict]) -> Dict:
+        """Sum per-creator frequency counts into niche-wide totals"""
+        merged = {
+            'content_themes': Counter(),
+            'engagement_strategies': Counter(),
+            'bio_patterns': Counter(),
+            'follower_ranges': Counter()
+        }
+        for partial in partials:
+            for category, counts in partial.items():
+                merged[category].update(counts)
+        return {category: dict(counts) for category, counts in merged.items()}
     
-    def _analyze_bio_patterns(self, bio: str, patterns: Dict):
+    def _analyze_bio_patterns(self, bio: str, patterns: Dict, niche: Niche):
         """Analyze common bio patterns"""
-        keywords = ['fashion', 'style', 'outfit', 'ootd', 'brand', 'collab', 'dm', 'business']
-        emojis = ['✨', '💫', '🌟', '💖', '👑', '🔥', '💯']
-        
-        for keyword in keywords:
-            if keyword in bio:
-                patterns[keyword] = patterns.get(keyword, 0) + 1
-        
-        for emoji in emojis:
-            if emoji in bio:
-                patterns[f'emoji_{emoji}'] = patterns.get(f'emoji_{emoji}', 0) + 1
+        for element in niche.bio_matcher.matches(bio):
+            patterns[element] = patterns.get(element, 0) + 1
     
     def _categorize_follower_range(self, followers: int, ranges: Dict):
         """Categorize follower counts into ranges"""
@@ -109,26 +166,16 @@ class BestPracticesAnalyzer:
         else:
             ranges['micro_influencer'] = ranges.get('micro_influencer', 0) + 1
     
-    def _analyze_content_themes(self, videos: List[Dict], themes: Dict):
+    def _analyze_content_themes(self, videos: List[Dict], themes: Dict, niche: Niche):
         """Analyze common content themes"""
-        theme_keywords = {
-            'dance': ['dance', 'dancing', 'choreography'],
-            'fashion': ['outfit', 'ootd', 'style', 'fashion'],
-            'lifestyle': ['day', 'morning', 'routine', 'life'],
-            'beauty': ['makeup', 'skincare', 'beauty', 'glow'],
-            'trending': ['trend', 'viral', 'challenge']
-        }
-        
         for video in videos:
-            description = video.get('description', '').lower()
-            for theme, keywords in theme_keywords.items():
-                if any(keyword in description for keyword in keywords):
-                    themes[theme] = themes.get(theme, 0) + 1
+            for theme in niche.theme_matcher.matches(video.get('description') or ''):
+                themes[theme] = themes.get(theme, 0) + 1
     
     def _analyze_engagement_patterns(self, videos: List[Dict], strategies: Dict):
         """Analyze engagement strategies"""
         for video in videos:
-            views = video.get('view_count', 0)
+            views = video.get('view_count') or 0
             
             # Categorize by performance
             if views > 1000000:  # 1M+ views
@@ -152,18 +199,22 @@ class BestPracticesAnalyzer:
         sorted_items = sorted(data.items(), key=lambda x: x[1], reverse=True)
         return [{'element': k, 'frequency': v} for k, v in sorted_items[:limit]]
     
-    def _generate_recommendations(self, user_id: int, practices: Dict) -> List[Dict]:
+    def _generate_recommendations(self, practices: Dict, niche: Niche, bio: Optional[str] = None) -> List[Dict]:
         """Generate personalized recommendations based on best practices"""
         recommendations = []
         
-        # Bio optimization recommendations
-        top_bio_elements = practices.get('top_bio_elements', [])
-        if top_bio_elements:
+        # Bio optimization recommendations - only elements the user's bio is missing
+        bio_elements = niche.bio_matcher.matches(bio or '')
+        missing_bio_elements = [
+            elem['element'] for elem in practices.get('top_bio_elements', [])
+            if elem['element'] not in bio_elements
+        ]
+        if missing_bio_elements:
             recommendations.append({
                 'category': 'Bio Optimization',
                 'title': 'Optimize Your Bio with Proven Elements',
-                'description': f"Top creators use these elements: {', '.join([elem['element'] for elem in top_bio_elements[:3]])}",
-                'action': 'Update your bio to include fashion keywords and relevant emojis',
+                'description': f"Top creators use these elements: {', '.join(missing_bio_elements[:3])}",
+                'action': f'Update your bio to include {niche.label.lower()} keywords and relevant emojis',
                 'priority': 'high'
             })
         
@@ -193,18 +244,19 @@ class BestPracticesAnalyzer:
         return recommendations
     
     def _get_fallback_best_practices(self, niche: str) -> Dict:
-        """Provide fallback best practices when analysis fails"""
+        """Provide fallback best practices until the niche's insights are computed"""
+        taxonomy = NICHES[niche]
+        themes = [niche] + [theme for theme in ('lifestyle', 'trending') if theme != niche]
         return {
             'best_practices': {
                 'top_bio_elements': [
-                    {'element': 'fashion', 'frequency': 5},
-                    {'element': 'style', 'frequency': 4},
+                    {'element': taxonomy.keywords[0], 'frequency': 5},
+                    {'element': taxonomy.keywords[1], 'frequency': 4},
                     {'element': '✨', 'frequency': 3}
                 ],
                 'most_successful_themes': [
-                    {'element': 'fashion', 'frequency': 8},
-                    {'element': 'lifestyle', 'frequency': 6},
-                    {'element': 'trending', 'frequency': 5}
+                    {'element': theme, 'frequency': frequency}
+                    for theme, frequency in zip(themes, (8, 6, 5))
                 ],
                 'engagement_insights': {
                     'viral_content': 2,
@@ -215,15 +267,15 @@ class BestPracticesAnalyzer:
             'recommendations': [
                 {
                     'category': 'Content Strategy',
-                    'title': 'Focus on Fashion and Lifestyle Content',
-                    'description': 'Fashion and lifestyle content performs best in your niche',
-                    'action': 'Create outfit posts, style tips, and lifestyle content',
+                    'title': f'Focus on {taxonomy.label} Content',
+                    'description': f'{taxonomy.label} content performs best in your niche',
+                    'action': f"Create content around {', '.join(taxonomy.keywords[:3])}",
                     'priority': 'high'
                 }
             ],
             'analyzed_creators': 0,
             'target_audience': niche,
-            'note': 'Using fallback recommendations due to analysis limitations'
+            'note': 'Niche insights are still being computed; showing general recommendations'
         }
     
     async def close(self):
@@ -0,0 +1,455 @@
+"""
+Creator similarity engine behind creator recommendations.
+
+Every active profile gets a small feature vector (ProfileVector):
+  - follower tier (log scale), engagement rate and posting cadence over the
+    last VIDEO_WINDOW_DAYS
+  - share of recent videos per content theme (all niches' themes)
+  - niches whose keywords appear in the bio
+Vectors are scaled to unit length, so cosine similarity is a dot product.
+
+SimilarityIndex keeps all vectors in one float32 matrix per process and
+answers top-k queries by exact brute force (one matrix-vector product, then
+a sort of the few scores above a sampled cutoff). With faiss installed and at least
+SIMILARITY_ANN_MIN_PROFILES vectors it switches to an approximate HNSW
+index. Vectors are recomputed for a profile whenever its data changes and
+for everyone by the nightly batch.
+
+CreatorRecommender replaces a user's recommendations set-based: one UPDATE
+deactivates the old rows, one bulk INSERT adds the new ones and their
+RecommendationTally rows are rewritten, so the insights endpoint reads
+factor/theme counts instead of recounting them per request. refresh_all()
+does the same for every user with an active profile in batches, querying
+from the user's first profile (as the endpoints do) and scoring a batch's
+queries with matrix products; purge_inactive_recommendations() drops deactivated rows
+after RECOMMENDATION_RETENTION_DAYS.
+
+numpy is imported by the functions that use it, so importing this module
+(as the API does at startup) doesn't load it.
+"""
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from collections import Counter
+from datetime import datetime, timedelta
+import logging
+import math
+import threading
+import time
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.keyword_matcher import KeywordMatcher
+from app.core.niches import DEFAULT_THEMES, NICHES
+from app.models.analytics import CreatorRecommendation, RecommendationTally
+from app.models.profile_vector import ProfileVector
+from app.models.tiktok_profile import TikTokProfile
+from app.models.tiktok_video import TikTokVideo
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Bump when the feature layout changes; older rows are recomputed
+FEATURE_VERSION = 1
+
+VIDEO_WINDOW_DAYS = 90
+
+_ALL_THEMES = dict(DEFAULT_THEMES)
+for _niche in NICHES.values():
+    _ALL_THEMES.update(_niche.themes)
+THEME_NAMES = tuple(sorted(_ALL_THEMES))
+NICHE_NAMES = tuple(NICHES)
+
+_THEME_MATCHER = KeywordMatcher(_ALL_THEMES)
+_BIO_MATCHER = KeywordMatcher({niche.name: niche.keywords for niche in NICHES.values()})
+
+# Layout: follower tier, engagement, cadence, themes..., bio niches...
+DIMENSIONS = 3 + len(THEME_NAMES) + len(NICHE_NAMES)
+
+# Relative weight of each block before the vector is normalized
+_THEME_WEIGHT = 1.5
+_BIO_WEIGHT = 1.0
+
+# Values mapped to 1.0 on the scalar features
+_MAX_FOLLOWERS_LOG = 8.0  # 100M followers
+_MAX_ENGAGEMENT_RATE = 20.0
+_MAX_POSTS_PER_WEEK = 21.0
+
+REFRESH_BATCH_SIZE = 1000
+
+def feature_vector(follower_count: Optional[int], engagement_rate: float, posts_per_week: float,
+                   theme_counts: Dict[str, int], bio_niches: Iterable[str]) -> "np.ndarray":
+    """Unit-length float32 vector for one profile"""
+    import numpy as np
+    vector = np.zeros(DIMENSIONS, dtype=np.float32)
+    vector[0] = min(math.log10((follower_count or 0) + 1) / _MAX_FOLLOWERS_LOG, 1.0)
+    vector[1] = min(engagement_rate / _MAX_ENGAGEMENT_RATE, 1.0)
+    vector[2] = min(math.log1p(posts_per_week) / math.log1p(_MAX_POSTS_PER_WEEK), 1.0)
+
+    total = sum(theme_counts.values())
+    if total:
+        for i, theme in enumerate(THEME_NAMES, start=3):
+            vector[i] = _THEME_WEIGHT * theme_counts.get(theme, 0) / total
+
+    bio_niches = set(bio_niches)
+    if bio_niches:
+        offset = 3 + len(THEME_NAMES)
+        for i, niche in enumerate(NICHE_NAMES, start=offset):
+            if niche in bio_niches:
+                vector[i] = _BIO_WEIGHT / len(bio_niches)
+
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+class CreatorVectorStore:
+    """Computes and stores ProfileVector rows"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def refresh(self, profile_ids: Optional[Sequence[int]] = None) -> int:
+        """Recompute vectors for the given profiles, or every active profile in keyset batches"""
+        if profile_ids is not None:
+            for start in range(0, len(profile_ids), REFRESH_BATCH_SIZE):
+                self._refresh_batch(list(profile_ids[start:start + REFRESH_BATCH_SIZE]))
+            return len(profile_ids)
+
+        refreshed, last_id = 0, 0
+        while True:
+            ids = self.db.execute(
+                select(TikTokProfile.id)
+                .where(TikTokProfile.id > last_id, TikTokProfile.is_active.is_(True))
+                .order_by(TikTokProfile.id).limit(REFRESH_BATCH_SIZE)
+            ).scalars().all()
+            if not ids:
+                return refreshed
+            self._refresh_batch(ids)
+            refreshed += len(ids)
+            last_id = ids[-1]
+
+    def _refresh_batch(self, profile_ids: List[int]) -> None:
+        since = datetime.utcnow() - timedelta(days=VIDEO_WINDOW_DAYS)
+        profiles = self.db.execute(
+            select(TikTokProfile.id, TikTokProfile.follower_count, TikTokProfile.bio)
+            .where(TikTokProfile.id.in_(profile_ids))
+        ).all()
+        videos = self.db.execute(
+            select(TikTokVideo.profile_id, TikTokVideo.description, TikTokVideo.view_count,
+                   TikTokVideo.like_count, TikTokVideo.comment_count, TikTokVideo.share_count)
+            .where(TikTokVideo.profile_id.in_(profile_ids),
+                   func.coalesce(TikTokVideo.posted_at, TikTokVideo.created_at) >= since)
+        ).all()
+
+        videos_by_profile: Dict[int, List] = {}
+        for video in videos:
+            videos_by_profile.setdefault(video.profile_id, []).append(video)
+
+        now = datetime.utcnow()
+        rows = []
+        for profile in profiles:
+            profile_videos = videos_by_profile.get(profile.id, [])
+            rates = [
+                ((video.like_count or 0) + (video.comment_count or 0) + (video.share_count or 0)) * 100.0 / video.view_count
+                for video in profile_videos if video.view_count
+            ]
+            engagement_rate = sum(rates) / len(rates) if rates else 0.0
+            posts_per_week = len(profile_videos) * 7.0 / VIDEO_WINDOW_DAYS
+            theme_counts = Counter(
+                theme for video in profile_videos for theme in _THEME_MATCHER.matches(video.description)
+            )
+            vector = feature_vector(profile.follower_count, engagement_rate, posts_per_week,
+                                    theme_counts, _BIO_MATCHER.matches(profile.bio))
+            rows.append({
+                "profile_id": profile.id,
+                "vector": vector.tobytes(),
+                "feature_version": FEATURE_VERSION,
+                "engagement_rate": round(engagement_rate, 2),
+                "posts_per_week": round(posts_per_week, 2),
+                "themes": [theme for theme, _ in theme_counts.most_common(3)],
+                "computed_at": now
+            })
+
+        self.db.execute(delete(ProfileVector).where(ProfileVector.profile_id.in_(profile_ids)))
+        if rows:
+            self.db.execute(insert(ProfileVector), rows)
+        self.db.commit()
+
+class SimilarityIndex:
+    """Top-k cosine similarity over a float32 matrix of unit vectors"""
+
+    def __init__(self, profile_ids: "np.ndarray", vectors: "np.ndarray"):
+        """vectors: one row per profile id"""
+        import numpy as np
+        self.profile_ids = profile_ids
+        # Stored feature-major: the query then streams each feature column
+        # once, about twice as fast as a product over (profiles, features) rows
+        self.columns = np.ascontiguousarray(vectors.T, dtype=np.float32)
+        self._ann = None
+        if len(profile_ids) >= settings.SIMILARITY_ANN_MIN_PROFILES:
+            self._ann = _build_ann(vectors)
+
+    @classmethod
+    def from_db(cls, db: Session) -> "SimilarityIndex":
+        import numpy as np
+        rows = db.execute(
+            select(ProfileVector.profile_id, ProfileVector.vector)
+            .where(ProfileVector.feature_version == FEATURE_VERSION)
+            .order_by(ProfileVector.profile_id)
+            .execution_options(yield_per=10000)
+        )
+        ids, blobs = [], []
+        for profile_id, blob in rows:
+            ids.append(profile_id)
+            blobs.append(blob)
+        vectors = np.frombuffer(b"".join(blobs), dtype=np.float32).reshape(len(ids), DIMENSIONS)
+        return cls(np.asarray(ids, dtype=np.int64), vectors)
+
+    def __len__(self) -> int:
+        return len(self.profile_ids)
+
+    def search(self, vector: "np.ndarray", k: int, exclude: Iterable[int] = ()) -> List[Tuple[int, float]]:
+        """(profile_id, similarity) of the k most similar profiles, most similar first"""
+        return self.search_many(vector.reshape(1, -1), k, [set(exclude)])[0]
+
+    def search_many(self, vectors: "np.ndarray", k: int,
+                    excludes: Optional[Sequence[Set[int]]] = None) -> List[List[Tuple[int, float]]]:
+        """search() for each row of vectors, scoring _QUERY_BATCH queries per matrix product"""
+        import numpy as np
+        excludes = excludes or [set()] * len(vectors)
+        # Over-fetch so excluded profiles don't leave the result short
+        fetch = min(k + max((len(exclude) for exclude in excludes), default=0), len(self))
+        if fetch <= 0:
+            return [[] for _ in range(len(vectors))]
+
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        candidates: List[List[Tuple[int, float]]] = []
+        if self._ann is not None:
+            scores, positions = self._ann.search(vectors, fetch)
+            for row_scores, row_positions in zip(scores, positions):
+                candidates.append([(int(p), float(s)) for p, s in zip(row_positions, row_scores) if p >= 0])
+        else:
+            for start in range(0, len(vectors), _QUERY_BATCH):
+                for row_scores in vectors[start:start + _QUERY_BATCH] @ self.columns:
+                    top = _top_positions(row_scores, fetch)
+                    candidates.append([(int(p), float(row_scores[p])) for p in top])
+
+        results = []
+        for row_candidates, exclude in zip(candidates, excludes):
+            hits = [(int(self.profile_ids[position]), score) for position, score in row_candidates]
+            results.append([hit for hit in hits if hit[0] not in exclude][:k])
+        return results
+
+# Queries scored per matrix product; a product streams the whole matrix
+# once, so batching divides the memory traffic per query
+_QUERY_BATCH = 16
+
+# Every _SAMPLE_STRIDE-th score is sampled to find a cutoff before sorting
+_SAMPLE_STRIDE = 64
+
+def _top_positions(scores: "np.ndarray", k: int) -> "np.ndarray":
+    """Positions of the k highest scores, highest first (exact)"""
+    import numpy as np
+    sample = scores[::_SAMPLE_STRIDE]
+    if len(sample) > k:
+        # The sample's k-th best is a lower bound for the overall k-th best,
+        # so only the few scores above it need sorting
+        cutoff = np.partition(sample, len(sample) - k)[len(sample) - k]
+        candidates = np.flatnonzero(scores >= cutoff)
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind="stable")[:k]]
+
+def _build_ann(vectors: "np.ndarray"):
+    """HNSW inner-product index when faiss is installed, else None (exact search)"""
+    import numpy as np
+    try:
+        import faiss
+    except ImportError:
+        logger.info(f"faiss not installed; using exact search over {len(vectors)} creator vectors")
+        return None
+    index = faiss.IndexHNSWFlat(vectors.shape[1], 32, faiss.METRIC_INNER_PRODUCT)
+    index.add(np.ascontiguousarray(vectors, dtype=np.float32))
+    return index
+
+_index: Optional[SimilarityIndex] = None
+_index_loaded_at = 0.0
+_index_lock = threading.Lock()
+
+def get_similarity_index(db: Session) -> SimilarityIndex:
+    """Process-wide index, reloaded from the database every SIMILARITY_INDEX_TTL seconds"""
+    global _index, _index_loaded_at
+    with _index_lock:
+        if _index is None or time.monotonic() - _index_loaded_at > settings.SIMILARITY_INDEX_TTL:
+            _index = SimilarityIndex.from_db(db)
+            _index_loaded_at = time.monotonic()
+            logger.info(f"Loaded similarity index with {len(_index)} creator vectors")
+        return _index
+
+# Thresholds on the raw features behind a recommendation's success factors
+_HIGH_ENGAGEMENT_RATE = 8.0
+_CONSISTENT_POSTS_PER_WEEK = 3.0
+
+def _success_factors(row: ProfileVector) -> List[str]:
+    factors = []
+    if (row.posts_per_week or 0) >= _CONSISTENT_POSTS_PER_WEEK:
+        factors.append("Consistent posting")
+    if (row.engagement_rate or 0) >= _HIGH_ENGAGEMENT_RATE:
+        factors.append("High engagement")
+    themes = row.themes or []
+    if "trending" in themes:
+        factors.append("Trending sounds")
+    if "dance" in themes:
+        factors.append("Dance content")
+    return factors
+
+def _posting_frequency(posts_per_week: Optional[float]) -> Optional[str]:
+    if not posts_per_week:
+        return None
+    if posts_per_week >= 7:
+        return f"{posts_per_week / 7:.1f} times daily"
+    return f"{posts_per_week:.1f} times weekly"
+
+def _growth_score(profile: TikTokProfile) -> Optional[float]:
+    """Daily follower growth as a share of followers, mapped to 0-1 (1% a day scores 1)"""
+    if profile.follower_velocity is None or not profile.follower_count:
+        return None
+    return round(min(max(profile.follower_velocity / profile.follower_count * 100, 0.0), 1.0), 4)
+
+TALLY_FACTOR = "factor"
+TALLY_THEME = "theme"
+
+def store_recommendation_tallies(db: Session, user_ids: Sequence[int], rows: Sequence[Dict]) -> None:
+    """Replace the users' factor/theme counts with those of their new active recommendation rows"""
+    counts: Dict[int, Counter] = {user_id: Counter() for user_id in user_ids}
+    for row in rows:
+        user_counts = counts[row["user_id"]]
+        user_counts.update((TALLY_FACTOR, factor) for factor in row.get("success_factors") or [])
+        user_counts.update((TALLY_THEME, theme) for theme in row.get("content_themes") or [])
+    db.execute(delete(RecommendationTally).where(RecommendationTally.user_id.in_(list(user_ids))))
+    tallies = [
+        {"user_id": user_id, "kind": kind, "value": value, "count": count}
+        for user_id, user_counts in counts.items()
+        for (kind, value), count in user_counts.items()
+    ]
+    if tallies:
+        db.execute(insert(RecommendationTally), tallies)
+
+def purge_inactive_recommendations(db: Session, older_than_days: Optional[int] = None) -> int:
+    """Delete deactivated recommendations generated more than older_than_days ago"""
+    days = older_than_days if older_than_days is not None else settings.RECOMMENDATION_RETENTION_DAYS
+    result = db.execute(
+        delete(CreatorRecommendation)
+        .where(CreatorRecommendation.is_active == 0,
+               CreatorRecommendation.generated_at < datetime.utcnow() - timedelta(days=days))
+    )
+    db.commit()
+    return result.rowcount
+
+class CreatorRecommender:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def recommend(self, user_id: int, profile: TikTokProfile, limit: Optional[int] = None) -> int:
+        """Replace the user's active recommendations with the profiles most similar to theirs"""
+        return self._replace([(user_id, profile.id)], limit or settings.RECOMMENDATIONS_PER_USER)
+
+    def refresh_all(self, batch_size: int = REFRESH_BATCH_SIZE, limit: Optional[int] = None) -> Dict:
+        """Batch mode: replace recommendations of every user with an active profile, in keyset batches"""
+        limit = limit or settings.RECOMMENDATIONS_PER_USER
+        active_users = select(TikTokProfile.user_id).where(TikTokProfile.is_active.is_(True))
+        users, stored, last_id = 0, 0, 0
+        while True:
+            # One query per user, from the lowest-id profile like the endpoints' lookup
+            batch = self.db.execute(
+                select(TikTokProfile.user_id, func.min(TikTokProfile.id).label("profile_id"))
+                .where(TikTokProfile.user_id > last_id, TikTokProfile.user_id.in_(active_users))
+                .group_by(TikTokProfile.user_id)
+                .order_by(TikTokProfile.user_id).limit(batch_size)
+            ).all()
+            if not batch:
+                return {"users": users, "recommendations": stored}
+            stored += self._replace([(row.user_id, row.profile_id) for row in batch], limit)
+            self.db.commit()
+            users += len(batch)
+            last_id = batch[-1].user_id
+
+    def _replace(self, users: List[Tuple[int, int]], limit: int) -> int:
+        """Deactivate, bulk insert and re-tally recommendations for (user_id, profile_id) pairs"""
+        import numpy as np
+        profile_ids = [profile_id for _, profile_id in users]
+        own = self._vectors(profile_ids)
+        if len(own) < len(profile_ids):
+            CreatorVectorStore(self.db).refresh([pid for pid in profile_ids if pid not in own])
+            own = self._vectors(profile_ids)
+
+        queried = [(user_id, profile_id) for user_id, profile_id in users if profile_id in own]
+        owned = self._owned_profiles([user_id for user_id, _ in queried])
+        hits_per_user = get_similarity_index(self.db).search_many(
+            np.stack([own[profile_id] for _, profile_id in queried]), limit,
+            [owned[user_id] for user_id, _ in queried]
+        ) if queried else []
+
+        hit_ids = {profile_id for hits in hits_per_user for profile_id, _ in hits}
+        similar = {
+            candidate.id: (candidate, vector_row)
+            for candidate, vector_row in self.db.execute(
+                select(TikTokProfile, ProfileVector)
+                .join(ProfileVector, ProfileVector.profile_id == TikTokProfile.id)
+                .where(TikTokProfile.id.in_(hit_ids))
+            )
+        } if hit_ids else {}
+
+        rows = []
+        seen = set()
+        for (user_id, _), hits in zip(queried, hits_per_user):
+            for profile_id, score in hits:
+                if profile_id not in similar:
+                    continue  # deleted since the index was loaded
+                candidate, vector_row = similar[profile_id]
+                if (user_id, candidate.tiktok_username) in seen:
+                    continue  # one row per creator, the best-scoring one
+                seen.add((user_id, candidate.tiktok_username))
+                rows.append({
+                    "user_id": user_id,
+                    "recommended_username": candidate.tiktok_username,
+                    "recommended_display_name": candidate.display_name,
+                    "recommended_avatar_url": candidate.avatar_url,
+                    "similarity_score": round(max(score, 0.0), 4),
+                    "engagement_score": round(min((vector_row.engagement_rate or 0) / _MAX_ENGAGEMENT_RATE, 1.0), 4),
+                    "growth_score": _growth_score(candidate),
+                    "success_factors": _success_factors(vector_row),
+                    "content_themes": vector_row.themes or [],
+                    "posting_frequency": _posting_frequency(vector_row.posts_per_week),
+                    "is_active": 1
+                })
+
+        user_ids = [user_id for user_id, _ in users]
+        self.db.execute(
+            update(CreatorRecommendation)
+            .where(CreatorRecommendation.user_id.in_(user_ids), CreatorRecommendation.is_active == 1)
+            .values(is_active=0)
+        )
+        if rows:
+            self.db.execute(insert(CreatorRecommendation), rows)
+        store_recommendation_tallies(self.db, user_ids, rows)
+        return len(rows)
+
+    def _owned_profiles(self, user_ids: List[int]) -> Dict[int, Set[int]]:
+        """Ids of every profile each user owns, so none of them is recommended back"""
+        owned: Dict[int, Set[int]] = {user_id: set() for user_id in user_ids}
+        if user_ids:
+            for profile_id, user_id in self.db.execute(
+                select(TikTokProfile.id, TikTokProfile.user_id).where(TikTokProfile.user_id.in_(user_ids))
+            ):
+                owned[user_id].add(profile_id)
+        return owned
+
+    def _vectors(self, profile_ids: List[int]) -> Dict[int, "np.ndarray"]:
+        import numpy as np
+        return {
+            profile_id: np.frombuffer(blob, dtype=np.float32)
+            for profile_id, blob in self.db.execute(
+                select(ProfileVector.profile_id, ProfileVector.vector)
+                .where(ProfileVector.profile_id.in_(profile_ids), ProfileVector.feature_version == FEATURE_VERSION)
+            )
+        }
@@ -0,0 +1,169 @@
+"""
+Bulk export of a creator's data as CSV, Parquet or Arrow IPC.
+
+Rows are read through a server-side cursor (yield_per) and written one chunk
+at a time: a CSV block, a Parquet row group or an Arrow record batch per
+EXPORT_CHUNK_SIZE rows. Each chunk's bytes are handed on as soon as they are
+written, so memory is bounded by one chunk whatever the export size.
+pyarrow is imported only for the Parquet and Arrow formats.
+"""
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Sequence
+import csv
+import io
+from sqlalchemy import BigInteger, Boolean, Date, DateTime, Float, Integer, select
+from sqlalchemy.orm import Session
+from app.models.analytics import ProfileAnalytics
+from app.models.tiktok_video import TikTokVideo
+
+EXPORT_CHUNK_SIZE = 20000
+
+CSV = "csv"
+PARQUET = "parquet"
+ARROW = "arrow"
+FORMATS = (CSV, PARQUET, ARROW)
+MEDIA_TYPES = {
+    CSV: "text/csv",
+    PARQUET: "application/vnd.apache.parquet",
+    ARROW: "application/vnd.apache.arrow.stream",
+}
+FILE_EXTENSIONS = {CSV: "csv", PARQUET: "parquet", ARROW: "arrows"}
+
+@dataclass
+class Dataset:
+    """An exportable table: its columns (in file order) and the row order"""
+    model: type
+    columns: Sequence[str]
+    order_by: Sequence[str]
+
+DATASETS: Dict[str, Dataset] = {
+    "videos": Dataset(
+        model=TikTokVideo,
+        columns=("id", "video_id", "video_url", "description", "duration", "view_count", "like_count",
+                 "comment_count", "share_count", "engagement_rate", "completion_rate", "posted_at",
+                 "last_scraped_at", "created_at"),
+        order_by=("id",)
+    ),
+    # Daily analytics snapshots
+    "analytics": Dataset(
+        model=ProfileAnalytics,
+        columns=("date", "follower_growth", "following_growth", "video_count_growth", "avg_views", "avg_likes",
+                 "avg_comments", "avg_shares", "avg_engagement_rate", "total_views_period",
+                 "total_likes_period", "reach_estimate", "created_at"),
+        order_by=("date", "id")
+    ),
+}
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that collects bytes until they are taken"""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def take(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+def _arrow_type(column):
+    import pyarrow as pa
+    column_type = column.type
+    if isinstance(column_type, (Integer, BigInteger)):
+        return pa.int64()
+    if isinstance(column_type, Float):
+        return pa.float64()
+    if isinstance(column_type, Boolean):
+        return pa.bool_()
+    if isinstance(column_type, DateTime):
+        # Naive values (SQLite) are stored as UTC
+        return pa.timestamp("us", tz="UTC")
+    if isinstance(column_type, Date):
+        return pa.date32()
+    return pa.string()
+
+class DataExporter:
+    def __init__(self, db: Session, chunk_size: int = EXPORT_CHUNK_SIZE):
+        self.db = db
+        self.chunk_size = chunk_size
+
+    def row_chunks(self, dataset: str, profile_id: int) -> Iterator[List[tuple]]:
+        """The profile's rows of the dataset, `chunk_size` at a time"""
+        spec = DATASETS[dataset]
+        table = spec.model.__table__
+        stmt = (
+            select(*(table.c[name] for name in spec.columns))
+            .where(table.c.profile_id == profile_id)
+            .order_by(*(table.c[name] for name in spec.order_by))
+            .execution_options(yield_per=self.chunk_size)
+        )
+        # Core rows on the session's connection; yield_per uses a server-side cursor where available
+        result = self.db.connection().execute(stmt)
+        for partition in result.partitions():
+            yield partition
+
+    def export(self, dataset: str, fmt: str, profile_id: int) -> Iterator[bytes]:
+        """The encoded file, as a stream of byte chunks"""
+        if dataset not in DATASETS:
+            raise ValueError(f"Unknown dataset {dataset!r}")
+        writers: Dict[str, Callable] = {CSV: self._csv, PARQUET: self._parquet, ARROW: self._arrow}
+        if fmt not in writers:
+            raise ValueError(f"Unknown format {fmt!r}")
+        return writers[fmt](dataset, profile_id)
+
+    def _csv(self, dataset: str, profile_id: int) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(DATASETS[dataset].columns)
+        for rows in self.row_chunks(dataset, profile_id):
+            writer.writerows(rows)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+
+    def _schema(self, dataset: str):
+        import pyarrow as pa
+        table = DATASETS[dataset].model.__table__
+        return pa.schema([(name, _arrow_type(table.c[name])) for name in DATASETS[dataset].columns])
+
+    def _record_batch(self, schema, rows: List[tuple]):
+        import pyarrow as pa
+        columns = list(zip(*rows))
+        return pa.RecordBatch.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+            schema=schema
+        )
+
+    def _arrow(self, dataset: str, profile_id: int) -> Iterator[bytes]:
+        import pyarrow as pa
+        schema = self._schema(dataset)
+        sink = _ChunkSink()
+        with pa.ipc.new_stream(sink, schema) as writer:
+            for rows in self.row_chunks(dataset, profile_id):
+                writer.write_batch(self._record_batch(schema, rows))
+                yield sink.take()
+        yield sink.take()
+
+    def _parquet(self, dataset: str, profile_id: int) -> Iterator[bytes]:
+        import pyarrow.parquet as pq
+        schema = self._schema(dataset)
+        sink = _ChunkSink()
+        # One row group per chunk; the footer is written on close
+        with pq.ParquetWriter(sink, schema, compression="snappy") as writer:
+            for rows in self.row_chunks(dataset, profile_id):
+                writer.write_batch(self._record_batch(schema, rows))
+                yield sink.take()
+        yield sink.take()
@@ -0,0 +1,401 @@
+"""
+Bulk import of historical videos and daily analytics snapshots.
+
+Customers' CSV, JSON Lines or JSON-array exports are parsed as a stream and
+handled IMPORT_CHUNK_SIZE rows at a time: each row is validated and
+normalized (header aliases such as "views" or "create_time", counts like
+"1,234" or "1.2K", ISO or epoch timestamps), rows already stored are
+skipped (video_id for videos, date for snapshots), and the rest are written
+with COPY into a temporary table on PostgreSQL or one batched insert
+elsewhere, both through INSERT ... ON CONFLICT DO NOTHING, so rows another
+import or a scrape stores at the same time are skipped too. Every chunk
+commits on its own, so an interrupted import can simply be rerun. Invalid
+rows, and a truncated JSON array's tail, are reported with their row number
+and never stop the import.
+"""
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from typing import Any, Callable, Dict, IO, Iterator, List, Optional, Tuple
+import csv
+import io
+import json
+import re
+import time
+import logging
+from sqlalchemy import insert, select, text
+from sqlalchemy.orm import Session
+from app.core.hashtags import extract_tags
+from app.db.upsert import dialect_insert
+from app.models.analytics import ProfileAnalytics
+from app.models.tiktok_profile import TikTokProfile
+from app.models.tiktok_video import TikTokVideo
+from app.models.video_hashtag import VideoHashtag
+from app.services.analytics_events import publish_profile_data_changed
+from app.services.hashtag_index import tag_rows
+from app.services.tiktok_scraper import video_posted_at
+
+logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK_SIZE = 5000
+# Row errors kept in the report; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+CSV = "csv"
+JSONL = "jsonl"
+JSON = "json"
+FORMATS = (CSV, JSONL, JSON)
+
+_READ_SIZE = 1 << 16
+
+class RowError(ValueError):
+    pass
+
+# Field parsers: raw value (string from CSV, any JSON value) -> normalized value or None
+
+_COUNT = re.compile(r"^(-?\d+(?:\.\d+)?)([KMB]?)$")
+_MULTIPLIERS = {"": 1, "K": 1_000, "M": 1_000_000, "B": 1_000_000_000}
+
+def parse_count(value: Any) -> Optional[int]:
+    """Non-negative count: 1234, "1,234", "1.2K", "3M" """
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool):
+        raise RowError(f"not a count: {value!r}")
+    if isinstance(value, (int, float)):
+        number = value
+    else:
+        match = _COUNT.match(str(value).strip().replace(",", "").upper())
+        if not match:
+            raise RowError(f"not a count: {value!r}")
+        number = float(match.group(1)) * _MULTIPLIERS[match.group(2)]
+    if number < 0:
+        raise RowError(f"negative count: {value!r}")
+    return int(number)
+
+def parse_float(value: Any) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    try:
+        return float(str(value).strip().rstrip("%")) if isinstance(value, str) else float(value)
+    except (TypeError, ValueError):
+        raise RowError(f"not a number: {value!r}")
+
+def parse_datetime(value: Any) -> Optional[datetime]:
+    """ISO 8601 (a trailing Z or offset is converted to UTC) or Unix seconds; stored as naive UTC"""
+    if value is None or value == "":
+        return None
+    try:
+        if isinstance(value, (int, float)) or str(value).strip().replace(".", "", 1).isdigit():
+            return datetime.utcfromtimestamp(float(value))
+        parsed = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+    except (TypeError, ValueError, OverflowError, OSError):
+        raise RowError(f"not a date/time: {value!r}")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def parse_date(value: Any) -> Optional[date]:
+    parsed = parse_datetime(value)
+    return None if parsed is None else parsed.date()
+
+def parse_text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+_VIDEO_URL_ID = re.compile(r"/video/(\w+)")
+
+@dataclass
+class ImportSpec:
+    """Target table, its parsed columns, the column rows are deduplicated on and the table's unique key"""
+    model: type
+    parsers: Dict[str, Callable[[Any], Any]]
+    aliases: Dict[str, str]
+    key: str
+    conflict: Tuple[str, ...]
+
+DATASETS: Dict[str, ImportSpec] = {
+    "videos": ImportSpec(
+        model=TikTokVideo,
+        parsers={
+            "video_id": parse_text, "video_url": parse_text, "description": parse_text,
+            "duration": parse_count, "view_count": parse_count, "like_count": parse_count,
+            "comment_count": parse_count, "share_count": parse_count,
+            "engagement_rate": parse_float, "completion_rate": parse_float, "posted_at": parse_datetime,
+        },
+        aliases={
+            "id": "video_id", "url": "video_url", "link": "video_url", "caption": "description",
+            "desc": "description", "title": "description", "views": "view_count", "plays": "view_count",
+            "play_count": "view_count", "video_views": "view_count", "likes": "like_count",
+            "digg_count": "like_count", "comments": "comment_count", "shares": "share_count",
+            "create_time": "posted_at", "created": "posted_at", "posted": "posted_at",
+            "post_time": "posted_at", "date": "posted_at",
+        },
+        key="video_id",
+        conflict=("video_id",)
+    ),
+    # Daily analytics snapshots
+    "analytics": ImportSpec(
+        model=ProfileAnalytics,
+        parsers={
+            "date": parse_date, "follower_growth": parse_float, "following_growth": parse_float,
+            "video_count_growth": parse_float, "avg_views": parse_float, "avg_likes": parse_float,
+            "avg_comments": parse_float, "avg_shares": parse_float, "avg_engagement_rate": parse_float,
+            "total_views_period": parse_count, "total_likes_period": parse_count, "reach_estimate": parse_count,
+        },
+        aliases={"day": "date", "new_followers": "follower_growth", "views": "total_views_period",
+                 "likes": "total_likes_period", "reach": "reach_estimate"},
+        key="date",
+        conflict=("profile_id", "date")
+    ),
+}
+
+# Growth columns are integers in the table; parsed as floats so "12.0" passes
+_INTEGER_GROWTH = ("follower_growth", "following_growth", "video_count_growth")
+
+@dataclass
+class ImportReport:
+    dataset: str
+    rows_read: int = 0
+    imported: int = 0
+    duplicates: int = 0
+    error_count: int = 0
+    errors: List[Dict] = field(default_factory=list)  # first MAX_REPORTED_ERRORS: {"row", "error"}
+    seconds: float = 0.0
+    rows_per_second: float = 0.0
+
+    def add_error(self, row_number: int, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row_number, "error": message})
+
+@lru_cache(maxsize=1024)
+def _field_name(header: str) -> str:
+    return re.sub(r"[\s\-]+", "_", str(header).strip().lower())
+
+def _json_array_items(stream: IO[str]) -> Iterator[Any]:
+    """Items of a top-level JSON array, decoded incrementally"""
+    decoder = json.JSONDecoder()
+    buffer = stream.read(_READ_SIZE).lstrip()
+    if not buffer.startswith("["):
+        raise ValueError("Expected a JSON array")
+    buffer, finished = buffer[1:], False
+    while True:
+        buffer = buffer.lstrip()
+        if buffer.startswith(","):
+            buffer = buffer[1:]
+            continue
+        if buffer.startswith("]"):
+            return
+        try:
+            if not buffer:
+                raise json.JSONDecodeError("need more data", buffer, 0)
+            item, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError as e:
+            if finished:
+                # Keep what was read so far; the rest is one unreadable row
+                yield RowError(f"truncated or invalid JSON array: {e.msg}")
+                return
+            more = stream.read(_READ_SIZE)
+            finished = not more
+            buffer += more
+            continue
+        yield item
+        buffer = buffer[end:]
+
+def _json_lines(stream: IO[str]) -> Iterator[Any]:
+    for line in stream:
+        if not line.strip():
+            yield None
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield RowError(f"invalid JSON: {e}")
+
+def read_records(stream: IO[str], fmt: str) -> Iterator[Any]:
+    """
+    Raw records of a text stream, one dict (None for a blank line, RowError for
+    an unreadable one or the unreadable rest of a JSON array) per row
+    """
+    if fmt == CSV:
+        return csv.DictReader(stream)
+    if fmt == JSONL:
+        return _json_lines(stream)
+    if fmt == JSON:
+        return _json_array_items(stream)
+    raise ValueError(f"Unknown format {fmt!r}")
+
+class BulkImporter:
+    def __init__(self, db: Session, chunk_size: int = IMPORT_CHUNK_SIZE):
+        self.db = db
+        self.chunk_size = chunk_size
+        self.dialect = db.get_bind().dialect.name
+
+    def run(self, profile: TikTokProfile, dataset: str, stream: IO[str], fmt: str) -> ImportReport:
+        """Import every valid, new row of the stream into the profile's data"""
+        spec = DATASETS[dataset]
+        report = ImportReport(dataset=dataset)
+        start = time.perf_counter()
+
+        chunk: List[Tuple[int, Dict]] = []
+        for row_number, record in enumerate(read_records(stream, fmt), start=1):
+            if record is None:
+                continue
+            report.rows_read += 1
+            try:
+                chunk.append((row_number, self._normalize(spec, profile, record)))
+            except RowError as e:
+                report.add_error(row_number, str(e))
+            if len(chunk) >= self.chunk_size:
+                self._import_chunk(spec, profile.id, chunk, report)
+                chunk = []
+        if chunk:
+            self._import_chunk(spec, profile.id, chunk, report)
+
+        report.seconds = round(time.perf_counter() - start, 3)
+        report.rows_per_second = round(report.rows_read / report.seconds, 1) if report.seconds else 0.0
+        logger.info(f"Imported {report.imported}/{report.rows_read} {dataset} rows for profile {profile.id} "
+                    f"({report.duplicates} duplicates, {report.error_count} errors, {report.rows_per_second} rows/s)")
+        if report.imported:
+            publish_profile_data_changed(profile.id)
+        return report
+
+    def _normalize(self, spec: ImportSpec, profile: TikTokProfile, record: Any) -> Dict:
+        if isinstance(record, RowError):
+            raise record
+        if not isinstance(record, dict):
+            raise RowError("row is not an object")
+        row: Dict[str, Any] = {}
+        # A column under its own name beats an alias ("video_id" over "id" in our own exports);
+        # otherwise the first non-empty value wins
+        canonical = set()
+        for header, value in record.items():
+            if header is None:
+                raise RowError("more values than columns")
+            field_name = _field_name(header)
+            name = spec.aliases.get(field_name, field_name)
+            parse = spec.parsers.get(name)
+            if parse is None:
+                continue
+            is_canonical = name == field_name
+            if row.get(name) is not None and (name in canonical or not is_canonical):
+                continue
+            try:
+                parsed = parse(value)
+            except RowError as e:
+                raise RowError(f"{name}: {e}")
+            if parsed is not None or name not in row:
+                row[name] = parsed
+            if is_canonical and parsed is not None:
+                canonical.add(name)
+
+        if spec.model is TikTokVideo:
+            return self._normalize_video(profile, row)
+        if row.get("date") is None:
+            raise RowError("date is required")
+        for name in _INTEGER_GROWTH:
+            if row.get(name) is not None:
+                row[name] = int(row[name])
+        return {"profile_id": profile.id, **row}
+
+    def _normalize_video(self, profile: TikTokProfile, row: Dict) -> Dict:
+        if not row.get("video_id") and row.get("video_url"):
+            match = _VIDEO_URL_ID.search(row["video_url"])
+            row["video_id"] = match.group(1) if match else None
+        if not row.get("video_id"):
+            raise RowError("video_id (or a video_url) is required")
+        if not row.get("video_url"):
+            row["video_url"] = f"https://www.tiktok.com/@{profile.tiktok_username}/video/{row['video_id']}"
+        if row.get("posted_at") is None:
+            # Undated rows still count towards trends and posting patterns when their TikTok id carries the time
+            row["posted_at"] = video_posted_at(row["video_id"])
+        return {
+            **{name: None for name in DATASETS["videos"].parsers},
+            **row,
+            "profile_id": profile.id,
+            "hashtags": None,  # filled in for the rows that are written
+            "is_active": True,
+        }
+
+    def _import_chunk(self, spec: ImportSpec, profile_id: int, chunk: List[Tuple[int, Dict]],
+                      report: ImportReport) -> None:
+        key = spec.key
+        key_column = spec.model.__table__.c[key]
+        existing_stmt = select(key_column).where(key_column.in_({row[key] for _, row in chunk}))
+        if key == "date":
+            existing_stmt = existing_stmt.where(spec.model.__table__.c.profile_id == profile_id)
+        seen = set(self.db.execute(existing_stmt).scalars())
+
+        rows = []
+        for _, row in chunk:
+            if row[key] in seen:
+                report.duplicates += 1
+                continue
+            seen.add(row[key])
+            rows.append(row)
+
+        written = 0
+        if rows:
+            tagged = self._extract_tags(rows) if spec.model is TikTokVideo else None
+            ids = self._write(spec, rows)
+            written = len(ids)
+            # Rows stored by someone else since the lookup above were skipped by the database
+            report.duplicates += len(rows) - written
+            if tagged:
+                self._index_tags({key: tags for key, tags in tagged.items() if key in ids}, ids)
+        self.db.commit()
+        report.imported += written
+
+    def _write(self, spec: ImportSpec, rows: List[Dict]) -> Dict[Any, int]:
+        """Insert the rows, skipping any that conflict with stored ones; returns the id of each written row by key"""
+        table = spec.model.__table__
+        columns = list(rows[0])
+        if self.dialect == "postgresql":
+            staging = f"import_{table.name}"
+            connection = self.db.connection()
+            connection.execute(text(
+                f"CREATE TEMPORARY TABLE {staging} ON COMMIT DROP AS "
+                f"SELECT {', '.join(columns)} FROM {table.name} WITH NO DATA"
+            ))
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerows([row[column] for column in columns] for row in rows)
+            buffer.seek(0)
+            # COPY ... FROM STDIN on the session's own connection, inside its transaction
+            cursor = connection.connection.cursor()
+            try:
+                cursor.copy_expert(f"COPY {staging} FROM STDIN WITH (FORMAT csv)", buffer)
+            finally:
+                cursor.close()
+            written = connection.execute(text(
+                f"INSERT INTO {table.name} ({', '.join(columns)}) SELECT {', '.join(columns)} FROM {staging} "
+                f"ON CONFLICT ({', '.join(spec.conflict)}) DO NOTHING RETURNING {spec.key}, id"
+            ))
+        else:
+            # One batched INSERT on the session's connection (no ORM bulk-insert bookkeeping)
+            stmt = dialect_insert(self.dialect, table).on_conflict_do_nothing(index_elements=list(spec.conflict))
+            written = self.db.connection().execute(stmt.returning(table.c[spec.key], table.c.id), rows)
+        return dict(written.all())
+
+    def _extract_tags(self, rows: List[Dict]) -> Dict[str, Tuple]:
+        """Set each row's hashtags JSON; returns (profile_id, hashtags, mentions) of tagged rows by video_id"""
+        tagged = {}
+        for row in rows:
+            hashtags, mentions = extract_tags(row["description"])
+            row["hashtags"] = json.dumps(hashtags)
+            if hashtags or mentions:
+                tagged[row["video_id"]] = (row["profile_id"], hashtags, mentions)
+        return tagged
+
+    def _index_tags(self, tagged: Dict[str, Tuple], ids: Dict[str, int]) -> None:
+        """Hashtag/mention index rows for the videos just written, by their database ids"""
+        index_rows = [
+            index_row
+            for video_id, tags in tagged.items()
+            for index_row in tag_rows(ids[video_id], *tags)
+        ]
+        if index_rows:
+            self.db.connection().execute(insert(VideoHashtag.__table__), index_rows)
@@ -1,133 +1,144 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Optional, Tuple
 from sqlalchemy.orm import Session
 from app.models.user import User
 from app.models.tiktok_profile import TikTokProfile
+from app.services.follower_interactions import FollowerInteractionStore
+from app.services.profiles import get_user_profile
+from app.services.lead_scoring import FollowerColumns, ScoredLeads, top_leads
 import logging
+import math
 
 logger = logging.getLogger(__name__)
 
+# Winners whose usernames and bios are looked up per query
+DETAILS_BATCH_SIZE = 500
+# Most leads one request may ask for (the running top-k is held in memory)
+MAX_LEADS = 1000
+
 class EngagedLeadsAnalyzer:
-    """Analyzes target audience followers to identify most engaged leads"""
+    """Analyzes target audience followers to identify most engaged leads
+
+    Follower data comes from a follower source with two methods:
+      - chunks(profile_id) -> iterable of FollowerColumns
+      - details(profile_id, follower_ids) -> {follower_id: {"username", "bio"}}
+    By default that is the recorded follower interactions; demo leads are
+    returned while a profile has none.
+    """
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, follower_source=None):
         self.db = db
+        self.follower_source = follower_source if follower_source is not None else FollowerInteractionStore(db)
     
     def get_engaged_leads(self, user_id: int, limit: int = 20) -> Dict:
         """Get most engaged followers from target audience"""
+        summary, leads = self.iter_engaged_leads(user_id, limit)
+        try:
+            return {'engaged_leads': list(leads), **summary}
+        except Exception as e:
+            logger.error(f"Error analyzing engaged leads: {str(e)}")
+            return self._get_demo_engaged_leads()
+    
+    def iter_engaged_leads(self, user_id: int, limit: int = 20) -> Tuple[Dict, Iterator[Dict]]:
+        """
+        The analysis summary and the leads as a generator, best first. Scoring is
+        done up front; each lead is built as it is consumed, for streaming.
+        """
         try:
             # Get user's TikTok profile
-            profile = self.db.query(TikTokProfile).filter(
-                TikTokProfile.user_id == user_id
-            ).first()
+            profile = get_user_profile(self.db, user_id)
             
             if not profile:
-                return self._get_demo_engaged_leads()
+                return self._split_demo(self._get_demo_engaged_leads())
             
-            # Generate engaged leads based on target audience analysis
-            engaged_leads = self._analyze_engaged_followers(profile, limit)
+            # Score every follower, keep the best `limit`
+            engaged_leads, total_analyzed = self._analyze_engaged_followers(profile, limit)
             
             return {
-                'engaged_leads': engaged_leads,
-                'total_analyzed': len(engaged_leads),
+                'total_analyzed': total_analyzed,
                 'profile_username': profile.tiktok_username,
                 'analysis_date': 'today'
-            }
+            }, engaged_leads
             
         except Exception as e:
             logger.error(f"Error analyzing engaged leads: {str(e)}")
-            return self._get_demo_engaged_leads()
+            return self._split_demo(self._get_demo_engaged_leads())
     
-    def _analyze_engaged_followers(self, profile: TikTokProfile, limit: int) -> List[Dict]:
-        """Analyze followers to identify most engaged leads"""
-        try:
-            # Get actual engaged followers data from TikTok profile
-            followers = self.scraper.get_engaged_followers(profile.tiktok_username, limit)
-            
-            # Calculate engagement metrics for each follower
-            engaged_leads = []
-            for i, follower in enumerate(followers):
-                # Calculate engagement metrics
-                follower_count = follower['followers']
-                engagement_rate = follower['engagement_rate']
-                interaction_frequency = follower['interaction_freq']
-                
-                # Determine collaboration potential
-                collab_score = self._calculate_collaboration_score(
-                    follower_count, engagement_rate, interaction_frequency
-                )
-                
-                lead = {
-                    'username': follower['username'],
-                    'follower_count': follower_count,
-                    'engagement_rate': engagement_rate,
-                    'interaction_frequency': interaction_frequency,
-                    'collaboration_score': collab_score,
-                    'last_interaction': f'{i + 1} days ago',
-                    'bio_snippet': self._generate_bio_snippet(follower['username']),
-                    'recommended_action': self._get_recommended_action(collab_score),
-                    'contact_priority': self._get_contact_priority(collab_score)
-                }
-                
-                engaged_leads.append(lead)
-            
-            # Sort by collaboration score (highest first)
-            engaged_leads.sort(key=lambda x: x['collaboration_score'], reverse=True)
-            
-        except Exception as e:
-            logger.warning(f"Failed to scrape actual engaged follower data: {str(e)}. Using demo data.")
-            
-            # Generate realistic demo data based on the profile
-            return self._generate_demo_engaged_leads(profile, limit)
+    def _split_demo(self, result: Dict) -> Tuple[Dict, Iterator[Dict]]:
+        leads = result.pop('engaged_leads')
+        return result, iter(leads)
+    
+    def _analyze_engaged_followers(self, profile: TikTokProfile, limit: int) -> Tuple[Iterator[Dict], int]:
+        """Top `limit` leads (lazily built) and the number of followers analyzed"""
+        scored = top_leads(self.follower_source.chunks(profile.id), limit)
+        if not scored.analyzed:
+            leads = self._generate_demo_engaged_leads(profile, limit)
+            return iter(leads), len(leads)
+        
+        return self._iter_leads(profile.id, scored), scored.analyzed
+    
+    def _iter_leads(self, profile_id: int, scored: ScoredLeads) -> Iterator[Dict]:
+        """Usernames and bios are only looked up for the winners, a batch at a time"""
+        follower_ids = scored.columns.follower_ids
+        for start in range(0, len(follower_ids), DETAILS_BATCH_SIZE):
+            details = self.follower_source.details(
+                profile_id, follower_ids[start:start + DETAILS_BATCH_SIZE].tolist()
+            )
+            yield from self._build_leads(scored, details, start, start + DETAILS_BATCH_SIZE)
+    
+    def _build_leads(self, scored: ScoredLeads, details: Dict[int, Dict],
+                     start: int = 0, stop: Optional[int] = None) -> List[Dict]:
+        columns = scored.columns
+        leads = []
+        for i in range(start, min(stop or len(columns), len(columns))):
+            follower_id = int(columns.follower_ids[i])
+            detail = details.get(follower_id, {})
+            username = detail.get('username') or f'follower_{follower_id}'
+            collab_score = round(float(scored.scores[i]), 1)
+            last_days = None if columns.last_interaction_days is None else float(columns.last_interaction_days[i])
+            leads.append({
+                'username': username,
+                'follower_count': int(columns.follower_count[i]),
+                'engagement_rate': round(float(columns.engagement_rate[i]), 1),
+                'interaction_frequency': round(float(columns.interaction_frequency[i]), 1),
+                'collaboration_score': collab_score,
+                'last_interaction': self._format_last_interaction(last_days),
+                'bio_snippet': detail.get('bio') or self._generate_bio_snippet(username),
+                'recommended_action': self._get_recommended_action(collab_score),
+                'contact_priority': self._get_contact_priority(collab_score)
+            })
+        return leads
+    
+    def _format_last_interaction(self, days: Optional[float]) -> Optional[str]:
+        if days is None or math.isnan(days):
+            return None
+        days = int(days)
+        if days < 1:
+            return 'today'
+        return '1 day ago' if days == 1 else f'{days} days ago'
     
     def _generate_demo_engaged_leads(self, profile: TikTokProfile, limit: int) -> List[Dict]:
         """Generate demo engaged leads data when actual data is not available"""
+        import numpy as np
         base_followers = [
             "fashionista_london", "style_maven_uk", "london_lifestyle", "trendy_outfits", 
             "fashion_daily_uk", "outfit_inspo", "style_guide_uk", "london_fashion",
             "trendy_girl_uk", "fashion_lover_23", "style_blogger_ldn", "outfit_of_day",
             "fashion_trends_uk", "style_inspiration", "london_style_guide", "trendy_fashion_uk",
             "style_maven_london", "fashion_enthusiast", "outfit_ideas_uk", "style_tips_london"
-        ]
-        
-        engaged_leads = []
-        for i, username in enumerate(base_followers[:limit]):
-            # Calculate engagement metrics
-            follower_count = 15000 + (i * 2500)  # Varying follower counts
-            engagement_rate = 8.5 - (i * 0.2)   # Decreasing engagement rates
-            interaction_frequency = max(5 - (i * 0.3), 1.5)  # Weekly interactions
-            
-            # Determine collaboration potential
-            collab_score = self._calculate_collaboration_score(
-                follower_count, engagement_rate, interaction_frequency
-            )
-            
-            lead = {
-                'username': username,
-                'follower_count': follower_count,
-                'engagement_rate': round(engagement_rate, 1),
-                'interaction_frequency': round(interaction_frequency, 1),
-                'collaboration_score': collab_score,
-                'last_interaction': f'{i + 1} days ago',
-                'bio_snippet': self._generate_bio_snippet(username),
-                'recommended_action': self._get_recommended_action(collab_score),
-                'contact_priority': self._get_contact_priority(collab_score)
-            }
-            
-            engaged_leads.append(lead)
-            
-        # Sort by collaboration score (highest first)
-        engaged_leads.sort(key=lambda x: x['collaboration_score'], reverse=True)
-        return engaged_leads
-    
-    def _calculate_collaboration_score(self, followers: int, engagement: float, frequency: float) -> float:
-        """Calculate collaboration potential score (1-10)"""
-        # Normalize metrics and calculate weighted score
-        follower_score = min(followers / 50000, 1.0) * 3  # Max 3 points for followers
-        engagement_score = min(engagement / 10, 1.0) * 4   # Max 4 points for engagement
-        frequency_score = min(frequency / 5, 1.0) * 3      # Max 3 points for frequency
+        ][:limit]
         
-        total_score = follower_score + engagement_score + frequency_score
-        return round(total_score, 1)
+        # Varying follower counts, decreasing engagement and weekly interactions
+        i = np.arange(len(base_followers))
+        columns = FollowerColumns(
+            follower_ids=i.astype(np.int64),
+            follower_count=(15000 + i * 2500).astype(np.int64),
+            engagement_rate=(8.5 - i * 0.2).astype(np.float32),
+            interaction_frequency=np.maximum(5 - i * 0.3, 1.5).astype(np.float32),
+            last_interaction_days=(i + 1).astype(np.float32)
+        )
+        scored = top_leads([columns], limit)
+        details = {index: {'username': username} for index, username in enumerate(base_followers)}
+        return self._build_leads(scored, details)
     
     def _generate_bio_snippet(self, username: str) -> str:
         """Generate realistic bio snippet based on username"""
@@ -0,0 +1,187 @@
+"""
+Engagement trend over time.
+
+Videos are put in posted_at order per profile, then for every profile at
+once (flat numpy arrays, one row per video, no per-profile loop):
+  - a rolling mean over the last TREND_WINDOW videos, from grouped cumsums
+  - an exponentially weighted mean (span TREND_EWMA_SPAN), advanced one
+    position at a time across all profiles that still have videos
+  - a least-squares slope of engagement rate against posting time, with its
+    standard error, r² and a confidence (1 - two-sided p-value of the slope)
+The trend is "increasing"/"decreasing" only when the slope is confidently
+non-zero. One profile's videos (analytics_metrics) and a whole batch of
+profiles (EngagementTrendEngine.for_profiles) go through the same function.
+numpy is imported by those functions, so analytics imports stay light.
+Undated videos are skipped; scrapes and imports date videos from their
+TikTok id (app.services.tiktok_scraper.video_posted_at).
+"""
+from calendar import timegm
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence
+import math
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.models.tiktok_video import TikTokVideo
+from app.services.posting_patterns import epoch_seconds
+
+if TYPE_CHECKING:
+    import numpy as np
+
+TREND_WINDOW = 5
+TREND_EWMA_SPAN = 10
+# Minimum slope confidence for a trend other than "stable"
+TREND_CONFIDENCE = 0.95
+MIN_TREND_VIDEOS = 3
+
+SECONDS_PER_WEEK = 7 * 86400
+
+def _slope_confidence(t: "np.ndarray", df: "np.ndarray") -> "np.ndarray":
+    """
+    1 - two-sided p-value of Student's t with df degrees of freedom: exact
+    for 1 and 2, otherwise through the normal deviate sqrt((df - 1/2) ln(1 + t²/df))
+    """
+    import numpy as np
+    erfc = np.vectorize(math.erfc, otypes=[float])
+    t = np.abs(t)
+    z = np.sqrt((df - 0.5) * np.log1p(t ** 2 / df))
+    return np.select(
+        [df == 1, df == 2],
+        [2 / np.pi * np.arctan(t), t / np.sqrt(2 + t ** 2)],
+        1 - erfc(z / math.sqrt(2))
+    )
+
+def _round(value, digits: int = 4) -> Optional[float]:
+    return None if value is None or not math.isfinite(value) else round(float(value), digits)
+
+def engagement_trends(groups: "np.ndarray", times: "np.ndarray", rates: "np.ndarray",
+                      window: int = TREND_WINDOW, span: int = TREND_EWMA_SPAN,
+                      include_series: bool = False) -> Dict:
+    """
+    Trend statistics per group (profile) from flat arrays: the group of each
+    video, its posting time (Unix seconds) and its engagement rate (%).
+    """
+    import numpy as np
+    if len(groups) == 0:
+        return {}
+    order = np.lexsort((times, groups))
+    groups, times, rates = groups[order], np.asarray(times, dtype=float)[order], np.asarray(rates, dtype=float)[order]
+
+    keys, starts, counts = np.unique(groups, return_index=True, return_counts=True)
+    group_index = np.repeat(np.arange(keys.size), counts)
+    position = np.arange(groups.size) - starts[group_index]
+
+    # Rolling mean: window sums from a cumsum with a leading zero
+    cumulative = np.concatenate(([0.0], np.cumsum(rates)))
+    window_start = np.maximum(position - window + 1, 0) + starts[group_index]
+    window_length = np.arange(groups.size) + 1 - window_start
+    rolling = (cumulative[np.arange(groups.size) + 1] - cumulative[window_start]) / window_length
+
+    # EWMA (adjust=False): position k of every group still that long, longest groups first
+    alpha = 2 / (span + 1)
+    ewma = rates.copy()
+    by_length = np.argsort(-counts, kind="stable")
+    sorted_counts = counts[by_length]
+    for k in range(1, int(counts.max())):
+        active = by_length[:np.searchsorted(-sorted_counts, -k, side="left")]
+        index = starts[active] + k
+        ewma[index] = alpha * rates[index] + (1 - alpha) * ewma[index - 1]
+
+    # Least squares of rate on weeks since the group's first video
+    x = (times - times[starts][group_index]) / SECONDS_PER_WEEK
+    n = counts.astype(float)
+    sum_x = np.bincount(group_index, x)
+    sum_y = np.bincount(group_index, rates)
+    mean_x, mean_y = sum_x / n, sum_y / n
+    dx, dy = x - mean_x[group_index], rates - mean_y[group_index]
+    sxx = np.bincount(group_index, dx * dx)
+    sxy = np.bincount(group_index, dx * dy)
+    syy = np.bincount(group_index, dy * dy)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = np.where((sxx > 0) & (n >= MIN_TREND_VIDEOS), sxy / sxx, np.nan)
+        residual = np.maximum(syy - slope * sxy, 0)
+        std_error = np.sqrt(residual / (n - 2) / sxx)
+        r_squared = np.where(syy > 0, 1 - residual / syy, 0.0)
+        # A perfect fit has no error: certain unless flat
+        t = np.where(std_error > 0, slope / std_error, np.where(slope != 0, np.inf, 0.0))
+        confidence = np.where(np.isfinite(slope), _slope_confidence(np.nan_to_num(t, posinf=1e12, neginf=-1e12), np.maximum(n - 2, 1)), np.nan)
+
+    ends = starts + counts - 1
+    results = {}
+    for i, key in enumerate(keys.tolist()):
+        trend = "stable"
+        if np.isfinite(slope[i]) and confidence[i] >= TREND_CONFIDENCE and slope[i] != 0:
+            trend = "increasing" if slope[i] > 0 else "decreasing"
+        result = {
+            "videos": int(counts[i]),
+            "trend": trend,
+            "slope_per_week": _round(slope[i]),
+            "slope_std_error": _round(std_error[i]),
+            "r_squared": _round(r_squared[i]) if np.isfinite(slope[i]) else None,
+            "confidence": _round(confidence[i]),
+            "mean": _round(mean_y[i]),
+            "rolling_mean": _round(rolling[ends[i]]),
+            "ewma": _round(ewma[ends[i]]),
+            "window": window,
+            "ewma_span": span,
+            "first_post_at": datetime.utcfromtimestamp(times[starts[i]]).isoformat(),
+            "last_post_at": datetime.utcfromtimestamp(times[ends[i]]).isoformat(),
+        }
+        if include_series:
+            rows = slice(starts[i], ends[i] + 1)
+            result["series"] = [
+                {"posted_at": datetime.utcfromtimestamp(at).isoformat(), "engagement_rate": _round(rate),
+                 "rolling_mean": _round(mean), "ewma": _round(weighted)}
+                for at, rate, mean, weighted in zip(times[rows], rates[rows], rolling[rows], ewma[rows])
+            ]
+        results[key] = result
+    return results
+
+def video_trend(videos: Sequence, window: int = TREND_WINDOW, span: int = TREND_EWMA_SPAN) -> Optional[Dict]:
+    """Trend of one profile's video-like objects (posted_at, view/like/comment/share counts)"""
+    import numpy as np
+    times: List[float] = []
+    rates: List[float] = []
+    for video in videos:
+        if video.posted_at is None or not video.view_count:
+            continue
+        times.append(timegm(video.posted_at.utctimetuple()))
+        engagement = (video.like_count or 0) + (video.comment_count or 0) + (video.share_count or 0)
+        rates.append(engagement / video.view_count * 100)
+    trends = engagement_trends(np.zeros(len(times), dtype=np.int64), np.array(times), np.array(rates), window, span)
+    return trends.get(0)
+
+class EngagementTrendEngine:
+    def __init__(self, db: Session):
+        self.db = db
+        self.dialect = db.get_bind().dialect.name
+
+    def for_profiles(self, profile_ids: Iterable[int], window: int = TREND_WINDOW, span: int = TREND_EWMA_SPAN,
+                     include_series: bool = False) -> Dict[int, Dict]:
+        """Trends of many profiles from one query; profiles without dated, viewed videos are left out"""
+        import numpy as np
+        profile_ids = list(profile_ids)
+        if not profile_ids:
+            return {}
+        rows = self.db.execute(
+            select(
+                TikTokVideo.profile_id,
+                epoch_seconds(self.dialect, TikTokVideo.posted_at),
+                TikTokVideo.view_count,
+                TikTokVideo.like_count,
+                TikTokVideo.comment_count,
+                TikTokVideo.share_count
+            ).where(
+                TikTokVideo.profile_id.in_(profile_ids),
+                TikTokVideo.posted_at.isnot(None),
+                TikTokVideo.view_count > 0
+            )
+        ).all()
+        if not rows:
+            return {}
+        columns = np.array(rows, dtype=float).T
+        groups, times, views = columns[0].astype(np.int64), columns[1], columns[2]
+        engagement = np.nan_to_num(columns[3:]).sum(axis=0)
+        return engagement_trends(groups, times, engagement / views * 100, window, span, include_series)
+
+    def for_profile(self, profile_id: int, **options) -> Optional[Dict]:
+        return self.for_profiles([profile_id], **options).get(profile_id)
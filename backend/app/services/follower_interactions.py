@@ -0,0 +1,213 @@
+"""
+Per-profile follower interaction counters, the data behind engaged leads.
+
+Usernames are interned once into tiktok_followers, so the counters live in a
+narrow follower_interactions table keyed by (profile_id, follower_id): three
+integer counts and the first/last interaction times. Scrape batches are
+folded in with one upsert that adds to the counts, so recording is
+incremental and reading a profile's followers is a range scan with O(1)
+work per follower.
+"""
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+import logging
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+from app.db.upsert import dialect_insert
+from app.models.follower_interaction import FollowerInteraction, TikTokFollower
+from app.services.lead_scoring import FollowerColumns
+
+logger = logging.getLogger(__name__)
+
+# Interaction kinds, each with its own counter column
+COMMENT = "comment"
+LIKE = "like"
+SHARE = "share"
+_COUNT_COLUMNS = {COMMENT: "comment_count", LIKE: "like_count", SHARE: "share_count"}
+
+CHUNK_SIZE = 10000
+# Rows per multi-row upsert, under SQLite's bound parameter limit
+_UPSERT_BATCH = 1000
+
+def normalize_username(username: str) -> str:
+    return username.strip().lstrip('@').lower()
+
+def estimated_engagement_rate(profile_data: Dict) -> Optional[float]:
+    """Average likes per video as a percentage of followers, from a scraped profile's counters"""
+    followers = profile_data.get("follower_count")
+    likes = profile_data.get("likes_count")
+    videos = profile_data.get("video_count")
+    if not followers or not videos or likes is None:
+        return None
+    return round(likes / videos / followers * 100, 2)
+
+class FollowerInteractionStore:
+    """Reads and updates follower interactions; also a follower source for EngagedLeadsAnalyzer"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.dialect = db.get_bind().dialect.name
+
+    def record(self, profile_id: int, interactions: Iterable[Dict]) -> int:
+        """
+        Add a scrape batch of interactions with the profile; returns the number of
+        followers touched. Each interaction is a dict with "username", "kind"
+        (COMMENT, LIKE or SHARE) and "at", plus optional "follower_count",
+        "engagement_rate" and "bio" of the follower. The caller commits.
+        """
+        counters: Dict[str, Dict] = {}
+        followers: Dict[str, Dict] = {}
+        for interaction in interactions:
+            username = normalize_username(interaction["username"])
+            column = _COUNT_COLUMNS.get(interaction["kind"])
+            if not username or column is None:
+                continue
+            at = interaction["at"].replace(tzinfo=None)
+            counter = counters.get(username)
+            if counter is None:
+                counter = counters[username] = {
+                    "comment_count": 0, "like_count": 0, "share_count": 0,
+                    "first_interaction_at": at, "last_interaction_at": at
+                }
+            counter[column] += 1
+            counter["first_interaction_at"] = min(counter["first_interaction_at"], at)
+            counter["last_interaction_at"] = max(counter["last_interaction_at"], at)
+            follower = followers.setdefault(username, {
+                "username": username, "follower_count": None, "engagement_rate": None, "bio": None
+            })
+            for key in ("follower_count", "engagement_rate", "bio"):
+                if interaction.get(key) is not None:
+                    follower[key] = interaction[key]
+
+        if not counters:
+            return 0
+
+        follower_ids = self._intern(list(followers.values()))
+        rows = [
+            {"profile_id": profile_id, "follower_id": follower_ids[username], **counter}
+            for username, counter in counters.items()
+        ]
+        table = FollowerInteraction.__table__
+        for start in range(0, len(rows), _UPSERT_BATCH):
+            stmt = self._insert(table).values(rows[start:start + _UPSERT_BATCH])
+            new = stmt.excluded
+            self.db.execute(stmt.on_conflict_do_update(
+                index_elements=[table.c.profile_id, table.c.follower_id],
+                set_={
+                    "comment_count": table.c.comment_count + new.comment_count,
+                    "like_count": table.c.like_count + new.like_count,
+                    "share_count": table.c.share_count + new.share_count,
+                    "first_interaction_at": case(
+                        (new.first_interaction_at < table.c.first_interaction_at, new.first_interaction_at),
+                        else_=table.c.first_interaction_at
+                    ),
+                    "last_interaction_at": case(
+                        (new.last_interaction_at > table.c.last_interaction_at, new.last_interaction_at),
+                        else_=table.c.last_interaction_at
+                    ),
+                }
+            ))
+        logger.info(f"Recorded interactions of {len(rows)} followers on profile {profile_id}")
+        return len(rows)
+
+    def _intern(self, followers: List[Dict]) -> Dict[str, int]:
+        """Follower id per username, creating missing followers and refreshing known details"""
+        table = TikTokFollower.__table__
+        for start in range(0, len(followers), _UPSERT_BATCH):
+            stmt = self._insert(table).values(followers[start:start + _UPSERT_BATCH])
+            new = stmt.excluded
+            self.db.execute(stmt.on_conflict_do_update(
+                index_elements=[table.c.username],
+                set_={
+                    key: func.coalesce(new[key], table.c[key])
+                    for key in ("follower_count", "engagement_rate", "bio")
+                }
+            ))
+
+        ids: Dict[str, int] = {}
+        usernames = [follower["username"] for follower in followers]
+        for start in range(0, len(usernames), _UPSERT_BATCH):
+            batch = usernames[start:start + _UPSERT_BATCH]
+            ids.update(self.db.execute(
+                select(table.c.username, table.c.id).where(table.c.username.in_(batch))
+            ).all())
+        return ids
+
+    def without_details(self, usernames: List[str]) -> List[str]:
+        """The given usernames, in order, whose follower count is not known yet"""
+        usernames = [normalize_username(username) for username in usernames]
+        known = set()
+        for start in range(0, len(usernames), _UPSERT_BATCH):
+            batch = usernames[start:start + _UPSERT_BATCH]
+            known.update(self.db.execute(
+                select(TikTokFollower.username).where(
+                    TikTokFollower.username.in_(batch),
+                    TikTokFollower.follower_count.isnot(None)
+                )
+            ).scalars())
+        return [username for username in usernames if username not in known]
+
+    def _insert(self, table):
+        return dialect_insert(self.dialect, table)
+
+    def chunks(self, profile_id: int, chunk_size: int = CHUNK_SIZE,
+               now: Optional[datetime] = None) -> Iterator[FollowerColumns]:
+        """
+        The profile's followers as FollowerColumns, in follower_id order (keyset
+        pagination). Interaction frequency is interactions per week since the
+        first one (at least one week); unknown follower details count as 0.
+        """
+        import numpy as np
+        now = (now or datetime.utcnow()).replace(tzinfo=None)
+        interaction = FollowerInteraction
+        stmt = (
+            select(
+                interaction.follower_id,
+                func.coalesce(TikTokFollower.follower_count, 0),
+                func.coalesce(TikTokFollower.engagement_rate, 0.0),
+                interaction.comment_count + interaction.like_count + interaction.share_count,
+                self._days_before(now, interaction.first_interaction_at),
+                self._days_before(now, interaction.last_interaction_at),
+            )
+            .join(TikTokFollower, TikTokFollower.id == interaction.follower_id)
+            .where(interaction.profile_id == profile_id)
+            .order_by(interaction.follower_id)
+            .limit(chunk_size)
+        )
+
+        # Plain tuples on the connection: no ORM row processing or datetime parsing
+        connection = self.db.connection()
+        after = None
+        while True:
+            page = stmt if after is None else stmt.where(interaction.follower_id > after)
+            rows = connection.execute(page).all()
+            if not rows:
+                return
+            ids, follower_count, engagement, total, first_days, last_days = zip(*rows)
+            weeks = np.maximum(np.array(first_days, dtype=np.float64) / 7, 1.0)
+            yield FollowerColumns(
+                follower_ids=np.array(ids, dtype=np.int64),
+                follower_count=np.array(follower_count, dtype=np.int64),
+                engagement_rate=np.array(engagement, dtype=np.float32),
+                interaction_frequency=(np.array(total, dtype=np.float64) / weeks).astype(np.float32),
+                last_interaction_days=np.maximum(np.array(last_days, dtype=np.float32), 0.0)
+            )
+            if len(rows) < chunk_size:
+                return
+            after = ids[-1]
+
+    def _days_before(self, now: datetime, column):
+        """Days from the column's time to `now`, computed by the database"""
+        if self.dialect == "sqlite":
+            return func.julianday(now) - func.julianday(column)
+        return func.extract("epoch", now - column) / 86400.0
+
+    def details(self, profile_id: int, follower_ids: List[int]) -> Dict[int, Dict]:
+        """Username and bio of the given followers"""
+        if not follower_ids:
+            return {}
+        rows = self.db.execute(
+            select(TikTokFollower.id, TikTokFollower.username, TikTokFollower.bio)
+            .where(TikTokFollower.id.in_(follower_ids))
+        )
+        return {follower_id: {"username": username, "bio": bio} for follower_id, username, bio in rows}
@@ -0,0 +1,126 @@
+"""
+Hashtag index and hashtag performance stats.
+
+Hashtags and mentions are parsed once, when a scraped video is stored, into
+the video_hashtags table. Performance per tag for a profile or a whole
+niche is then a single grouped query. The median uses window functions
+(row_number/count over the tag), which SQLite and PostgreSQL both support.
+"""
+from typing import Dict, List, Optional, Sequence
+import json
+from sqlalchemy import and_, case, func, insert, select
+from sqlalchemy.orm import Session
+from app.core.cache import get_cache
+from app.core.config import settings
+from app.core.hashtags import HASHTAG, MENTION, extract_tags
+from app.models.tiktok_profile import TikTokProfile
+from app.models.tiktok_video import TikTokVideo
+from app.models.user import User
+from app.models.video_hashtag import VideoHashtag
+
+TAG_KINDS = (HASHTAG, MENTION)
+
+# Most tags a stats request returns; niche stats cache this many
+MAX_TAGS = 200
+
+# Engagement rate (%) of a video row; NULL without views
+ENGAGEMENT_RATE = case(
+    (TikTokVideo.view_count > 0,
+     (func.coalesce(TikTokVideo.like_count, 0)
+      + func.coalesce(TikTokVideo.comment_count, 0)
+      + func.coalesce(TikTokVideo.share_count, 0)) * 100.0 / TikTokVideo.view_count),
+    else_=None
+)
+
+def tag_rows(video_pk: int, profile_id: int, hashtags: List[str], mentions: List[str]) -> List[Dict]:
+    """video_hashtags rows of one video"""
+    return [
+        {"video_id": video_pk, "profile_id": profile_id, "tag": tag, "kind": kind}
+        for kind, tags in ((HASHTAG, hashtags), (MENTION, mentions))
+        for tag in tags
+    ]
+
+def hashtag_stats_cache_key(niche: str, kind: str, min_videos: int) -> str:
+    return f"hashtag-stats:niche:{niche}:{kind}:{min_videos}"
+
+class HashtagIndex:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def index_videos(self, videos: Sequence[TikTokVideo]) -> int:
+        """Parse and index tags of newly added videos (must be flushed so they have ids)"""
+        rows = []
+        for video in videos:
+            hashtags, mentions = extract_tags(video.description)
+            video.hashtags = json.dumps(hashtags)
+            rows.extend(tag_rows(video.id, video.profile_id, hashtags, mentions))
+        if rows:
+            self.db.execute(insert(VideoHashtag), rows)
+        return len(rows)
+
+    def performance(self, profile_id: Optional[int] = None, niche: Optional[str] = None,
+                    kind: str = HASHTAG, min_videos: int = 1, limit: int = 20) -> List[Dict]:
+        """Per-tag video count, median/average views and average engagement, best median first"""
+        if (profile_id is None) == (niche is None):
+            raise ValueError("Pass exactly one of profile_id or niche")
+        if niche is not None:
+            # Niche stats span many profiles; every user of the niche sees the same numbers
+            stats = get_cache().get_or_set(
+                hashtag_stats_cache_key(niche, kind, min_videos),
+                lambda: self._stats(niche=niche, kind=kind, min_videos=min_videos, limit=MAX_TAGS),
+                settings.ANALYTICS_CACHE_TTL
+            )
+            return stats[:limit]
+        return self._stats(profile_id=profile_id, kind=kind, min_videos=min_videos, limit=limit)
+
+    def _stats(self, kind: str, min_videos: int, limit: int, profile_id: Optional[int] = None,
+               niche: Optional[str] = None) -> List[Dict]:
+        tagged = (
+            select(
+                VideoHashtag.tag,
+                TikTokVideo.view_count.label("views"),
+                ENGAGEMENT_RATE.label("engagement"),
+                func.row_number().over(partition_by=VideoHashtag.tag, order_by=TikTokVideo.view_count).label("position"),
+                func.count().over(partition_by=VideoHashtag.tag).label("videos")
+            )
+            .join(TikTokVideo, TikTokVideo.id == VideoHashtag.video_id)
+            .where(VideoHashtag.kind == kind, TikTokVideo.view_count.isnot(None))
+        )
+        if profile_id is not None:
+            tagged = tagged.where(VideoHashtag.profile_id == profile_id)
+        else:
+            # Start from the niche's profiles so the (profile_id, kind, tag) index drives the scan
+            niche_profiles = select(TikTokProfile.id).join(User, User.id == TikTokProfile.user_id).where(User.niche == niche)
+            tagged = tagged.where(VideoHashtag.profile_id.in_(niche_profiles))
+        tagged = tagged.subquery()
+
+        # The middle row, or the two middle rows for an even count
+        is_middle = and_(
+            tagged.c.position >= (tagged.c.videos + 1) // 2,
+            tagged.c.position <= (tagged.c.videos + 2) // 2
+        )
+        median_views = func.avg(case((is_middle, tagged.c.views), else_=None))
+        query = (
+            select(
+                tagged.c.tag,
+                func.count().label("video_count"),
+                median_views.label("median_views"),
+                func.avg(tagged.c.views).label("avg_views"),
+                func.avg(tagged.c.engagement).label("avg_engagement_rate")
+            )
+            .group_by(tagged.c.tag)
+            .having(func.count() >= min_videos)
+            .order_by(median_views.desc(), tagged.c.tag)
+            .limit(limit)
+        )
+
+        return [
+            {
+                "tag": row.tag,
+                "video_count": row.video_count,
+                "median_views": float(row.median_views or 0),
+                "avg_views": round(float(row.avg_views or 0), 1),
+                "avg_engagement_rate": round(float(row.avg_engagement_rate or 0), 2)
+            }
+            for row in self.db.execute(query)
+        ]
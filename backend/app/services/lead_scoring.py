@@ -0,0 +1,102 @@
+"""
+Columnar collaboration scoring for engaged leads.
+
+Followers arrive as FollowerColumns: parallel NumPy arrays keyed by an
+integer follower id, in chunks of any size. Each chunk is scored with array
+arithmetic and only its best `limit` rows survive (argpartition, no full
+sort), so a creator with millions of followers costs one chunk of memory
+plus a running top-k. Usernames and other per-lead details are looked up
+for the final top-k only. numpy is imported on first use, not at API startup.
+"""
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterable, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Score weights (points) and the values that earn full points
+FOLLOWER_POINTS, FOLLOWERS_FOR_FULL = 3.0, 50000.0
+ENGAGEMENT_POINTS, ENGAGEMENT_FOR_FULL = 4.0, 10.0
+FREQUENCY_POINTS, FREQUENCY_FOR_FULL = 3.0, 5.0  # interactions per week
+
+@dataclass
+class FollowerColumns:
+    """One chunk of followers as parallel arrays"""
+    follower_ids: "np.ndarray"  # int64
+    follower_count: "np.ndarray"  # int64
+    engagement_rate: "np.ndarray"  # float32, percent
+    interaction_frequency: "np.ndarray"  # float32, interactions per week
+    last_interaction_days: Optional["np.ndarray"] = None  # float32, days since the last interaction
+
+    def __len__(self) -> int:
+        return len(self.follower_ids)
+
+    def take(self, positions: "np.ndarray") -> "FollowerColumns":
+        return FollowerColumns(
+            follower_ids=self.follower_ids[positions],
+            follower_count=self.follower_count[positions],
+            engagement_rate=self.engagement_rate[positions],
+            interaction_frequency=self.interaction_frequency[positions],
+            last_interaction_days=None if self.last_interaction_days is None else self.last_interaction_days[positions]
+        )
+
+    @staticmethod
+    def concat(parts: Iterable["FollowerColumns"]) -> "FollowerColumns":
+        import numpy as np
+        parts = list(parts)
+        has_last = all(part.last_interaction_days is not None for part in parts)
+        return FollowerColumns(
+            follower_ids=np.concatenate([part.follower_ids for part in parts]),
+            follower_count=np.concatenate([part.follower_count for part in parts]),
+            engagement_rate=np.concatenate([part.engagement_rate for part in parts]),
+            interaction_frequency=np.concatenate([part.interaction_frequency for part in parts]),
+            last_interaction_days=np.concatenate([part.last_interaction_days for part in parts]) if has_last else None
+        )
+
+def collaboration_scores(columns: FollowerColumns) -> "np.ndarray":
+    """Collaboration potential (0-10) of every follower in the chunk"""
+    import numpy as np
+    scores = np.minimum(columns.follower_count / FOLLOWERS_FOR_FULL, 1.0).astype(np.float32)
+    scores *= FOLLOWER_POINTS
+    scores += np.minimum(columns.engagement_rate / ENGAGEMENT_FOR_FULL, 1.0) * ENGAGEMENT_POINTS
+    scores += np.minimum(columns.interaction_frequency / FREQUENCY_FOR_FULL, 1.0) * FREQUENCY_POINTS
+    return scores
+
+def _top_positions(scores: "np.ndarray", k: int) -> "np.ndarray":
+    """Positions of the k highest scores, highest first"""
+    import numpy as np
+    if k < len(scores):
+        positions = np.argpartition(-scores, k - 1)[:k]
+    else:
+        positions = np.arange(len(scores))
+    return positions[np.argsort(-scores[positions], kind="stable")]
+
+@dataclass
+class ScoredLeads:
+    columns: FollowerColumns
+    scores: "np.ndarray"
+    analyzed: int
+
+def top_leads(chunks: Iterable[FollowerColumns], limit: int) -> ScoredLeads:
+    """Best `limit` followers over all chunks, highest score first"""
+    import numpy as np
+    best: Optional[FollowerColumns] = None
+    best_scores = np.empty(0, dtype=np.float32)
+    analyzed = 0
+    for chunk in chunks:
+        if not len(chunk):
+            continue
+        analyzed += len(chunk)
+        scores = collaboration_scores(chunk)
+        keep = _top_positions(scores, limit)
+        chunk, scores = chunk.take(keep), scores[keep]
+        if best is not None:
+            chunk = FollowerColumns.concat([best, chunk])
+            scores = np.concatenate([best_scores, scores])
+            keep = _top_positions(scores, limit)
+            chunk, scores = chunk.take(keep), scores[keep]
+        best, best_scores = chunk, scores
+
+    if best is None:
+        best = FollowerColumns(*(np.empty(0, dtype=dtype) for dtype in (np.int64, np.int64, np.float32, np.float32)))
+    return ScoredLeads(columns=best, scores=best_scores, analyzed=analyzed)
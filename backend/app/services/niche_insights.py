@@ -0,0 +1,137 @@
+"""
+Precomputed best-practices insights per niche.
+
+Analyzing a niche scrapes several reference creators, so it never runs on
+a request. Workers recompute each niche every NICHE_INSIGHTS_REFRESH_HOURS
+(queued by app.scheduler, or on demand the first time a niche is asked
+for) and store the result with a version and timestamp in niche_insights.
+Requests read the stored insight through the shared cache and personalize
+it for the user, which costs no scraping at all.
+"""
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta
+import asyncio
+import json
+import logging
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from app.core.cache import get_cache
+from app.core.config import settings
+from app.core.niches import NICHES
+from app.db.session import SessionLocal
+from app.models.niche_insight import NicheInsight
+
+logger = logging.getLogger(__name__)
+
+# Lets a pending marker expire if its task is lost, so the niche is requested again
+REFRESH_PENDING_SECONDS = 1800
+
+def niche_insight_cache_key(niche: str) -> str:
+    return f"niche-insights:{niche}"
+
+def refresh_pending_key(niche: str) -> str:
+    return f"niche-insights:refresh-pending:{niche}"
+
+class NicheInsightStore:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, niche: str) -> Optional[Dict]:
+        """Latest insight for a niche from the cache, falling back to the table"""
+        cache = get_cache()
+        cached = cache.get(niche_insight_cache_key(niche))
+        if cached is not None:
+            return cached
+
+        row = self.db.query(NicheInsight).filter(NicheInsight.niche == niche).first()
+        if row is None:
+            return None
+        insight = _serialize(row)
+        cache.set(niche_insight_cache_key(niche), insight, settings.NICHE_INSIGHTS_CACHE_TTL)
+        return insight
+
+    def save(self, niche: str, best_practices: Dict, analyzed_creators: int) -> Dict:
+        """Store a fresh result as the niche's next version and publish it to the cache"""
+        fields = {
+            "best_practices": json.dumps(best_practices),
+            "analyzed_creators": analyzed_creators,
+            "computed_at": datetime.utcnow(),
+        }
+        updated = self.db.execute(
+            update(NicheInsight)
+            .where(NicheInsight.niche == niche)
+            .values(version=NicheInsight.version + 1, **fields)
+        ).rowcount
+        if not updated:
+            self.db.add(NicheInsight(niche=niche, version=1, **fields))
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # Another worker inserted the first version concurrently; ours supersedes it
+            self.db.rollback()
+            return self.save(niche, best_practices, analyzed_creators)
+
+        row = self.db.query(NicheInsight).filter(NicheInsight.niche == niche).one()
+        insight = _serialize(row)
+        get_cache().set(niche_insight_cache_key(niche), insight, settings.NICHE_INSIGHTS_CACHE_TTL)
+        return insight
+
+    def stale_niches(self, now: Optional[datetime] = None) -> List[str]:
+        """Niches never computed or older than NICHE_INSIGHTS_REFRESH_HOURS"""
+        now = now or datetime.utcnow()
+        cutoff = now - timedelta(hours=settings.NICHE_INSIGHTS_REFRESH_HOURS)
+        computed = dict(self.db.query(NicheInsight.niche, NicheInsight.computed_at))
+        return [
+            niche for niche in NICHES
+            if computed.get(niche) is None or computed[niche].replace(tzinfo=None) < cutoff
+        ]
+
+def _serialize(row: NicheInsight) -> Dict:
+    return {
+        "niche": row.niche,
+        "version": row.version,
+        "computed_at": row.computed_at.isoformat() if row.computed_at else None,
+        "best_practices": json.loads(row.best_practices),
+        "analyzed_creators": row.analyzed_creators,
+    }
+
+def request_niche_refresh(niche: str) -> bool:
+    """Queue a background recompute of a niche; returns False if one is already pending"""
+    cache = get_cache()
+    pending_key = refresh_pending_key(niche)
+    if not cache.add(pending_key, niche, REFRESH_PENDING_SECONDS):
+        return False
+
+    # Imported here so the API only loads Celery once it has work to send
+    from app.worker import refresh_niche_insights
+    try:
+        refresh_niche_insights.apply_async(args=[niche])
+    except Exception as e:
+        logger.error(f"Could not queue niche insights refresh for {niche}: {str(e)}")
+        cache.delete(pending_key)
+        return False
+    return True
+
+def compute_niche_insights(niche: str) -> Optional[Dict]:
+    """Analyze a niche's reference creators and store the result (runs on a worker)"""
+    from app.services.best_practices_analyzer import BestPracticesAnalyzer
+
+    db = SessionLocal()
+    analyzer = BestPracticesAnalyzer(db)
+    try:
+        async def analyze():
+            try:
+                return await analyzer.analyze_niche(niche)
+            finally:
+                await analyzer.close()
+
+        result = asyncio.run(analyze())
+        if not result["analyzed_creators"]:
+            # Keep serving the previous version rather than an empty one
+            logger.warning(f"No creators could be analyzed for niche {niche}")
+            return None
+        return NicheInsightStore(db).save(niche, result["best_practices"], result["analyzed_creators"])
+    finally:
+        get_cache().delete(refresh_pending_key(niche))
+        db.close()
@@ -0,0 +1,206 @@
+"""
+When a creator posts, and how it pays off.
+
+Two aggregate queries per profile, both run by the database:
+  - the hour-of-week heatmap groups videos by weekday and hour of posted_at
+    (shifted by the viewer's UTC offset) and averages views and engagement;
+  - cadence uses window functions: lag() gives the gap since the previous
+    post, and day - dense_rank() over the posting days labels runs of
+    consecutive days (streaks) with one value each.
+numpy then reduces the per-post gaps and streak labels to the statistics.
+Weekday and hour come from epoch arithmetic, which SQLite and PostgreSQL
+share (1970-01-01 was a Thursday). Results are cached under the profile's
+data version, so a scrape or import retires them immediately. numpy is
+imported on first use, keeping it out of API startup.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional
+import math
+from sqlalchemy import BigInteger, Integer, cast, func, select
+from sqlalchemy.orm import Session
+from app.core.cache import data_version, get_cache
+from app.core.config import settings
+from app.models.tiktok_video import TikTokVideo
+from app.services.hashtag_index import ENGAGEMENT_RATE
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+HOURS_PER_WEEK = 7 * 24
+
+# A slot needs this many videos before it can be recommended
+MIN_SLOT_VIDEOS = 2
+BEST_SLOTS = 3
+
+# Coefficient of variation of the gaps between posts
+REGULAR_MAX_CV = 0.5
+IRREGULAR_MAX_CV = 1.0
+MIN_POSTS = 3
+
+SECONDS_PER_DAY = 86400
+
+def profile_data_scope(profile_id: int) -> str:
+    """data_version scope of everything derived from a profile's videos"""
+    return f"profile:{profile_id}"
+
+def epoch_seconds(dialect: str, column):
+    """A timestamp column as whole seconds since the Unix epoch (UTC)"""
+    if dialect == "postgresql":
+        return cast(func.extract("epoch", column), BigInteger)
+    return cast(func.strftime("%s", column), Integer)
+
+def posting_patterns_cache_key(profile_id: int, version: str, utc_offset_minutes: int) -> str:
+    return f"posting-patterns:{profile_id}:{version}:{utc_offset_minutes}"
+
+def _round(value, digits: int = 2) -> Optional[float]:
+    return None if value is None or math.isnan(value) else round(float(value), digits)
+
+class PostingPatterns:
+    def __init__(self, db: Session):
+        self.db = db
+        self.dialect = db.get_bind().dialect.name
+
+    def get(self, profile_id: int, utc_offset_minutes: int = 0) -> Dict:
+        """Heatmap and cadence of a profile, cached until its data changes"""
+        version = data_version(profile_data_scope(profile_id))
+        return get_cache().get_or_set(
+            posting_patterns_cache_key(profile_id, version, utc_offset_minutes),
+            lambda: {
+                "utc_offset_minutes": utc_offset_minutes,
+                "heatmap": self.heatmap(profile_id, utc_offset_minutes),
+                "cadence": self.cadence(profile_id, utc_offset_minutes),
+            },
+            settings.ANALYTICS_PRECOMPUTED_TTL
+        )
+
+    def _local_epoch(self, utc_offset_minutes: int):
+        """posted_at as whole seconds since the epoch, in the viewer's local time"""
+        return epoch_seconds(self.dialect, TikTokVideo.posted_at) + utc_offset_minutes * 60
+
+    def heatmap(self, profile_id: int, utc_offset_minutes: int = 0) -> Dict:
+        """Videos, average views and engagement per weekday x hour, with the best slots"""
+        import numpy as np
+        epoch = self._local_epoch(utc_offset_minutes)
+        # Monday-based weekday (epoch day 0 was a Thursday) and hour of the day
+        weekday = ((epoch // SECONDS_PER_DAY) + 3) % 7
+        hour = (epoch % SECONDS_PER_DAY) // 3600
+        posts = (
+            select(
+                (weekday * 24 + hour).label("slot"),
+                TikTokVideo.view_count.label("views"),
+                ENGAGEMENT_RATE.label("engagement")
+            )
+            .where(TikTokVideo.profile_id == profile_id, TikTokVideo.posted_at.isnot(None))
+            .subquery()
+        )
+        rows = self.db.execute(
+            select(
+                posts.c.slot,
+                func.count().label("videos"),
+                func.sum(posts.c.views).label("views"),
+                func.count(posts.c.views).label("viewed"),
+                func.sum(posts.c.engagement).label("engagement"),
+                func.count(posts.c.engagement).label("engaged"),
+            )
+            .group_by(posts.c.slot)
+        ).all()
+
+        # Sums and counts on the 7 x 24 grid, so the marginals are plain array sums
+        grid = np.zeros((5, HOURS_PER_WEEK))
+        if rows:
+            slots = np.array([row.slot for row in rows], dtype=np.int64)
+            grid[:, slots] = np.array(
+                [[row.videos, row.views or 0, row.viewed, row.engagement or 0, row.engaged] for row in rows],
+                dtype=float
+            ).T
+        videos, views, viewed, engagement, engaged = grid.reshape(5, 7, 24)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            avg_views = views / viewed
+            avg_engagement = engagement / engaged
+            overall_views = views.sum() / viewed.sum()
+            lift = avg_views / overall_views
+
+        cells = [
+            {
+                "weekday": int(day),
+                "day_name": WEEKDAYS[day],
+                "hour": int(hour_),
+                "video_count": int(videos[day, hour_]),
+                "avg_views": _round(avg_views[day, hour_], 1),
+                "avg_engagement_rate": _round(avg_engagement[day, hour_]),
+                "views_lift": _round(lift[day, hour_]),
+            }
+            for day, hour_ in zip(*np.nonzero(videos))
+        ]
+        eligible = [cell for cell in cells if cell["video_count"] >= MIN_SLOT_VIDEOS and cell["avg_views"] is not None]
+        best_slots = sorted(eligible, key=lambda cell: cell["avg_views"], reverse=True)[:BEST_SLOTS]
+
+        def marginal(axis: int, field: str, keys) -> List[Dict]:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                means = views.sum(axis=axis) / viewed.sum(axis=axis)
+                engagement_means = engagement.sum(axis=axis) / engaged.sum(axis=axis)
+            return [
+                {field: key, "video_count": int(count), "avg_views": _round(mean, 1),
+                 "avg_engagement_rate": _round(engagement_mean)}
+                for key, count, mean, engagement_mean in zip(keys, videos.sum(axis=axis), means, engagement_means)
+            ]
+
+        return {
+            "videos_analyzed": int(videos.sum()),
+            "avg_views": _round(overall_views, 1),
+            "cells": cells,
+            "best_slots": best_slots,
+            "by_weekday": marginal(1, "day_name", WEEKDAYS),
+            "by_hour": marginal(0, "hour", range(24)),
+        }
+
+    def cadence(self, profile_id: int, utc_offset_minutes: int = 0, now: Optional[datetime] = None) -> Dict:
+        """Gaps between posts, posting-day streaks and a 0-100 regularity score"""
+        import numpy as np
+        epoch = self._local_epoch(utc_offset_minutes)
+        posts = (
+            select(epoch.label("epoch"), (epoch // SECONDS_PER_DAY).label("day"))
+            .where(TikTokVideo.profile_id == profile_id, TikTokVideo.posted_at.isnot(None))
+            .subquery()
+        )
+        rows = self.db.execute(
+            select(
+                posts.c.epoch,
+                posts.c.day,
+                (posts.c.epoch - func.lag(posts.c.epoch).over(order_by=posts.c.epoch)).label("gap"),
+                # Constant within a run of consecutive posting days
+                (posts.c.day - func.dense_rank().over(order_by=posts.c.day)).label("run")
+            ).order_by(posts.c.epoch)
+        ).all()
+
+        if len(rows) < MIN_POSTS:
+            return {"posts_analyzed": len(rows), "consistency": "insufficient_data"}
+
+        epochs, days, gaps, runs = (np.array(column, dtype=float) for column in zip(*rows))
+        gaps = gaps[1:] / SECONDS_PER_DAY
+        mean_gap = gaps.mean()
+        cv = gaps.std() / mean_gap if mean_gap > 0 else 0.0
+        consistency = "regular" if cv <= REGULAR_MAX_CV else "irregular" if cv <= IRREGULAR_MAX_CV else "sporadic"
+
+        # Streak length = posting days sharing a run label; labels only grow, so the last run is the latest
+        _, first_post_of_day = np.unique(days, return_index=True)
+        _, streak_days = np.unique(runs[first_post_of_day], return_counts=True)
+        today = ((now or datetime.utcnow()) - datetime(1970, 1, 1)).total_seconds() + utc_offset_minutes * 60
+        today = today // SECONDS_PER_DAY
+        last_day = days[-1]
+        span_weeks = max((epochs[-1] - epochs[0]) / (7 * SECONDS_PER_DAY), 1.0)
+
+        return {
+            "posts_analyzed": len(rows),
+            "first_post_at": datetime.utcfromtimestamp(epochs[0] - utc_offset_minutes * 60).isoformat(),
+            "last_post_at": datetime.utcfromtimestamp(epochs[-1] - utc_offset_minutes * 60).isoformat(),
+            "posts_per_week": _round(len(rows) / span_weeks),
+            "avg_gap_days": _round(mean_gap),
+            "median_gap_days": _round(np.median(gaps)),
+            "gap_std_days": _round(gaps.std()),
+            "longest_gap_days": _round(gaps.max()),
+            "days_since_last_post": int(today - last_day),
+            "longest_streak_days": int(streak_days.max()),
+            # The last run counts while it reaches today or yesterday
+            "current_streak_days": int(streak_days[-1]) if today - last_day <= 1 else 0,
+            "regularity_score": _round(100 / (1 + cv), 1),
+            "consistency": consistency,
+        }
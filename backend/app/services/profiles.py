@@ -0,0 +1,19 @@
+"""
+The profile a user's dashboard, search, exports and imports work on.
+
+A user can track several profiles; everything user-scoped reads the same
+one, their first (lowest id).
+"""
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.models.tiktok_profile import TikTokProfile
+
+def get_user_profile(db: Session, user_id: int, *columns) -> Optional[TikTokProfile]:
+    """The user's profile, or None; with columns, a row of just those (e.g. TikTokProfile.id)"""
+    return db.query(*(columns or (TikTokProfile,))).filter(
+        TikTokProfile.user_id == user_id
+    ).order_by(TikTokProfile.id).first()
+
+def get_user_profile_id(db: Session, user_id: int) -> Optional[int]:
+    profile = get_user_profile(db, user_id, TikTokProfile.id)
+    return None if profile is None else profile.id
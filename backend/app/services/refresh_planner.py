@@ -0,0 +1,165 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import heapq
+import logging
+from sqlalchemy import case, exists, func, or_
+from sqlalchemy.orm import Session
+from app.models.scrape_job import ScrapeJob
+from app.models.tiktok_profile import TikTokProfile
+from app.models.user import User
+from app.services.scrape_jobs import ScrapeJobQueue
+from app.services.scrape_scheduler import SCHEDULED
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# How much faster than REFRESH_MAX_INTERVAL_HOURS a profile is refreshed for
+# each 1%/day of follower growth, and for a recently active owner
+GROWTH_WEIGHT = 4.0
+ACTIVE_TODAY_WEIGHT = 3.0
+ACTIVE_THIS_WEEK_WEIGHT = 1.0
+
+# Jobs queued per refreshed profile (counters, recent videos, commenters)
+REFRESH_JOBS = (ScrapeJob.PROFILE_UPDATE, ScrapeJob.VIDEO_SCRAPE, ScrapeJob.INTERACTION_SCRAPE)
+
+def pages_per_job(job_type: str) -> int:
+    """
+    Page loads a job costs against REFRESH_SCRAPES_PER_HOUR: commenter scrapes
+    open each recent video plus up to INTERACTION_PROFILE_LOOKUPS commenter profiles
+    """
+    if job_type == ScrapeJob.INTERACTION_SCRAPE:
+        return settings.INTERACTION_SCRAPE_VIDEOS + settings.INTERACTION_PROFILE_LOOKUPS
+    return 1
+
+@dataclass
+class RefreshCandidate:
+    profile_id: int
+    user_id: int
+    score: float  # staleness in multiples of the profile's target interval; >= 1 means due
+    staleness_hours: float
+    target_interval_hours: float
+
+class RefreshPlanner:
+    """
+    Picks which tracked profiles to rescrape next.
+    Each profile gets a target refresh interval: fast-growing creators and
+    profiles whose owner was recently active come due sooner, dormant ones
+    drift towards REFRESH_MAX_INTERVAL_HOURS. Profiles are ranked by how
+    overdue they are and queued as scheduled jobs within the hourly budget.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def target_interval_hours(self, follower_count: Optional[int], follower_velocity: Optional[float],
+                              last_seen_at: Optional[datetime], now: datetime) -> float:
+        speedup = 1.0
+        if follower_velocity:
+            growth_pct_per_day = abs(follower_velocity) / max(follower_count or 0, 100) * 100
+            speedup += GROWTH_WEIGHT * growth_pct_per_day
+        if last_seen_at is not None:
+            seen_ago = now - last_seen_at.replace(tzinfo=None)
+            if seen_ago <= timedelta(days=1):
+                speedup += ACTIVE_TODAY_WEIGHT
+            elif seen_ago <= timedelta(days=7):
+                speedup += ACTIVE_THIS_WEEK_WEIGHT
+        return max(settings.REFRESH_MAX_INTERVAL_HOURS / speedup, settings.REFRESH_MIN_INTERVAL_HOURS)
+
+    def plan(self, limit: int, now: Optional[datetime] = None) -> List[RefreshCandidate]:
+        """The `limit` most overdue profiles, scanning the table in keyset batches"""
+        if limit <= 0:
+            return []
+        now = now or datetime.utcnow()
+        best: List[Tuple[float, int, RefreshCandidate]] = []
+
+        for rows in self._stale_batches(now):
+            for profile_id, user_id, last_scraped_at, follower_count, follower_velocity, last_seen_at in rows:
+                interval = self.target_interval_hours(follower_count, follower_velocity, last_seen_at, now)
+                if last_scraped_at is None:
+                    staleness = float("inf")
+                else:
+                    staleness = (now - last_scraped_at.replace(tzinfo=None)).total_seconds() / 3600
+                score = staleness / interval
+                if score < 1:
+                    continue
+                candidate = RefreshCandidate(profile_id, user_id, score, staleness, interval)
+                # Bounded min-heap keeps memory at O(limit) however many profiles are due
+                entry = (score, -profile_id, candidate)
+                if len(best) < limit:
+                    heapq.heappush(best, entry)
+                elif entry[:2] > best[0][:2]:
+                    heapq.heapreplace(best, entry)
+
+        return [candidate for _, _, candidate in sorted(best, key=lambda entry: entry[:2], reverse=True)]
+
+    def remaining_budget(self, now: Optional[datetime] = None) -> int:
+        """Page loads scheduled jobs can still use in the current one-hour window"""
+        now = now or datetime.utcnow()
+        pages = case(
+            {ScrapeJob.INTERACTION_SCRAPE: pages_per_job(ScrapeJob.INTERACTION_SCRAPE)},
+            value=ScrapeJob.job_type, else_=1
+        )
+        used = self.db.query(func.coalesce(func.sum(pages), 0)).filter(
+            ScrapeJob.priority == SCHEDULED,
+            ScrapeJob.created_at >= now - timedelta(hours=1)
+        ).scalar()
+        return max(settings.REFRESH_SCRAPES_PER_HOUR - used, 0)
+
+    def run(self, now: Optional[datetime] = None) -> Dict:
+        """Plan and queue one refresh cycle"""
+        now = now or datetime.utcnow()
+        budget = self.remaining_budget(now)
+        pages_per_refresh = sum(pages_per_job(job_type) for job_type in REFRESH_JOBS)
+        candidates = self.plan(budget // pages_per_refresh, now)
+
+        queue = ScrapeJobQueue(self.db)
+        profiles = {
+            profile.id: profile for profile in self.db.query(TikTokProfile).filter(
+                TikTokProfile.id.in_([c.profile_id for c in candidates])
+            )
+        } if candidates else {}
+
+        queued = 0
+        for candidate in candidates:
+            profile = profiles.get(candidate.profile_id)
+            if profile is None:
+                continue
+            for job_type in REFRESH_JOBS:
+                queue.enqueue(job_type, profile, candidate.user_id, priority=SCHEDULED)
+            queued += 1
+
+        summary = {"budget": budget, "profiles_queued": queued, "jobs_queued": queued * len(REFRESH_JOBS),
+                   "pages_budgeted": queued * pages_per_refresh}
+        logger.info(f"Refresh cycle: {summary}")
+        return summary
+
+    def _stale_batches(self, now: datetime) -> Iterator[List[Tuple]]:
+        """
+        Active profiles not scraped within REFRESH_MIN_INTERVAL_HOURS and with no
+        job in flight, in primary-key order batches (keyset pagination, no OFFSET)
+        """
+        fresh_cutoff = now - timedelta(hours=settings.REFRESH_MIN_INTERVAL_HOURS)
+        job_in_flight = exists().where(
+            ScrapeJob.profile_id == TikTokProfile.id,
+            ScrapeJob.status.in_(ScrapeJob.ACTIVE_STATUSES)
+        )
+        last_id = 0
+        while True:
+            rows = self.db.query(
+                TikTokProfile.id,
+                TikTokProfile.user_id,
+                TikTokProfile.last_scraped_at,
+                TikTokProfile.follower_count,
+                TikTokProfile.follower_velocity,
+                User.last_seen_at
+            ).join(User, User.id == TikTokProfile.user_id).filter(
+                TikTokProfile.id > last_id,
+                TikTokProfile.is_active.isnot(False),
+                or_(TikTokProfile.last_scraped_at.is_(None), TikTokProfile.last_scraped_at < fresh_cutoff),
+                ~job_in_flight
+            ).order_by(TikTokProfile.id).limit(settings.REFRESH_BATCH_SIZE).all()
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1][0]
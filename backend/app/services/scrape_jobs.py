@@ -0,0 +1,375 @@
+from collections import Counter
+from typing import Iterable, List, Optional
+from datetime import datetime
+import asyncio
+import logging
+from sqlalchemy import case, func, update
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from app.db.session import SessionLocal
+from app.models.scrape_job import ScrapeJob
+from app.models.tiktok_profile import TikTokProfile
+from app.models.tiktok_video import TikTokVideo
+from app.services.tiktok_scraper import TikTokScraper, video_posted_at
+from app.services.analytics_events import publish_profile_data_changed
+from app.services.hashtag_index import HashtagIndex
+from app.services.follower_interactions import COMMENT, FollowerInteractionStore, estimated_engagement_rate, normalize_username
+from app.services.scrape_scheduler import INTERACTIVE, PRIORITIES, REFRESH, SCHEDULED
+from app.core.config import settings
+from app.core.metrics import registry, render_gauge
+
+logger = logging.getLogger(__name__)
+
+class ScrapeJobQueue:
+    """
+    Records scrape jobs in the database and hands them to the Celery workers
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def enqueue(self, job_type: str, profile: TikTokProfile, user_id: int,
+                priority: str = REFRESH) -> ScrapeJob:
+        """Queue a job, or return the one already active for the same profile and type"""
+        key = f"{job_type}:{profile.id}"
+        existing = self.db.query(ScrapeJob).filter(ScrapeJob.idempotency_key == key).first()
+        if existing:
+            return existing
+
+        # Fair share: a user with enough jobs in the queue waits for one to finish,
+        # except for onboarding, which the user is actively waiting on
+        deferred = priority != INTERACTIVE and self._dispatched_count(user_id) >= settings.SCRAPE_MAX_ACTIVE_JOBS_PER_USER
+
+        job = ScrapeJob(
+            user_id=user_id,
+            profile_id=profile.id,
+            job_type=job_type,
+            priority=priority,
+            idempotency_key=key,
+            status=ScrapeJob.DEFERRED if deferred else ScrapeJob.QUEUED,
+            progress=0,
+            attempts=0,
+            message="Waiting for your other jobs to finish" if deferred else "Waiting for a worker"
+        )
+        self.db.add(job)
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # Another request queued the same work between our check and insert
+            self.db.rollback()
+            return self.db.query(ScrapeJob).filter(ScrapeJob.idempotency_key == key).one()
+
+        if not deferred:
+            self._dispatch(job)
+        return job
+
+    def get_job(self, job_id: int, user_id: int) -> Optional[ScrapeJob]:
+        return self.db.query(ScrapeJob).filter(
+            ScrapeJob.id == job_id,
+            ScrapeJob.user_id == user_id
+        ).first()
+
+    def release_deferred(self, user_id: int) -> Optional[ScrapeJob]:
+        """Queue the user's next deferred job (highest priority, then oldest) if they have room"""
+        if self._dispatched_count(user_id) >= settings.SCRAPE_MAX_ACTIVE_JOBS_PER_USER:
+            return None
+        rank = case({p: i for i, p in enumerate(PRIORITIES)}, value=ScrapeJob.priority)
+        job = self.db.query(ScrapeJob).filter(
+            ScrapeJob.user_id == user_id,
+            ScrapeJob.status == ScrapeJob.DEFERRED
+        ).order_by(rank, ScrapeJob.id).first()
+        if not job:
+            return None
+        _update(self.db, job, status=ScrapeJob.QUEUED, message="Waiting for a worker")
+        self._dispatch(job)
+        return job
+
+    def _dispatched_count(self, user_id: int) -> int:
+        # Scheduled refreshes are bounded by the planner's global budget, so they
+        # never use up the share that keeps a user's own requests moving
+        return self.db.query(func.count(ScrapeJob.id)).filter(
+            ScrapeJob.user_id == user_id,
+            ScrapeJob.status.in_((ScrapeJob.QUEUED, ScrapeJob.RUNNING)),
+            ScrapeJob.priority != SCHEDULED
+        ).scalar()
+
+    def _dispatch(self, job: ScrapeJob):
+        # Imported here so the API process only loads Celery once it queues work
+        from app.worker import run_scrape_job
+        try:
+            # Each priority class has its own Celery queue (see app.worker)
+            run_scrape_job.apply_async(args=[job.id], queue=job.priority)
+        except Exception as e:
+            logger.error(f"Could not queue scrape job {job.id}: {str(e)}")
+            _finish(self.db, job, ScrapeJob.FAILED, error=f"Job queue unavailable: {str(e)}")
+
+def execute_scrape_job(job_id: int, final_attempt: bool = True) -> Optional[str]:
+    """
+    Run one job in a worker process with its own DB session.
+    Returns the final status, or None when the job was already finished
+    (e.g. a redelivered message). Re-raises the error when a retry should follow.
+    """
+    db = SessionLocal()
+    try:
+        job = _claim(db, job_id)
+        if job is None:
+            return None
+
+        try:
+            asyncio.run(JOB_HANDLERS[job.job_type](db, job))
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Scrape job {job_id} failed on attempt {job.attempts}: {str(e)}")
+            if not final_attempt:
+                _update(db, job, status=ScrapeJob.QUEUED, message="Retrying", error=str(e))
+                raise
+            _finish(db, job, ScrapeJob.FAILED, error=str(e))
+            ScrapeJobQueue(db).release_deferred(job.user_id)
+            return ScrapeJob.FAILED
+
+        _finish(db, job, ScrapeJob.SUCCEEDED)
+        ScrapeJobQueue(db).release_deferred(job.user_id)
+        return ScrapeJob.SUCCEEDED
+    finally:
+        db.close()
+
+async def update_profile_data(db: Session, job: ScrapeJob):
+    """Refresh the stored profile counters"""
+    profile = db.query(TikTokProfile).filter(TikTokProfile.id == job.profile_id).first()
+    if not profile:
+        raise ValueError(f"Profile {job.profile_id} no longer exists")
+
+    scraper = TikTokScraper(priority=job.priority, user_id=job.user_id)
+    try:
+        _update(db, job, progress=10, message="Scraping profile")
+        profile_data = await scraper.get_profile_data(profile.tiktok_username, use_cache=False)
+        if not profile_data:
+            raise ValueError(f"Could not scrape profile @{profile.tiktok_username}")
+
+        _update(db, job, progress=70, message="Saving profile")
+        now = datetime.utcnow()
+        profile.follower_velocity = follower_velocity(profile, profile_data.get('follower_count'), now)
+        profile.display_name = profile_data.get('display_name')
+        profile.bio = profile_data.get('bio')
+        profile.follower_count = profile_data.get('follower_count')
+        profile.following_count = profile_data.get('following_count')
+        profile.likes_count = profile_data.get('likes_count')
+        profile.video_count = profile_data.get('video_count')
+        profile.avatar_url = profile_data.get('avatar_url')
+        profile.is_verified = profile_data.get('is_verified', False)
+        profile.last_scraped_at = now
+
+        db.commit()
+        publish_profile_data_changed(profile.id)
+    finally:
+        await scraper.close()
+
+async def scrape_recent_videos(db: Session, job: ScrapeJob):
+    """Store newly posted videos; videos already stored are skipped, so reruns are safe"""
+    profile = db.query(TikTokProfile).filter(TikTokProfile.id == job.profile_id).first()
+    if not profile:
+        raise ValueError(f"Profile {job.profile_id} no longer exists")
+
+    scraper = TikTokScraper(priority=job.priority, user_id=job.user_id)
+    try:
+        _update(db, job, progress=10, message="Scraping recent videos")
+        videos_data = await scraper.get_recent_videos(profile.tiktok_username, limit=20, use_cache=False)
+
+        _update(db, job, progress=60, message=f"Saving {len(videos_data)} videos")
+
+        # Extract video IDs from URLs and look up the known ones in a single query
+        video_ids = [video_data['video_url'].split('/')[-1] for video_data in videos_data]
+        existing_ids = {
+            row.video_id for row in db.query(TikTokVideo.video_id).filter(
+                TikTokVideo.video_id.in_(video_ids)
+            )
+        } if video_ids else set()
+
+        new_videos = []
+        for video_id, video_data in zip(video_ids, videos_data):
+            if video_id not in existing_ids:
+                existing_ids.add(video_id)
+                new_video = TikTokVideo(
+                    profile_id=profile.id,
+                    video_id=video_id,
+                    video_url=video_data['video_url'],
+                    description=video_data.get('description'),
+                    view_count=video_data.get('view_count'),
+                    like_count=video_data.get('like_count'),
+                    comment_count=video_data.get('comment_count'),
+                    share_count=video_data.get('share_count'),
+                    # The video grid shows no dates; posting patterns and trends rely on this
+                    posted_at=video_posted_at(video_id),
+                    last_scraped_at=datetime.utcnow()
+                )
+                db.add(new_video)
+                new_videos.append(new_video)
+
+        if new_videos:
+            # Parse hashtags and mentions once, in the same transaction as the videos
+            db.flush()
+            HashtagIndex(db).index_videos(new_videos)
+
+        db.commit()
+        publish_profile_data_changed(profile.id)
+    finally:
+        await scraper.close()
+
+async def scrape_interactions(db: Session, job: ScrapeJob):
+    """
+    Record who commented on the profile's recent videos. Each video keeps a
+    watermark, and only comments posted after it are counted, so reruns and
+    overlapping scrapes never count a comment twice. The most active commenters
+    not seen before get their own profile scraped (up to INTERACTION_PROFILE_LOOKUPS),
+    so engaged leads can score their reach and engagement.
+    """
+    profile = db.query(TikTokProfile).filter(TikTokProfile.id == job.profile_id).first()
+    if not profile:
+        raise ValueError(f"Profile {job.profile_id} no longer exists")
+
+    # Most recently posted first; progress updates commit, so read what the loop needs up front
+    videos = db.query(TikTokVideo.id, TikTokVideo.video_url, TikTokVideo.interactions_scraped_at).filter(
+        TikTokVideo.profile_id == profile.id
+    ).order_by(
+        TikTokVideo.posted_at.desc().nulls_last(), TikTokVideo.id.desc()
+    ).limit(settings.INTERACTION_SCRAPE_VIDEOS).all()
+
+    scraper = TikTokScraper(priority=job.priority, user_id=job.user_id)
+    try:
+        interactions, watermarks = [], []
+        for position, (video_id, video_url, watermark) in enumerate(videos):
+            _update(db, job, progress=10 + 70 * position // len(videos),
+                    message=f"Scraping comments ({position + 1}/{len(videos)})")
+            scraped_at = datetime.utcnow()
+            comments = await scraper.get_video_comments(video_url, limit=settings.INTERACTION_COMMENTS_PER_VIDEO)
+            if not comments:
+                continue
+            watermark = watermark.replace(tzinfo=None) if watermark else None
+            interactions.extend(
+                {"username": comment["username"], "kind": COMMENT, "at": comment["commented_at"]}
+                for comment in comments
+                if comment["commented_at"] is not None and (watermark is None or comment["commented_at"] > watermark)
+            )
+            watermarks.append({"id": video_id, "interactions_scraped_at": scraped_at})
+
+        store = FollowerInteractionStore(db)
+        await _add_commenter_details(db, job, scraper, store, interactions)
+
+        # Counters and watermarks move together, in one transaction
+        _update(db, job, progress=90, message=f"Saving {len(interactions)} interactions")
+        store.record(profile.id, interactions)
+        if watermarks:
+            db.execute(update(TikTokVideo), watermarks)
+        db.commit()
+    finally:
+        await scraper.close()
+
+# Weight of the newest observation in the follower velocity average
+VELOCITY_SMOOTHING = 0.5
+
+def follower_velocity(profile: TikTokProfile, new_count: Optional[int], now: datetime) -> Optional[float]:
+    """Followers gained per day since the last scrape, smoothed with the previous estimate"""
+    if new_count is None or profile.follower_count is None or profile.last_scraped_at is None:
+        return profile.follower_velocity
+    days = (now - profile.last_scraped_at.replace(tzinfo=None)).total_seconds() / 86400
+    if days <= 0:
+        return profile.follower_velocity
+    observed = (new_count - profile.follower_count) / days
+    if profile.follower_velocity is None:
+        return observed
+    return VELOCITY_SMOOTHING * observed + (1 - VELOCITY_SMOOTHING) * profile.follower_velocity
+
+async def _add_commenter_details(db: Session, job: ScrapeJob, scraper: TikTokScraper,
+                                 store: FollowerInteractionStore, interactions: List[dict]):
+    """Follower count, engagement rate and bio of the most active new commenters, set on their interactions"""
+    activity = Counter(normalize_username(interaction["username"]) for interaction in interactions)
+    usernames = [username for username, _ in activity.most_common() if username]
+    lookups = store.without_details(usernames)[:settings.INTERACTION_PROFILE_LOOKUPS]
+    details = {}
+    for position, username in enumerate(lookups):
+        _update(db, job, progress=80 + 10 * position // len(lookups),
+                message=f"Scraping commenter profiles ({position + 1}/{len(lookups)})")
+        profile_data = await scraper.get_profile_data(username)
+        if profile_data:
+            details[username] = {
+                "follower_count": profile_data.get("follower_count"),
+                "engagement_rate": estimated_engagement_rate(profile_data),
+                "bio": profile_data.get("bio"),
+            }
+    for interaction in interactions:
+        interaction.update(details.get(normalize_username(interaction["username"]), ()))
+
+JOB_HANDLERS = {
+    ScrapeJob.PROFILE_UPDATE: update_profile_data,
+    ScrapeJob.VIDEO_SCRAPE: scrape_recent_videos,
+    ScrapeJob.INTERACTION_SCRAPE: scrape_interactions,
+}
+
+def _claim(db: Session, job_id: int) -> Optional[ScrapeJob]:
+    """Mark the job running; unfinished jobs can be claimed again after a worker crash"""
+    claimed = db.query(ScrapeJob).filter(
+        ScrapeJob.id == job_id,
+        ScrapeJob.status.in_((ScrapeJob.QUEUED, ScrapeJob.RUNNING))
+    ).update({
+        ScrapeJob.status: ScrapeJob.RUNNING,
+        ScrapeJob.attempts: ScrapeJob.attempts + 1,
+        ScrapeJob.started_at: datetime.utcnow(),
+        ScrapeJob.message: "Started",
+    }, synchronize_session=False)
+    db.commit()
+    if not claimed:
+        return None
+    return db.query(ScrapeJob).filter(ScrapeJob.id == job_id).first()
+
+def _update(db: Session, job: ScrapeJob, **fields):
+    for name, value in fields.items():
+        setattr(job, name, value)
+    db.commit()
+
+def _finish(db: Session, job: ScrapeJob, status: str, error: Optional[str] = None):
+    _update(
+        db, job,
+        status=status,
+        progress=100 if status == ScrapeJob.SUCCEEDED else job.progress,
+        message="Completed" if status == ScrapeJob.SUCCEEDED else "Failed",
+        error=error,
+        finished_at=datetime.utcnow(),
+        # Release the key so the same work can be queued again
+        idempotency_key=None
+    )
+
+def collect_job_metrics() -> Iterable[str]:
+    """Queue depth and age of the oldest waiting job per priority class"""
+    db = SessionLocal()
+    try:
+        rows = db.query(
+            ScrapeJob.priority, ScrapeJob.status, func.count(ScrapeJob.id), func.min(ScrapeJob.created_at)
+        ).filter(
+            ScrapeJob.status.in_((ScrapeJob.DEFERRED, ScrapeJob.QUEUED))
+        ).group_by(ScrapeJob.priority, ScrapeJob.status).all()
+    except Exception as e:
+        logger.warning(f"Could not collect scrape job metrics: {str(e)}")
+        return []
+    finally:
+        db.close()
+
+    depth = {(priority, status): 0 for priority in PRIORITIES for status in (ScrapeJob.DEFERRED, ScrapeJob.QUEUED)}
+    oldest = {priority: None for priority in PRIORITIES}
+    for priority, status, count, created_at in rows:
+        depth[(priority, status)] = count
+        if created_at is not None and (oldest.get(priority) is None or created_at < oldest[priority]):
+            oldest[priority] = created_at
+
+    lines: List[str] = ["# HELP scrape_jobs_waiting Scrape jobs waiting to run by priority class",
+                        "# TYPE scrape_jobs_waiting gauge"]
+    for (priority, status), count in sorted(depth.items()):
+        lines.append(render_gauge("scrape_jobs_waiting", count, priority=priority, status=status))
+    lines.append("# HELP scrape_jobs_oldest_wait_seconds Age of the oldest waiting scrape job by priority class")
+    lines.append("# TYPE scrape_jobs_oldest_wait_seconds gauge")
+    now = datetime.utcnow()
+    for priority, created_at in sorted(oldest.items()):
+        age = (now - created_at.replace(tzinfo=None)).total_seconds() if created_at else 0
+        lines.append(render_gauge("scrape_jobs_oldest_wait_seconds", round(max(age, 0), 3), priority=priority))
+    return lines
+
+registry.add_collector(collect_job_metrics)
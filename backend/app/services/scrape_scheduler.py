@@ -0,0 +1,183 @@
+"""
+Priority-aware scheduler in front of the TikTok scraper.
+
+Every scrape that actually hits TikTok takes a slot from the process-wide
+scheduler. Slots are granted strictly by priority class, and round-robin
+between users within a class, so one user's batch can't starve another
+user's request. SCRAPE_INTERACTIVE_RESERVED slots are held back for
+interactive (onboarding) work and never given to the lower classes.
+
+The same classes name the Celery queues scrape jobs are routed to (see
+app.worker), so queued work is ordered the same way.
+"""
+from typing import Callable, Deque, Dict, Iterable, List, Optional, TypeVar
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+import asyncio
+import threading
+import time
+from app.core.config import settings
+from app.core.metrics import Histogram, process_labels, registry, render_gauge, render_histogram
+
+# Priority classes, highest first
+INTERACTIVE = "interactive"  # onboarding: the user is waiting on the screen
+REFRESH = "refresh"  # user-triggered refresh
+SCHEDULED = "scheduled"  # periodic background refresh
+NICHE = "niche"  # niche/best-practices analysis across many creators
+PRIORITIES = (INTERACTIVE, REFRESH, SCHEDULED, NICHE)
+
+T = TypeVar("T")
+
+WAIT_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+class _Waiter:
+    __slots__ = ("loop", "future", "enqueued_at")
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.future = self.loop.create_future()
+        self.enqueued_at = time.perf_counter()
+
+class ScrapeScheduler:
+    """
+    Slot pool shared by all event loops of a process. Waiters are resolved
+    with call_soon_threadsafe, so API requests and Celery tasks (which run
+    their own loops) can share one instance.
+    """
+
+    def __init__(self, capacity: int, interactive_reserved: int):
+        if capacity < 1:
+            raise ValueError("Scheduler capacity must be at least 1")
+        self.capacity = capacity
+        self.interactive_reserved = min(max(interactive_reserved, 0), capacity - 1) if capacity > 1 else 0
+        self._lock = threading.Lock()
+        # priority -> user -> FIFO of waiters; dict order is the round-robin order
+        self._waiting: Dict[str, "OrderedDict[str, Deque[_Waiter]]"] = {p: OrderedDict() for p in PRIORITIES}
+        self._running: Dict[str, int] = {p: 0 for p in PRIORITIES}
+        self._wait_time: Dict[str, Histogram] = {p: Histogram(WAIT_BUCKETS) for p in PRIORITIES}
+
+    @asynccontextmanager
+    async def slot(self, priority: str = REFRESH, user_id: Optional[int] = None):
+        """Hold one scrape slot for the duration of the block"""
+        await self.acquire(priority, user_id)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    async def run_in_thread(self, priority: str, user_id: Optional[int], func: Callable[..., T], *args) -> T:
+        """
+        Run a blocking scrape in a worker thread under one slot. A thread can't
+        be cancelled, so a cancelled caller returns at once but the slot is only
+        released when the thread finishes: slots always match running browsers.
+        """
+        await self.acquire(priority, user_id)
+        thread = asyncio.ensure_future(asyncio.to_thread(func, *args))
+
+        def release_when_done(future: asyncio.Future) -> None:
+            if not future.cancelled():
+                future.exception()  # consumed here in case the caller is gone
+            self.release(priority)
+
+        thread.add_done_callback(release_when_done)
+        return await asyncio.shield(thread)
+
+    async def acquire(self, priority: str, user_id: Optional[int] = None) -> None:
+        if priority not in self._running:
+            raise ValueError(f"Unknown scrape priority: {priority}")
+        waiter = _Waiter()
+        with self._lock:
+            self._waiting[priority].setdefault(str(user_id), deque()).append(waiter)
+            self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                if not self._forget(priority, user_id, waiter):
+                    # The slot was granted just as we were cancelled - hand it back
+                    self._running[priority] -= 1
+                    self._dispatch()
+            raise
+
+    def release(self, priority: str) -> None:
+        with self._lock:
+            self._running[priority] -= 1
+            self._dispatch()
+
+    def _has_room(self, priority: str) -> bool:
+        running = sum(self._running.values())
+        if running >= self.capacity:
+            return False
+        if priority == INTERACTIVE:
+            return True
+        return running - self._running[INTERACTIVE] < self.capacity - self.interactive_reserved
+
+    def _dispatch(self) -> None:
+        """Grant free slots in priority order; caller holds the lock"""
+        for priority in PRIORITIES:
+            queues = self._waiting[priority]
+            while queues and self._has_room(priority):
+                user, waiters = next(iter(queues.items()))
+                waiter = waiters.popleft()
+                # Move this user to the back so users in the class take turns
+                del queues[user]
+                if waiters:
+                    queues[user] = waiters
+                self._running[priority] += 1
+                self._wait_time[priority].observe(time.perf_counter() - waiter.enqueued_at)
+                waiter.loop.call_soon_threadsafe(_grant, waiter.future)
+            if queues:
+                # Lower classes never overtake a class that is still waiting
+                return
+
+    def _forget(self, priority: str, user_id: Optional[int], waiter: _Waiter) -> bool:
+        waiters = self._waiting[priority].get(str(user_id))
+        if waiters is None or waiter not in waiters:
+            return False
+        waiters.remove(waiter)
+        if not waiters:
+            del self._waiting[priority][str(user_id)]
+        return True
+
+    def queue_depth(self, priority: str) -> int:
+        with self._lock:
+            return sum(len(waiters) for waiters in self._waiting[priority].values())
+
+    def collect_metrics(self) -> Iterable[str]:
+        # Slots are per process: each worker reports its own series
+        worker = process_labels()
+        lines: List[str] = ["# HELP scrape_scheduler_waiting Scrapes waiting for a slot by priority class",
+                            "# TYPE scrape_scheduler_waiting gauge"]
+        with self._lock:
+            for priority in PRIORITIES:
+                depth = sum(len(waiters) for waiters in self._waiting[priority].values())
+                lines.append(render_gauge("scrape_scheduler_waiting", depth, priority=priority, **worker))
+            lines.append("# HELP scrape_scheduler_running Scrapes holding a slot by priority class")
+            lines.append("# TYPE scrape_scheduler_running gauge")
+            for priority in PRIORITIES:
+                lines.append(render_gauge("scrape_scheduler_running", self._running[priority],
+                                          priority=priority, **worker))
+            lines.append("# HELP scrape_scheduler_wait_seconds Time spent waiting for a scrape slot")
+            lines.append("# TYPE scrape_scheduler_wait_seconds histogram")
+            for priority in PRIORITIES:
+                lines.extend(render_histogram("scrape_scheduler_wait_seconds", self._wait_time[priority],
+                                              priority=priority, **worker))
+        return lines
+
+def _grant(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+_scheduler: Optional[ScrapeScheduler] = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler() -> ScrapeScheduler:
+    """Process-wide scheduler, created on first use"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = ScrapeScheduler(settings.SCRAPE_CONCURRENCY, settings.SCRAPE_INTERACTIVE_RESERVED)
+    return _scheduler
+
+registry.add_collector(lambda: get_scheduler().collect_metrics())
@@ -0,0 +1,133 @@
+"""
+Full-text search over video descriptions and creator bios.
+
+Queries go to the indexes in app.db.fulltext: FTS5 with bm25() ranking on
+SQLite, tsvector @@ tsquery with ts_rank_cd() on PostgreSQL. All words of
+the query must match (stemmed, so "outfits" finds "outfit"); higher scores
+rank first on both backends.
+"""
+from typing import Dict, List, Optional
+import re
+from sqlalchemy import func, literal_column, select, table, column
+from sqlalchemy.orm import Session
+from app.db.fulltext import PROFILES_FTS, VIDEOS_FTS
+from app.models.tiktok_profile import TikTokProfile
+from app.models.tiktok_video import TikTokVideo
+from app.models.user import User
+
+MAX_RESULTS = 50
+
+# Matched words are wrapped in these in result snippets
+HIGHLIGHT_START = "["
+HIGHLIGHT_END = "]"
+_SNIPPET_WORDS = 16
+
+# bm25() weights for username, display name and bio, like the A/B weights on PostgreSQL
+_PROFILE_COLUMN_WEIGHTS = (10.0, 10.0, 1.0)
+
+_WORDS = re.compile(r"\w+")
+
+def fts5_query(query: str) -> Optional[str]:
+    """Quote each word so FTS5 syntax in user input ("OR", "-", ":", "*") is taken literally"""
+    words = _WORDS.findall(query.lower())
+    if not words:
+        return None
+    return " ".join(f'"{word}"' for word in words)
+
+class SearchService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.dialect = db.get_bind().dialect.name
+
+    def search_videos(self, query: str, profile_id: Optional[int] = None, niche: Optional[str] = None,
+                      limit: int = 20) -> List[Dict]:
+        """Videos whose description matches, best match first; optionally one profile's or one niche's"""
+        if self.dialect == "sqlite":
+            fts_query = fts5_query(query)
+            if fts_query is None:
+                return []
+            fts = table(VIDEOS_FTS, column("rowid"))
+            fts_ref = literal_column(VIDEOS_FTS)
+            score = -func.bm25(fts_ref)
+            snippet = func.snippet(fts_ref, 0, HIGHLIGHT_START, HIGHLIGHT_END, "…", _SNIPPET_WORDS)
+            stmt = (
+                select(TikTokVideo, score.label("score"), snippet.label("snippet"))
+                .join(fts, fts.c.rowid == TikTokVideo.id)
+                .where(fts_ref.op("MATCH")(fts_query))
+            )
+        else:
+            vector = literal_column(f"{TikTokVideo.__tablename__}.search_vector")
+            ts_query = func.plainto_tsquery("english", query)
+            score = func.ts_rank_cd(vector, ts_query)
+            snippet = func.ts_headline(
+                "english", func.coalesce(TikTokVideo.description, ""), ts_query,
+                f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, MaxWords={_SNIPPET_WORDS}"
+            )
+            stmt = (
+                select(TikTokVideo, score.label("score"), snippet.label("snippet"))
+                .where(vector.op("@@")(ts_query))
+            )
+
+        if profile_id is not None:
+            stmt = stmt.where(TikTokVideo.profile_id == profile_id)
+        if niche is not None:
+            niche_profiles = select(TikTokProfile.id).join(User, User.id == TikTokProfile.user_id).where(User.niche == niche)
+            stmt = stmt.where(TikTokVideo.profile_id.in_(niche_profiles))
+        stmt = stmt.order_by(literal_column("score").desc(), TikTokVideo.id).limit(min(limit, MAX_RESULTS))
+
+        return [
+            {
+                "video_id": video.video_id,
+                "video_url": video.video_url,
+                "description": video.description,
+                "snippet": snippet_text,
+                "view_count": video.view_count,
+                "posted_at": video.posted_at,
+                "score": float(score_value)
+            }
+            for video, score_value, snippet_text in self.db.execute(stmt)
+        ]
+
+    def search_profiles(self, query: str, niche: Optional[str] = None, limit: int = 20) -> List[Dict]:
+        """Creators whose username, display name or bio matches; names rank above bio text"""
+        if self.dialect == "sqlite":
+            fts_query = fts5_query(query)
+            if fts_query is None:
+                return []
+            fts = table(PROFILES_FTS, column("rowid"))
+            fts_ref = literal_column(PROFILES_FTS)
+            score = -func.bm25(fts_ref, *_PROFILE_COLUMN_WEIGHTS)
+            snippet = func.snippet(fts_ref, 2, HIGHLIGHT_START, HIGHLIGHT_END, "…", _SNIPPET_WORDS)
+            stmt = (
+                select(TikTokProfile, score.label("score"), snippet.label("snippet"))
+                .join(fts, fts.c.rowid == TikTokProfile.id)
+                .where(fts_ref.op("MATCH")(fts_query))
+            )
+        else:
+            vector = literal_column(f"{TikTokProfile.__tablename__}.search_vector")
+            ts_query = func.plainto_tsquery("english", query)
+            score = func.ts_rank_cd(vector, ts_query)
+            snippet = func.ts_headline(
+                "english", func.coalesce(TikTokProfile.bio, ""), ts_query,
+                f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, MaxWords={_SNIPPET_WORDS}"
+            )
+            stmt = (
+                select(TikTokProfile, score.label("score"), snippet.label("snippet"))
+                .where(vector.op("@@")(ts_query))
+            )
+
+        if niche is not None:
+            stmt = stmt.join(User, User.id == TikTokProfile.user_id).where(User.niche == niche)
+        stmt = stmt.order_by(literal_column("score").desc(), TikTokProfile.id).limit(min(limit, MAX_RESULTS))
+
+        return [
+            {
+                "tiktok_username": profile.tiktok_username,
+                "display_name": profile.display_name,
+                "bio": profile.bio,
+                "snippet": snippet_text,
+                "follower_count": profile.follower_count,
+                "score": float(score_value)
+            }
+            for profile, score_value, snippet_text in self.db.execute(stmt)
+        ]
@@ -1,41 +1,147 @@
-import httpx
-import json
 from typing import Dict, List, Optional
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from calendar import timegm
+from datetime import datetime, timedelta
 import time
 import re
+from app.core.cache import get_cache
+from app.core.config import settings
+from app.core.metrics import timed_service
+from app.services.scrape_scheduler import REFRESH, get_scheduler
+
+# selenium and httpx are imported on first use so that importing this module (and
+# every router that depends on it) stays cheap for workers that never scrape.
+
+# W3C locator strategies, identical to selenium's CSS_SELECTOR / TAG_NAME
+CSS_SELECTOR = "css selector"
+TAG_NAME = "tag name"
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+_RELATIVE_TIME = re.compile(r"^(\d+)\s*([smhdw])\b")
+_TIME_UNITS = {"s": timedelta(seconds=1), "m": timedelta(minutes=1), "h": timedelta(hours=1),
+               "d": timedelta(days=1), "w": timedelta(weeks=1)}
+_DATE = re.compile(r"^(?:(\d{4})-)?(\d{1,2})-(\d{1,2})$")
+
+# Seconds Chrome may spend loading a page, and waiting for its content to render
+PAGE_LOAD_TIMEOUT = 30
+ELEMENT_WAIT_TIMEOUT = 10
+
+# TikTok video ids keep the upload time (Unix seconds) in their upper 32 bits;
+# ids decoding to before TikTok's launch or into the future don't follow that scheme
+FIRST_VIDEO_TIMESTAMP = 1472688000  # 2016-09-01
+
+def parse_comment_time(text: str, now: datetime) -> Optional[datetime]:
+    """
+    Earliest time a comment stamped '3h ago', '2d ago', '3-15' or '2023-3-15' can
+    have been posted, so comments older than a watermark are never counted twice
+    """
+    text = (text or "").strip().lower()
+    match = _RELATIVE_TIME.match(text)
+    if match:
+        return now - (int(match.group(1)) + 1) * _TIME_UNITS[match.group(2)]
+    match = _DATE.match(text)
+    if match:
+        try:
+            return datetime(int(match.group(1) or now.year), int(match.group(2)), int(match.group(3)))
+        except ValueError:
+            return None
+    return None
+
+def video_posted_at(video_id: str, now: Optional[datetime] = None) -> Optional[datetime]:
+    """Upload time (UTC) encoded in a TikTok video id, None if the id doesn't carry one"""
+    if not video_id or not video_id.isdigit():
+        return None
+    seconds = int(video_id) >> 32
+    latest = timegm((now or datetime.utcnow()).utctimetuple()) + 86400
+    if not FIRST_VIDEO_TIMESTAMP <= seconds <= latest:
+        return None
+    return datetime.utcfromtimestamp(seconds)
 
 class TikTokScraper:
-    def __init__(self):
-        self.session = httpx.AsyncClient()
-        self.chrome_options = Options()
-        self.chrome_options.add_argument("--headless")
-        self.chrome_options.add_argument("--no-sandbox")
-        self.chrome_options.add_argument("--disable-dev-shm-usage")
-        self.chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
-
-    async def get_profile_data(self, username: str) -> Optional[Dict]:
-        """Scrape TikTok profile data from public profile"""
+    def __init__(self, priority: str = REFRESH, user_id: Optional[int] = None):
+        # Scheduler class and owner for scrapes that miss the cache
+        self.priority = priority
+        self.user_id = user_id
+        # time.monotonic() by which scrapes give up: page loads and waits are cut
+        # short and the browser quit, since a cancelled scrape's thread runs on
+        self.deadline: Optional[float] = None
+        self._session = None
+        self._chrome_options = None
+
+    @property
+    def session(self):
+        """HTTP client, created on first use"""
+        if self._session is None:
+            import httpx
+            self._session = httpx.AsyncClient()
+        return self._session
+
+    @property
+    def chrome_options(self):
+        """Headless Chrome options, built on first use"""
+        if self._chrome_options is None:
+            from selenium.webdriver.chrome.options import Options
+            self._chrome_options = Options()
+            self._chrome_options.add_argument("--headless")
+            self._chrome_options.add_argument("--no-sandbox")
+            self._chrome_options.add_argument("--disable-dev-shm-usage")
+            self._chrome_options.add_argument(f"--user-agent={USER_AGENT}")
+        return self._chrome_options
+
+    def _time_left(self, seconds: float) -> float:
+        """seconds, or what remains until the deadline if that is sooner; TimeoutError once it passed"""
+        if self.deadline is None:
+            return seconds
+        left = self.deadline - time.monotonic()
+        if left <= 0:
+            raise TimeoutError("Scrape deadline passed")
+        return min(seconds, left)
+
+    def _open_page(self, url: str, wait_for_selector: str):
+        """Start a headless Chrome session, load the page and wait for the selector"""
+        from selenium import webdriver
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+
+        self._time_left(0)
+        driver = webdriver.Chrome(options=self.chrome_options)
         try:
-            # Remove @ if present
-            username = username.lstrip('@')
-            url = f"https://www.tiktok.com/@{username}"
-            
-            # Use Selenium for dynamic content
-            driver = webdriver.Chrome(options=self.chrome_options)
+            driver.set_page_load_timeout(self._time_left(PAGE_LOAD_TIMEOUT))
             driver.get(url)
-            
-            # Wait for profile data to load
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "[data-e2e='user-page']"))
+            WebDriverWait(driver, self._time_left(ELEMENT_WAIT_TIMEOUT)).until(
+                EC.presence_of_element_located((CSS_SELECTOR, wait_for_selector))
             )
+        except Exception:
+            driver.quit()
+            raise
+        return driver
+
+    @timed_service("tiktok_scraper")
+    async def get_profile_data(self, username: str, use_cache: bool = True) -> Optional[Dict]:
+        """Scrape TikTok profile data from public profile (shared across workers for SCRAPE_CACHE_TTL)"""
+        # Remove @ if present
+        username = username.lstrip('@')
+        cache_key = f"scrape:profile:{username}"
+        if use_cache:
+            cached = get_cache().get(cache_key)
+            if cached is not None:
+                return cached
+        
+        # Selenium blocks; run it off the event loop so concurrent scrapes overlap
+        profile_data = await get_scheduler().run_in_thread(self.priority, self.user_id, self._scrape_profile, username)
+        if profile_data is not None:
+            get_cache().set(cache_key, profile_data, settings.SCRAPE_CACHE_TTL)
+        return profile_data
+
+    def _scrape_profile(self, username: str) -> Optional[Dict]:
+        """Blocking Selenium scrape of a profile page (runs in a thread)"""
+        try:
+            url = f"https://www.tiktok.com/@{username}"
+            
+            # Use Selenium for dynamic content and wait for profile data to load
+            driver = self._open_page(url, "[data-e2e='user-page']")
             
-            time.sleep(3)  # Additional wait for dynamic content
+            time.sleep(self._time_left(3))  # Additional wait for dynamic content
             
             # Extract profile information
             profile_data = {
@@ -61,35 +167,35 @@ class TikTokScraper:
 
     def _extract_display_name(self, driver) -> Optional[str]:
         try:
-            element = driver.find_element(By.CSS_SELECTOR, "[data-e2e='user-title']")
+            element = driver.find_element(CSS_SELECTOR, "[data-e2e='user-title']")
             return element.text.strip()
         except:
             return None
 
     def _extract_bio(self, driver) -> Optional[str]:
         try:
-            element = driver.find_element(By.CSS_SELECTOR, "[data-e2e='user-bio']")
+            element = driver.find_element(CSS_SELECTOR, "[data-e2e='user-bio']")
             return element.text.strip()
         except:
             return None
 
     def _extract_follower_count(self, driver) -> Optional[int]:
         try:
-            element = driver.find_element(By.CSS_SELECTOR, "[data-e2e='followers-count']")
+            element = driver.find_element(CSS_SELECTOR, "[data-e2e='followers-count']")
             return self._parse_count(element.text)
         except:
             return None
 
     def _extract_following_count(self, driver) -> Optional[int]:
         try:
-            element = driver.find_element(By.CSS_SELECTOR, "[data-e2e='following-count']")
+            element = driver.find_element(CSS_SELECTOR, "[data-e2e='following-count']")
             return self._parse_count(element.text)
         except:
             return None
 
     def _extract_likes_count(self, driver) -> Optional[int]:
         try:
-            element = driver.find_element(By.CSS_SELECTOR, "[data-e2e='likes-count']")
+            element = driver.find_element(CSS_SELECTOR, "[data-e2e='likes-count']")
             return self._parse_count(element.text)
         except:
             return None
@@ -97,21 +203,21 @@ class TikTokScraper:
     def _extract_video_count(self, driver) -> Optional[int]:
         try:
             # Video count is often inferred from the number of videos on the profile
-            video_elements = driver.find_elements(By.CSS_SELECTOR, "[data-e2e='user-post-item']")
+            video_elements = driver.find_elements(CSS_SELECTOR, "[data-e2e='user-post-item']")
             return len(video_elements)
         except:
             return None
 
     def _extract_avatar_url(self, driver) -> Optional[str]:
         try:
-            element = driver.find_element(By.CSS_SELECTOR, "[data-e2e='user-avatar'] img")
+            element = driver.find_element(CSS_SELECTOR, "[data-e2e='user-avatar'] img")
             return element.get_attribute("src")
         except:
             return None
 
     def _check_verification(self, driver) -> bool:
         try:
-            driver.find_element(By.CSS_SELECTOR, "[data-e2e='user-verified']")
+            driver.find_element(CSS_SELECTOR, "[data-e2e='user-verified']")
             return True
         except:
             return False
@@ -144,30 +250,39 @@ class TikTokScraper:
         except ValueError:
             return None
 
-    async def get_recent_videos(self, username: str, limit: int = 10) -> List[Dict]:
-        """Scrape recent videos from a TikTok profile"""
+    @timed_service("tiktok_scraper")
+    async def get_recent_videos(self, username: str, limit: int = 10, use_cache: bool = True) -> List[Dict]:
+        """Scrape recent videos from a TikTok profile (shared across workers for SCRAPE_CACHE_TTL)"""
+        username = username.lstrip('@')
+        cache_key = f"scrape:videos:{username}:{limit}"
+        if use_cache:
+            cached = get_cache().get(cache_key)
+            if cached is not None:
+                return cached
+        
+        videos = await get_scheduler().run_in_thread(self.priority, self.user_id, self._scrape_videos, username, limit)
+        if videos:
+            get_cache().set(cache_key, videos, settings.SCRAPE_CACHE_TTL)
+        return videos
+
+    def _scrape_videos(self, username: str, limit: int) -> List[Dict]:
+        """Blocking Selenium scrape of a profile's video grid (runs in a thread)"""
         try:
-            username = username.lstrip('@')
             url = f"https://www.tiktok.com/@{username}"
             
-            driver = webdriver.Chrome(options=self.chrome_options)
-            driver.get(url)
-            
             # Wait for videos to load
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "[data-e2e='user-post-item']"))
-            )
+            driver = self._open_page(url, "[data-e2e='user-post-item']")
             
-            time.sleep(3)
+            time.sleep(self._time_left(3))
             
             # Extract video data
-            video_elements = driver.find_elements(By.CSS_SELECTOR, "[data-e2e='user-post-item']")[:limit]
+            video_elements = driver.find_elements(CSS_SELECTOR, "[data-e2e='user-post-item']")[:limit]
             videos = []
             
             for element in video_elements:
                 try:
                     video_data = {
-                        "video_url": element.find_element(By.TAG_NAME, "a").get_attribute("href"),
+                        "video_url": element.find_element(TAG_NAME, "a").get_attribute("href"),
                         "view_count": self._extract_video_views(element),
                         "like_count": self._extract_video_likes(element),
                         "comment_count": self._extract_video_comments(element),
@@ -190,7 +305,7 @@ class TikTokScraper:
 
     def _extract_video_views(self, element) -> Optional[int]:
         try:
-            view_element = element.find_element(By.CSS_SELECTOR, "[data-e2e='video-views']")
+            view_element = element.find_element(CSS_SELECTOR, "[data-e2e='video-views']")
             return self._parse_count(view_element.text)
         except:
             return None
@@ -206,7 +321,7 @@ class TikTokScraper:
             ]
             for selector in selectors:
                 try:
-                    like_element = element.find_element(By.CSS_SELECTOR, selector)
+                    like_element = element.find_element(CSS_SELECTOR, selector)
                     return self._parse_count(like_element.text)
                 except:
                     continue
@@ -224,7 +339,7 @@ class TikTokScraper:
             ]
             for selector in selectors:
                 try:
-                    comment_element = element.find_element(By.CSS_SELECTOR, selector)
+                    comment_element = element.find_element(CSS_SELECTOR, selector)
                     return self._parse_count(comment_element.text)
                 except:
                     continue
@@ -242,7 +357,7 @@ class TikTokScraper:
             ]
             for selector in selectors:
                 try:
-                    share_element = element.find_element(By.CSS_SELECTOR, selector)
+                    share_element = element.find_element(CSS_SELECTOR, selector)
                     return self._parse_count(share_element.text)
                 except:
                     continue
@@ -252,11 +367,45 @@ class TikTokScraper:
 
     def _extract_video_description(self, element) -> Optional[str]:
         try:
-            desc_element = element.find_element(By.CSS_SELECTOR, "[data-e2e='video-desc']")
+            desc_element = element.find_element(CSS_SELECTOR, "[data-e2e='video-desc']")
             return desc_element.text.strip()
         except:
             return None
 
+    @timed_service("tiktok_scraper")
+    async def get_video_comments(self, video_url: str, limit: int = 50) -> List[Dict]:
+        """Scrape the commenters of a video: [{"username", "commented_at"}] (never cached)"""
+        return await get_scheduler().run_in_thread(self.priority, self.user_id, self._scrape_comments, video_url, limit)
+
+    def _scrape_comments(self, video_url: str, limit: int) -> List[Dict]:
+        """Blocking Selenium scrape of a video's top-level comments (runs in a thread)"""
+        try:
+            driver = self._open_page(video_url, "[data-e2e='comment-level-1']")
+            time.sleep(self._time_left(2))
+
+            now = datetime.utcnow()
+            comments = []
+            usernames = driver.find_elements(CSS_SELECTOR, "[data-e2e='comment-username-1']")[:limit]
+            times = driver.find_elements(CSS_SELECTOR, "[data-e2e='comment-time-1']")[:limit]
+            for username_element, time_element in zip(usernames, times):
+                username = username_element.text.strip()
+                if username:
+                    comments.append({
+                        "username": username,
+                        "commented_at": parse_comment_time(time_element.text, now)
+                    })
+
+            driver.quit()
+            return comments
+
+        except Exception as e:
+            print(f"Error scraping comments for {video_url}: {str(e)}")
+            if 'driver' in locals():
+                driver.quit()
+            return []
+
     async def close(self):
         """Close the HTTP session"""
-        await self.session.aclose()
+        if self._session is not None:
+            await self._session.aclose()
+            self._session = None
@@ -0,0 +1,109 @@
+"""
+Celery application for background scrape jobs.
+
+Scrape jobs are routed to one queue per scheduler priority class. Run a
+general worker that drains the queues in priority order, plus at least one
+worker reserved for interactive (onboarding) jobs so they never wait behind
+batch work:
+    celery -A app.worker worker -Q interactive,analytics,refresh,scheduled,niche --loglevel=info
+    celery -A app.worker worker -Q interactive --concurrency=1 --loglevel=info
+
+Analytics recomputes triggered by "profile data changed" events use their own
+"analytics" queue (see app.services.analytics_events). Niche best-practices
+refreshes scrape many creators and run on the "niche" queue.
+
+Job state lives in the scrape_jobs table rather than a result backend, so the
+API can report progress without talking to the broker. Recomputed analytics,
+data versions and the recompute debounce markers go through the cache, so
+workers refuse to start unless CACHE_BACKEND=redis (the API usually runs in
+another container and would never see a per-container cache).
+"""
+import os
+from celery import Celery
+from celery.signals import worker_init
+from kombu import Queue
+from app.core.config import settings
+from app.services.scrape_scheduler import NICHE, PRIORITIES, REFRESH
+
+ANALYTICS_QUEUE = "analytics"
+
+def broker_url() -> str:
+    return settings.CELERY_BROKER_URL or settings.REDIS_URL
+
+def check_shared_cache(url: str) -> None:
+    """Raise unless the cache reaches the API processes the broker connects us to"""
+    # The local stand-in brokers only connect processes of one machine (tests, benchmarks)
+    if settings.CACHE_BACKEND != "redis" and not url.startswith(("memory://", "filesystem://")):
+        raise RuntimeError(
+            f"CACHE_BACKEND={settings.CACHE_BACKEND} is not shared with the API container; "
+            "set CACHE_BACKEND=redis for the API and all workers"
+        )
+
+def _broker_transport_options(url: str) -> dict:
+    if url.startswith(("redis://", "rediss://")):
+        # Poll queues in the order given to -Q instead of round-robin
+        return {"queue_order_strategy": "priority"}
+    if not url.startswith("filesystem://"):
+        return {}
+    # Local stand-in broker: messages are files shared by the API and worker processes
+    queue_dir = os.path.join(settings.CELERY_FILESYSTEM_DIR, "queue")
+    processed_dir = os.path.join(settings.CELERY_FILESYSTEM_DIR, "processed")
+    control_dir = os.path.join(settings.CELERY_FILESYSTEM_DIR, "control")
+    for directory in (queue_dir, processed_dir, control_dir):
+        os.makedirs(directory, exist_ok=True)
+    return {
+        "data_folder_in": queue_dir,
+        "data_folder_out": queue_dir,
+        "processed_folder": processed_dir,
+        "store_processed": False,
+        "control_folder": control_dir,
+    }
+
+celery_app = Celery("tiktok_compass", broker=broker_url())
+celery_app.conf.update(
+    broker_transport_options=_broker_transport_options(broker_url()),
+    task_serializer="json",
+    accept_content=["json"],
+    task_ignore_result=True,
+    task_default_queue=REFRESH,
+    # Workers started without -Q consume every class
+    task_queues=[Queue(priority) for priority in PRIORITIES] + [Queue(ANALYTICS_QUEUE)],
+    task_routes={
+        "analytics.recompute_profile": {"queue": ANALYTICS_QUEUE},
+        "niche_insights.refresh": {"queue": NICHE},
+    },
+    # Acknowledge after the task finishes so a crashed worker's job is redelivered
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    worker_prefetch_multiplier=1,
+)
+
+@worker_init.connect
+def _require_shared_cache(**kwargs):
+    try:
+        check_shared_cache(broker_url())
+    except RuntimeError as e:
+        # Celery only logs ordinary exceptions raised by signal handlers
+        raise SystemExit(str(e))
+
+@celery_app.task(name="scrape_jobs.run", bind=True, max_retries=settings.SCRAPE_JOB_MAX_RETRIES)
+def run_scrape_job(self, job_id: int):
+    """Execute a queued ScrapeJob, retrying with backoff on failure"""
+    from app.services.scrape_jobs import execute_scrape_job
+    final_attempt = self.request.retries >= self.max_retries
+    try:
+        return execute_scrape_job(job_id, final_attempt=final_attempt)
+    except Exception as e:
+        raise self.retry(exc=e, countdown=10 * 2 ** self.request.retries)
+
+@celery_app.task(name="analytics.recompute_profile")
+def recompute_profile_analytics(profile_id: int):
+    """Refresh a profile's analytics snapshot after its data changed"""
+    from app.services.analytics_events import handle_profile_data_changed
+    handle_profile_data_changed(profile_id)
+
+@celery_app.task(name="niche_insights.refresh")
+def refresh_niche_insights(niche: str):
+    """Recompute a niche's best-practices insight from its reference creators"""
+    from app.services.niche_insights import compute_niche_insights
+    compute_niche_insights(niche)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+
+"""
+Creator similarity benchmark for TikTok Creator Compass
+Builds a SimilarityIndex over synthetic creator vectors (clustered around a
+few niche centres, like real profiles) and times top-k queries. With
+--ann and faiss installed it also times the approximate HNSW index and
+reports its recall against exact search.
+
+Usage:
+    python -m benchmarks.creator_similarity --profiles 1000000 --queries 200 --k 10 [--ann]
+"""
+
+import argparse
+import json
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.creator_similarity import DIMENSIONS, SimilarityIndex
+
+CLUSTERS = 12
+NOISE = 0.35
+
+def synthetic_vectors(rng: np.random.Generator, count: int) -> np.ndarray:
+    centres = np.abs(rng.normal(size=(CLUSTERS, DIMENSIONS))).astype(np.float32)
+    vectors = centres[rng.integers(0, CLUSTERS, size=count)]
+    vectors += NOISE * np.abs(rng.normal(size=(count, DIMENSIONS))).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+def _time_queries(index: SimilarityIndex, queries: np.ndarray, k: int):
+    latencies, results = [], []
+    for position, query in enumerate(queries):
+        start = time.perf_counter()
+        results.append(index.search(query, k, exclude=[position]))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies), results
+
+def _summary(latencies: np.ndarray) -> dict:
+    return {
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+        "max_ms": round(float(latencies.max()), 3),
+    }
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark top-k similar creator queries")
+    parser.add_argument("--profiles", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--ann", action="store_true", help="Also time the faiss HNSW index")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    vectors = synthetic_vectors(rng, args.profiles)
+    profile_ids = np.arange(args.profiles, dtype=np.int64)
+    queries = vectors[:args.queries]
+
+    # Force exact search for the baseline regardless of size
+    settings.SIMILARITY_ANN_MIN_PROFILES = args.profiles + 1
+    exact = SimilarityIndex(profile_ids, vectors)
+    exact_latencies, exact_results = _time_queries(exact, queries, args.k)
+
+    report = {
+        "profiles": args.profiles,
+        "dimensions": DIMENSIONS,
+        "matrix_mb": round(vectors.nbytes / 2**20, 1),
+        "k": args.k,
+        "exact": _summary(exact_latencies),
+    }
+
+    if args.ann:
+        settings.SIMILARITY_ANN_MIN_PROFILES = 0
+        start = time.perf_counter()
+        approximate = SimilarityIndex(profile_ids, vectors)
+        build_seconds = time.perf_counter() - start
+        if approximate._ann is None:
+            report["ann"] = "faiss not installed"
+        else:
+            ann_latencies, ann_results = _time_queries(approximate, queries, args.k)
+            recall = np.mean([
+                len({pid for pid, _ in a} & {pid for pid, _ in e}) / max(len(e), 1)
+                for a, e in zip(ann_results, exact_results)
+            ])
+            report["ann"] = {**_summary(ann_latencies), "build_seconds": round(build_seconds, 2),
+                             "recall": round(float(recall), 4)}
+
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
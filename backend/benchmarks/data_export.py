@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+
+"""
+Data export benchmark for TikTok Creator Compass
+Seeds one creator with --videos videos, then exports them in every format
+with app.services.data_export (chunked, server-side cursor) and, as the
+baseline, with pandas.read_sql + to_parquet (everything in memory). Each
+export runs in its own process, and its peak RSS is read from wait4().
+
+Usage:
+    python -m benchmarks.data_export --videos 1000000 --database-url sqlite:///./export-bench.db
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEED_BATCH = 20000
+USERNAME = "export_bench"
+MODES = ("csv", "parquet", "arrow", "pandas_parquet")
+
+def seed(videos: int) -> None:
+    from sqlalchemy import insert
+    import app.db.base  # noqa - registers every model
+    from app.db.base_class import Base
+    from app.db.session import SessionLocal, engine
+    from app.models.tiktok_profile import TikTokProfile
+    from app.models.tiktok_video import TikTokVideo
+    from app.models.user import User
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        user = User(email="export@example.com", name="Export", tiktok_username=USERNAME, niche="fashion")
+        db.add(user)
+        db.flush()
+        profile = TikTokProfile(user_id=user.id, tiktok_username=USERNAME)
+        db.add(profile)
+        db.flush()
+        now = datetime.utcnow()
+        for start in range(0, videos, SEED_BATCH):
+            db.execute(insert(TikTokVideo), [
+                {"profile_id": profile.id, "video_id": f"export-{i}",
+                 "video_url": f"https://www.tiktok.com/@{USERNAME}/video/{i}",
+                 "description": f"Outfit idea {i} #ootd #fashion", "duration": 15 + i % 45,
+                 "view_count": i * 7 % 100000, "like_count": i * 3 % 9000, "comment_count": i % 300,
+                 "share_count": i % 50, "engagement_rate": (i % 120) / 10, "posted_at": now - timedelta(minutes=i),
+                 "last_scraped_at": now}
+                for i in range(start, min(start + SEED_BATCH, videos))
+            ])
+        db.commit()
+    finally:
+        db.close()
+
+def run_one(mode: str, output: str) -> None:
+    """Export in this process (called in a child by measure())"""
+    import app.db.base  # noqa - registers every model
+    from app.db.session import SessionLocal
+    from app.models.tiktok_profile import TikTokProfile
+    from app.services.data_export import DATASETS, DataExporter
+
+    db = SessionLocal()
+    profile_id = db.query(TikTokProfile.id).filter(TikTokProfile.tiktok_username == USERNAME).scalar()
+    if mode == "pandas_parquet":
+        import pandas as pd
+        from sqlalchemy import select
+        table = DATASETS["videos"].model.__table__
+        stmt = select(*(table.c[name] for name in DATASETS["videos"].columns)).where(table.c.profile_id == profile_id)
+        pd.read_sql(stmt, db.connection()).to_parquet(output)
+    else:
+        with open(output, "wb") as file:
+            for chunk in DataExporter(db).export("videos", mode, profile_id):
+                file.write(chunk)
+    db.close()
+
+def measure(mode: str, output: str, database_url: str) -> Dict:
+    start = time.perf_counter()
+    child = subprocess.Popen([sys.executable, "-m", "benchmarks.data_export", "--database-url", database_url,
+                              "--run-one", mode, "--output", output], cwd=BACKEND_DIR)
+    _, exit_status, usage = os.wait4(child.pid, 0)
+    child.returncode = os.waitstatus_to_exitcode(exit_status)
+    if child.returncode:
+        raise RuntimeError(f"{mode} export failed")
+    return {
+        "mode": mode,
+        "seconds": round(time.perf_counter() - start, 2),
+        "peak_rss_mb": round(usage.ru_maxrss / 1024, 1),
+        "file_mb": round(os.path.getsize(output) / 2**20, 1),
+    }
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark chunked data exports against an in-memory export")
+    parser.add_argument("--database-url", default="sqlite:///./export-bench.db")
+    parser.add_argument("--videos", type=int, default=1_000_000)
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse an already seeded database")
+    parser.add_argument("--output-dir", default="/tmp")
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--run-one", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    os.environ["DATABASE_URL"] = args.database_url
+
+    if args.run_one:
+        run_one(args.run_one, args.output)
+        return
+
+    if not args.skip_seed:
+        seed(args.videos)
+    results = []
+    for mode in args.modes.split(","):
+        output = os.path.join(args.output_dir, f"export-bench-{mode}")
+        results.append(measure(mode, output, args.database_url))
+        os.remove(output)
+    print(json.dumps({"videos": args.videos, "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+"""
+Bulk import benchmark for TikTok Creator Compass
+Writes --videos synthetic video rows as CSV, JSON Lines and a JSON array
+(with a share of duplicate and invalid rows), then imports each file into a
+fresh creator with app.services.data_import and, as the baseline, with one
+ORM object and flush per row. Reports rows per second for every run.
+
+Usage:
+    python -m benchmarks.data_import --videos 200000 --database-url sqlite:///./import-bench.db
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+FIELDS = ("id", "url", "desc", "views", "likes", "comments", "shares", "duration", "create_time")
+
+def write_rows(path: str, fmt: str, videos: int, prefix: str) -> None:
+    now = datetime(2024, 1, 1)
+    rows = (
+        {"id": f"{prefix}-{i % (videos - videos // 50)}",  # ~2% duplicates
+         "url": f"https://www.tiktok.com/@import_bench/video/{i}",
+         "desc": f"Outfit idea {i} #ootd #fashion", "views": f"{i * 7 % 100000:,}",
+         "likes": "1.2K" if i % 10 == 0 else i * 3 % 9000, "comments": i % 300,
+         "shares": -1 if i % 500 == 0 else i % 50,  # invalid rows
+         "duration": 15 + i % 45, "create_time": int((now - timedelta(minutes=i)).timestamp())}
+        for i in range(videos)
+    )
+    with open(path, "w", newline="") as file:
+        if fmt == "csv":
+            writer = csv.DictWriter(file, FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+        elif fmt == "jsonl":
+            file.writelines(json.dumps(row) + "\n" for row in rows)
+        else:
+            file.write("[")
+            for i, row in enumerate(rows):
+                file.write(("," if i else "") + json.dumps(row))
+            file.write("]")
+
+def _profile(db, username: str):
+    from app.models.tiktok_profile import TikTokProfile
+    from app.models.user import User
+    user = User(email=f"{username}@example.com", name=username, tiktok_username=username, niche="fashion")
+    db.add(user)
+    db.flush()
+    profile = TikTokProfile(user_id=user.id, tiktok_username=username)
+    db.add(profile)
+    db.commit()
+    return profile
+
+def run_bulk(db, fmt: str, path: str) -> Dict:
+    from app.services.data_import import BulkImporter
+    profile = _profile(db, f"bulk_{fmt}")
+    with open(path, newline="") as stream:
+        report = BulkImporter(db).run(profile, "videos", stream, fmt)
+    return {"mode": f"bulk_{fmt}", "rows": report.rows_read, "imported": report.imported,
+            "duplicates": report.duplicates, "errors": report.error_count,
+            "seconds": report.seconds, "rows_per_second": report.rows_per_second}
+
+def run_orm(db, path: str) -> Dict:
+    """Baseline: one existence check, ORM object and flush per row"""
+    from app.models.tiktok_video import TikTokVideo
+    from app.services.data_import import RowError, parse_count, parse_datetime
+    profile = _profile(db, "orm_csv")
+    rows = imported = 0
+    start = time.perf_counter()
+    with open(path, newline="") as stream:
+        for record in csv.DictReader(stream):
+            rows += 1
+            try:
+                counts = {name: parse_count(record[key]) for name, key in
+                          (("view_count", "views"), ("like_count", "likes"), ("comment_count", "comments"),
+                           ("share_count", "shares"), ("duration", "duration"))}
+                posted_at = parse_datetime(record["create_time"])
+            except RowError:
+                continue
+            video_id = f"orm-{record['id']}"
+            if db.query(TikTokVideo.id).filter(TikTokVideo.video_id == video_id).first():
+                continue
+            db.add(TikTokVideo(profile_id=profile.id, video_id=video_id, video_url=record["url"],
+                               description=record["desc"], posted_at=posted_at, **counts))
+            db.flush()
+            imported += 1
+    db.commit()
+    seconds = time.perf_counter() - start
+    return {"mode": "orm_per_row_csv", "rows": rows, "imported": imported,
+            "seconds": round(seconds, 3), "rows_per_second": round(rows / seconds, 1)}
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark bulk imports against per-row ORM inserts")
+    parser.add_argument("--database-url", default="sqlite:///./import-bench.db")
+    parser.add_argument("--videos", type=int, default=200000)
+    parser.add_argument("--formats", default="csv,jsonl,json")
+    parser.add_argument("--skip-orm", action="store_true", help="Skip the per-row ORM baseline")
+    parser.add_argument("--output-dir", default="/tmp")
+    args = parser.parse_args(argv)
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("CELERY_BROKER_URL", "memory://")
+
+    import app.db.base  # noqa - registers every model
+    from app.db.base_class import Base
+    from app.db.session import SessionLocal, engine
+    Base.metadata.create_all(bind=engine)
+
+    results = []
+    db = SessionLocal()
+    try:
+        for fmt in args.formats.split(","):
+            path = os.path.join(args.output_dir, f"import-bench.{fmt}")
+            write_rows(path, fmt, args.videos, prefix=fmt)
+            results.append(run_bulk(db, fmt, path))
+            if fmt == "csv" and not args.skip_orm:
+                results.append(run_orm(db, path))
+            os.remove(path)
+    finally:
+        db.close()
+    print(json.dumps({"videos": args.videos, "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
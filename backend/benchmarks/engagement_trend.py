@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+
+"""
+Engagement trend benchmark for TikTok Creator Compass
+Generates --profiles profiles with --videos videos each (random posting
+times and engagement rates, a third of them with a rising trend) and
+computes rolling mean, EWMA and slope for all of them with one
+app.services.engagement_trend.engagement_trends call, and as the baseline
+with a pandas sort/rolling/ewm/polyfit pass per profile. Checks that both
+agree and reports the time of each.
+
+Usage:
+    python -m benchmarks.engagement_trend --profiles 5000 --videos 60
+"""
+
+import argparse
+import json
+import time
+from typing import List, Optional
+
+import numpy as np
+
+def generate(profiles: int, videos: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    groups = np.repeat(np.arange(profiles), videos)
+    times = rng.uniform(1.6e9, 1.7e9, groups.size)
+    rates = rng.gamma(2.0, 2.5, groups.size) + (groups % 3 == 0) * (times - 1.6e9) / 2e7
+    return groups, times, rates
+
+def pandas_trends(groups, times, rates, window: int, span: int):
+    """Baseline: one DataFrame pass per profile"""
+    import pandas as pd
+    frame = pd.DataFrame({"group": groups, "time": times, "rate": rates})
+    results = {}
+    for group, rows in frame.groupby("group", sort=False):
+        rows = rows.sort_values("time", kind="stable")
+        weeks = (rows["time"] - rows["time"].iloc[0]) / (7 * 86400)
+        results[group] = {
+            "rolling_mean": rows["rate"].rolling(window, min_periods=1).mean().iloc[-1],
+            "ewma": rows["rate"].ewm(span=span, adjust=False).mean().iloc[-1],
+            "slope_per_week": np.polyfit(weeks, rows["rate"], 1)[0] if len(rows) >= 3 else None,
+        }
+    return results
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the batched engagement trend engine against pandas")
+    parser.add_argument("--profiles", type=int, default=5000)
+    parser.add_argument("--videos", type=int, default=60, help="Videos per profile")
+    parser.add_argument("--window", type=int, default=5)
+    parser.add_argument("--span", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    from app.services.engagement_trend import engagement_trends
+
+    groups, times, rates = generate(args.profiles, args.videos)
+
+    start = time.perf_counter()
+    batched = engagement_trends(groups, times, rates, args.window, args.span)
+    batched_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    baseline = pandas_trends(groups, times, rates, args.window, args.span)
+    baseline_seconds = time.perf_counter() - start
+
+    max_difference = max(
+        abs(batched[group][name] - baseline[group][name])
+        for group in baseline
+        for name in ("rolling_mean", "ewma", "slope_per_week")
+        if baseline[group][name] is not None
+    )
+    trends = [result["trend"] for result in batched.values()]
+    print(json.dumps({
+        "profiles": args.profiles,
+        "videos_per_profile": args.videos,
+        "batched_seconds": round(batched_seconds, 3),
+        "pandas_per_profile_seconds": round(baseline_seconds, 3),
+        "speedup": round(baseline_seconds / batched_seconds, 1),
+        "max_abs_difference": max_difference,
+        "trends": {name: trends.count(name) for name in ("increasing", "stable", "decreasing")},
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+"""
+Keyword matching benchmark for TikTok Creator Compass
+Times content-theme detection over synthetic video descriptions with:
+  - the previous nested loops (`any(keyword in text ...)` per theme)
+  - the compiled KeywordMatcher used by BestPracticesAnalyzer
+and reports how many descriptions the two disagree on (substring false
+positives such as "day" in "today"). --extra-terms pads the theme table with
+random terms to show how each approach scales with the taxonomy size.
+
+Usage:
+    python -m benchmarks.keyword_matching --descriptions 1000000 --niche fashion --extra-terms 200
+"""
+
+import argparse
+import json
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.core.keyword_matcher import KeywordMatcher
+from app.core.niches import DEFAULT_THEMES, NICHES
+from benchmarks.synthetic_data import NICHES as SYNTHETIC_NICHES, _description
+
+# Distinct descriptions rendered up front and cycled through
+POOL_SIZE = 20000
+TERMS_PER_EXTRA_THEME = 5
+
+def naive_themes(text: str, table: Dict[str, Tuple[str, ...]]) -> Set[str]:
+    text = text.lower()
+    return {theme for theme, keywords in table.items() if any(keyword in text for keyword in keywords)}
+
+def _timed(descriptions: Iterable[str], match) -> Tuple[float, List[Set[str]]]:
+    start = time.perf_counter()
+    results = [match(text) for text in descriptions]
+    return time.perf_counter() - start, results
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark theme detection over video descriptions")
+    parser.add_argument("--descriptions", type=int, default=1_000_000)
+    parser.add_argument("--niche", default="fashion", choices=sorted(NICHES))
+    parser.add_argument("--extra-terms", type=int, default=0, help="Random terms added to the theme table")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    pool = [_description(rng, SYNTHETIC_NICHES[i % len(SYNTHETIC_NICHES)]) for i in range(POOL_SIZE)]
+    descriptions = [pool[i % POOL_SIZE] for i in range(args.descriptions)]
+
+    niche = NICHES[args.niche]
+    table = {**DEFAULT_THEMES, **niche.themes}
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+    for i in range(0, args.extra_terms, TERMS_PER_EXTRA_THEME):
+        count = min(TERMS_PER_EXTRA_THEME, args.extra_terms - i)
+        table[f"extra_{i // TERMS_PER_EXTRA_THEME}"] = tuple(
+            "".join(rng.choice(letters, size=int(rng.integers(4, 10)))) for _ in range(count)
+        )
+    start = time.perf_counter()
+    matcher = KeywordMatcher(table)
+    compile_seconds = time.perf_counter() - start
+
+    naive_seconds, naive = _timed(descriptions, lambda text: naive_themes(text, table))
+    compiled_seconds, compiled = _timed(descriptions, matcher.matches)
+    disagreements = sum(1 for a, b in zip(naive, compiled) if a != b)
+
+    print(json.dumps({
+        "descriptions": args.descriptions,
+        "themes": len(table),
+        "terms": sum(len(terms) for terms in table.values()),
+        "compile_seconds": round(compile_seconds, 4),
+        "naive_seconds": round(naive_seconds, 3),
+        "compiled_seconds": round(compiled_seconds, 3),
+        "naive_per_second": round(args.descriptions / naive_seconds),
+        "compiled_per_second": round(args.descriptions / compiled_seconds),
+        "speedup": round(naive_seconds / compiled_seconds, 2),
+        "disagreements": disagreements,
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+
+"""
+End-to-end load benchmark for TikTok Creator Compass
+Runs the FastAPI app in-process (or against --url) with a fake TikTokScraper,
+drives every dashboard endpoint with concurrent authenticated clients and
+reports p50/p95/p99 latency and throughput per endpoint. Results are written
+as JSON tagged with the current git commit so runs can be compared.
+
+Usage:
+    python -m benchmarks.synthetic_data --users 1000 --videos 50000 --database-url sqlite:///./bench.db
+    python -m benchmarks.load_test --database-url sqlite:///./bench.db --requests 500 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+SCENARIOS = [
+    ("users_me", "GET", "/api/v1/users/me", None),
+    ("tiktok_profile", "GET", "/api/v1/tiktok/profile", None),
+    ("tiktok_videos", "GET", "/api/v1/tiktok/videos?limit=20", None),
+    ("analytics_overview", "GET", "/api/v1/analytics/overview", None),
+    ("video_performance", "GET", "/api/v1/analytics/videos/performance?limit=20", None),
+    ("analytics_insights", "GET", "/api/v1/analytics/insights", None),
+    ("recommended_creators", "GET", "/api/v1/recommendations/creators", None),
+    ("recommendation_insights", "GET", "/api/v1/recommendations/insights", None),
+    ("engaged_leads", "GET", "/api/v1/engaged-leads/analyze?limit=20", None),
+    ("refresh_profile", "POST", "/api/v1/tiktok/refresh-profile", None),
+]
+
+class FakeTikTokScraper:
+    """Drop-in TikTokScraper replacement that returns synthetic data without a browser"""
+
+    latency = 0.0
+
+    def __init__(self, priority: str = "refresh", user_id: Optional[int] = None):
+        self.priority = priority
+        self.user_id = user_id
+        self._rng = np.random.default_rng()
+
+    async def _simulate_fetch(self):
+        # Goes through the scrape scheduler like a real cache miss would
+        from app.services.scrape_scheduler import get_scheduler
+        async with get_scheduler().slot(self.priority, self.user_id):
+            await asyncio.sleep(self.latency)
+
+    async def get_profile_data(self, username: str, use_cache: bool = True) -> Optional[Dict]:
+        if self.latency:
+            await self._simulate_fetch()
+        followers = int(self._rng.lognormal(8.5, 2.0))
+        return {
+            "username": username.lstrip('@'),
+            "display_name": username.lstrip('@').title(),
+            "bio": "Fashion creator | outfit ideas | DM for collabs ✨",
+            "follower_count": followers,
+            "following_count": int(self._rng.integers(10, 3000)),
+            "likes_count": followers * 12,
+            "video_count": int(self._rng.integers(5, 500)),
+            "avatar_url": None,
+            "is_verified": followers > 1_000_000,
+        }
+
+    async def get_recent_videos(self, username: str, limit: int = 10, use_cache: bool = True) -> List[Dict]:
+        if self.latency:
+            await self._simulate_fetch()
+        videos = []
+        now = int(time.time())
+        for _ in range(limit):
+            views = int(self._rng.lognormal(9, 1.5))
+            # Like real ids: upload time (within the last 90 days) in the upper 32 bits
+            posted = now - int(self._rng.integers(0, 90 * 86400))
+            video_id = posted << 32 | int(self._rng.integers(0, 2**32))
+            videos.append({
+                "video_url": f"https://www.tiktok.com/@{username}/video/{video_id}",
+                "view_count": views,
+                "like_count": int(views * 0.08),
+                "comment_count": int(views * 0.002),
+                "share_count": int(views * 0.003),
+                "description": "outfit of the day #ootd #fashion",
+            })
+        return videos
+
+    async def close(self):
+        pass
+
+def install_fake_scraper(latency: float = 0.0) -> None:
+    """Replace TikTokScraper in every loaded module that imported it (call after importing the app)"""
+    from app.services import tiktok_scraper
+
+    FakeTikTokScraper.latency = latency
+    real = tiktok_scraper.TikTokScraper
+    for module in list(sys.modules.values()):
+        if module is not None and getattr(module, "TikTokScraper", None) is real:
+            module.TikTokScraper = FakeTikTokScraper
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+def _sample_user_ids(count: int) -> List[int]:
+    from sqlalchemy import select
+    from app.db.base import TikTokProfile
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return list(db.execute(
+            select(TikTokProfile.user_id).order_by(TikTokProfile.id).limit(count)
+        ).scalars())
+    finally:
+        db.close()
+
+def _summarize(latencies: List[float], errors: int, wall_time: float) -> Dict:
+    if not latencies:
+        return {"requests": 0, "errors": errors}
+    ms = np.asarray(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / wall_time, 2) if wall_time else None,
+        "p50_ms": round(float(np.percentile(ms, 50)), 2),
+        "p95_ms": round(float(np.percentile(ms, 95)), 2),
+        "p99_ms": round(float(np.percentile(ms, 99)), 2),
+        "mean_ms": round(float(ms.mean()), 2),
+        "max_ms": round(float(ms.max()), 2),
+    }
+
+async def _run_scenario(client, method: str, path: str, body, tokens: List[str],
+                        total: int, concurrency: int) -> Dict:
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            headers = {"Authorization": f"Bearer {tokens[i % len(tokens)]}"}
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, headers=headers, json=body)
+                # A 4xx (e.g. a 404 for a missing profile) is as much a failed request as a 5xx
+                if not response.is_success:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return _summarize(latencies, errors, time.perf_counter() - started)
+
+async def run_load_test(requests: int, concurrency: int, users: int,
+                        url: Optional[str] = None, only: Optional[List[str]] = None) -> Dict:
+    import httpx
+    from app.core.security import create_access_token
+
+    user_ids = _sample_user_ids(users)
+    if not user_ids:
+        raise SystemExit("No TikTok profiles in the database - run benchmarks.synthetic_data first")
+    tokens = [create_access_token(data={"sub": str(user_id)}) for user_id in user_ids]
+
+    if url:
+        client = httpx.AsyncClient(base_url=url, timeout=60)
+    else:
+        from app.main import app
+        install_fake_scraper(FakeTikTokScraper.latency)
+        client = httpx.AsyncClient(app=app, base_url="http://loadtest", timeout=60)
+
+    results = {}
+    async with client:
+        for name, method, path, body in SCENARIOS:
+            if only and name not in only:
+                continue
+            results[name] = await _run_scenario(client, method, path, body, tokens, requests, concurrency)
+            print(f"{name:26} {json.dumps(results[name])}")
+    return results
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run the end-to-end API load benchmark")
+    parser.add_argument("--database-url", default="sqlite:///./bench.db")
+    parser.add_argument("--url", help="Benchmark a running server instead of the in-process app")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--users", type=int, default=100, help="Distinct users to spread requests over")
+    parser.add_argument("--scraper-latency", type=float, default=0.0, help="Simulated scrape latency in seconds")
+    parser.add_argument("--only", nargs="*", help="Run only these scenario names")
+    parser.add_argument("--cache-backend", default="memory", choices=["memory", "shm", "redis"])
+    parser.add_argument("--output", default="benchmarks/results", help="Directory for the JSON report")
+    args = parser.parse_args(argv)
+
+    # The app reads DATABASE_URL at import time, so set it before importing anything
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["CACHE_BACKEND"] = args.cache_backend
+    # In-process runs queue scrape jobs and recomputes into memory instead of needing Redis
+    os.environ.setdefault("CELERY_BROKER_URL", "memory://")
+    # Lets a run be inspected with X-Debug-Timing, as in development
+    os.environ.setdefault("DEBUG_TIMING_HEADER_ENABLED", "true")
+    FakeTikTokScraper.latency = args.scraper_latency
+
+    results = asyncio.run(run_load_test(args.requests, args.concurrency, args.users, args.url, args.only))
+
+    commit = _git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.utcnow().isoformat(),
+        "config": {
+            "database": args.database_url.split("@")[-1],
+            "requests_per_endpoint": args.requests,
+            "concurrency": args.concurrency,
+            "users": args.users,
+            "scraper_latency": args.scraper_latency,
+            "cache_backend": args.cache_backend,
+            "target": args.url or "in-process",
+        },
+        "endpoints": results,
+    }
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"load-{commit or 'unknown'}-{int(time.time())}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+"""
+Worker scaling benchmark for serve.py
+Starts the production server with 1..N worker processes against the same
+database, drives one endpoint with several load-generating processes and
+reports requests/second per worker count, so throughput scaling across cores
+can be compared between commits.
+
+Usage:
+    python -m benchmarks.synthetic_data --users 1000 --videos 50000 --database-url sqlite:///./bench.db
+    python -m benchmarks.serve_scaling --database-url sqlite:///./bench.db --max-workers 4
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _wait_for_health(port: int, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("serve.py exited during startup")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("server did not become healthy")
+
+def _client_process(url: str, path: str, tokens: List[str], duration: float,
+                    concurrency: int, results) -> None:
+    import httpx
+
+    async def run() -> List[float]:
+        latencies: List[float] = []
+        deadline = time.perf_counter() + duration
+        async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+            async def worker(offset: int):
+                i = offset
+                while time.perf_counter() < deadline:
+                    start = time.perf_counter()
+                    response = await client.get(path, headers={"Authorization": f"Bearer {tokens[i % len(tokens)]}"})
+                    if response.status_code < 500:
+                        latencies.append(time.perf_counter() - start)
+                    i += concurrency
+            await asyncio.gather(*(worker(k) for k in range(concurrency)))
+        return latencies
+
+    results.put(asyncio.run(run()))
+
+def measure(workers: int, args, tokens: List[str]) -> Dict:
+    port = _free_port()
+    env = dict(os.environ, PORT=str(port), WEB_CONCURRENCY=str(workers),
+               DATABASE_URL=args.database_url, CACHE_BACKEND=args.cache_backend, MAX_REQUESTS="0",
+               DEBUG_TIMING_HEADER_ENABLED="true")
+    server = subprocess.Popen([sys.executable, "serve.py"], cwd=BACKEND_DIR, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        _wait_for_health(port, server)
+        results = multiprocessing.Queue()
+        clients = [
+            multiprocessing.Process(target=_client_process, args=(
+                f"http://127.0.0.1:{port}", args.path, tokens, args.duration, args.concurrency, results))
+            for _ in range(args.client_processes)
+        ]
+        for client in clients:
+            client.start()
+        latencies = [latency for _ in clients for latency in results.get()]
+        for client in clients:
+            client.join()
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    latencies.sort()
+    count = len(latencies)
+    return {
+        "workers": workers,
+        "requests": count,
+        "throughput_rps": round(count / args.duration, 1),
+        "p50_ms": round(latencies[count // 2] * 1000, 2) if count else None,
+        "p99_ms": round(latencies[min(count - 1, int(count * 0.99))] * 1000, 2) if count else None,
+    }
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Measure throughput scaling of serve.py across worker counts")
+    parser.add_argument("--database-url", default="sqlite:///./bench.db")
+    parser.add_argument("--max-workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--path", default="/api/v1/analytics/videos/performance?limit=20")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per worker count")
+    parser.add_argument("--concurrency", type=int, default=16, help="Connections per client process")
+    parser.add_argument("--client-processes", type=int, default=max(1, multiprocessing.cpu_count() // 2))
+    parser.add_argument("--cache-backend", default="shm", choices=["memory", "shm", "redis"])
+    parser.add_argument("--output", help="Optional path for a JSON report")
+    args = parser.parse_args(argv)
+
+    os.environ["DATABASE_URL"] = args.database_url
+    from benchmarks.load_test import _sample_user_ids, _git_commit
+    from app.core.security import create_access_token
+    tokens = [create_access_token(data={"sub": str(user_id)}) for user_id in _sample_user_ids(100)]
+    if not tokens:
+        raise SystemExit("No TikTok profiles in the database - run benchmarks.synthetic_data first")
+
+    runs = []
+    for workers in range(1, args.max_workers + 1):
+        result = measure(workers, args, tokens)
+        if runs:
+            result["speedup"] = round(result["throughput_rps"] / runs[0]["throughput_rps"], 2)
+        runs.append(result)
+        print(json.dumps(result))
+
+    report = {"commit": _git_commit(), "cpu_count": multiprocessing.cpu_count(), "path": args.path, "runs": runs}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
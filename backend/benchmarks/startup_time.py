@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+
+"""
+Cold start benchmark for TikTok Creator Compass
+Measures, in fresh interpreters:
+  - how long `import app.main` takes
+  - time from spawning uvicorn to the first successful /health response
+and checks that heavy scraping/analytics dependencies are not imported at
+startup. Exits non-zero when a measurement regresses past its threshold.
+
+Usage:
+    python -m benchmarks.startup_time --max-import-seconds 2.0 --max-first-health-seconds 4.0
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Dict, List, Optional
+
+# Modules that must only be loaded when a request actually needs them
+LAZY_MODULES = ["selenium", "bs4", "httpx", "pandas", "numpy", "celery"]
+
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (LAZY_MODULES,)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite:///./startup-bench.db")
+    return env
+
+def measure_import(runs: int) -> Dict:
+    timings: List[float] = []
+    loaded: List[str] = []
+    for _ in range(runs):
+        output = subprocess.check_output(
+            [sys.executable, "-c", IMPORT_PROBE], cwd=BACKEND_DIR, env=_env(), text=True
+        )
+        result = json.loads(output.strip().splitlines()[-1])
+        timings.append(result["seconds"])
+        loaded = result["loaded"]
+    return {"median_seconds": round(statistics.median(timings), 3), "runs": timings, "eagerly_loaded": loaded}
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def measure_first_health(runs: int, timeout: float = 30.0) -> Dict:
+    timings: List[float] = []
+    for _ in range(runs):
+        port = _free_port()
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+             "--port", str(port), "--log-level", "warning"],
+            cwd=BACKEND_DIR, env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            while True:
+                if time.perf_counter() - start > timeout:
+                    raise RuntimeError(f"/health did not respond within {timeout}s")
+                if process.poll() is not None:
+                    raise RuntimeError("uvicorn exited before serving /health")
+                try:
+                    with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                        if response.status == 200:
+                            timings.append(time.perf_counter() - start)
+                            break
+                except OSError:
+                    time.sleep(0.01)
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+    return {"median_seconds": round(statistics.median(timings), 3), "runs": timings}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure cold start time of the API")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-seconds", type=float, default=2.0)
+    parser.add_argument("--max-first-health-seconds", type=float, default=4.0)
+    parser.add_argument("--output", help="Optional path for a JSON report")
+    args = parser.parse_args(argv)
+
+    report = {
+        "import": measure_import(args.runs),
+        "first_health": measure_first_health(args.runs),
+        "thresholds": {
+            "import_seconds": args.max_import_seconds,
+            "first_health_seconds": args.max_first_health_seconds,
+        },
+    }
+    print(json.dumps(report, indent=2))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    failures = []
+    if report["import"]["median_seconds"] > args.max_import_seconds:
+        failures.append(f"import took {report['import']['median_seconds']}s (max {args.max_import_seconds}s)")
+    if report["first_health"]["median_seconds"] > args.max_first_health_seconds:
+        failures.append(
+            f"first /health took {report['first_health']['median_seconds']}s (max {args.max_first_health_seconds}s)"
+        )
+    if report["import"]["eagerly_loaded"]:
+        failures.append(f"heavy modules imported at startup: {', '.join(report['import']['eagerly_loaded'])}")
+
+    for failure in failures:
+        print(f"REGRESSION: {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+
+"""
+NDJSON streaming benchmark for TikTok Creator Compass
+Seeds one creator with --videos videos and --followers interacting followers,
+then for each limit starts a fresh uvicorn process and requests the video
+list and engaged leads as a JSON body and as NDJSON (Accept:
+application/x-ndjson). Reports time to first byte, total time and the
+server's peak RSS (VmHWM, Linux) per mode, so the growth with `limit` can
+be compared.
+
+Usage:
+    python -m benchmarks.streaming --videos 200000 --followers 200000 --limits 100,10000,200000
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+NDJSON = "application/x-ndjson"
+SEED_BATCH = 10000
+
+def seed(database_url: str, videos: int, followers: int) -> int:
+    """Create the creator and return the user id"""
+    os.environ["DATABASE_URL"] = database_url
+    from sqlalchemy import insert
+    import app.db.base  # noqa - registers every model
+    from app.db.base_class import Base
+    from app.db.session import SessionLocal, engine
+    from app.models.tiktok_profile import TikTokProfile
+    from app.models.tiktok_video import TikTokVideo
+    from app.models.user import User
+    from app.services.follower_interactions import COMMENT, FollowerInteractionStore
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        user = User(email="stream@example.com", name="Stream", tiktok_username="stream_bench", niche="fashion")
+        db.add(user)
+        db.flush()
+        profile = TikTokProfile(user_id=user.id, tiktok_username="stream_bench")
+        db.add(profile)
+        db.flush()
+
+        now = datetime.utcnow()
+        for start in range(0, videos, SEED_BATCH):
+            db.execute(insert(TikTokVideo), [
+                {"profile_id": profile.id, "video_id": f"stream-{i}", "video_url": f"https://www.tiktok.com/@stream_bench/video/{i}",
+                 "description": f"Outfit idea {i} #ootd #fashion", "view_count": i * 7 % 100000,
+                 "like_count": i * 3 % 9000, "posted_at": now - timedelta(minutes=i)}
+                for i in range(start, min(start + SEED_BATCH, videos))
+            ])
+        store = FollowerInteractionStore(db)
+        for start in range(0, followers, SEED_BATCH):
+            store.record(profile.id, [
+                {"username": f"fan_{i}", "kind": COMMENT, "at": now - timedelta(hours=i % 2000),
+                 "follower_count": i * 37 % 80000, "engagement_rate": i % 15}
+                for i in range(start, min(start + SEED_BATCH, followers))
+            ])
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _peak_rss_mb(pid: int) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+def measure(database_url: str, token: str, path: str, accept: str) -> Dict:
+    """One request against a fresh server, so its peak RSS belongs to this request"""
+    port = _free_port()
+    env = dict(os.environ, DATABASE_URL=database_url, CACHE_BACKEND="memory")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = time.time() + 60
+        while True:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1):
+                    break
+            except OSError:
+                if time.time() > deadline or server.poll() is not None:
+                    raise RuntimeError("server did not become healthy")
+                time.sleep(0.1)
+        baseline = _peak_rss_mb(server.pid)
+
+        request = urllib.request.Request(f"http://127.0.0.1:{port}{path}",
+                                         headers={"Authorization": f"Bearer {token}", "Accept": accept})
+        start = time.perf_counter()
+        with urllib.request.urlopen(request, timeout=600) as response:
+            first = response.read(1)
+            ttfb = time.perf_counter() - start
+            size = len(first)
+            while True:
+                chunk = response.read(65536)
+                if not chunk:
+                    break
+                size += len(chunk)
+        total = time.perf_counter() - start
+        peak = _peak_rss_mb(server.pid)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    return {
+        "ttfb_ms": round(ttfb * 1000, 1),
+        "total_ms": round(total * 1000, 1),
+        "bytes": size,
+        "peak_rss_growth_mb": None if peak is None else round(peak - baseline, 1),
+    }
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare JSON and NDJSON list responses across limits")
+    parser.add_argument("--database-url", default="sqlite:///./stream-bench.db")
+    parser.add_argument("--videos", type=int, default=200000)
+    parser.add_argument("--followers", type=int, default=200000)
+    parser.add_argument("--limits", default="100,10000,200000", help="Comma-separated limits")
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse an already seeded database")
+    args = parser.parse_args(argv)
+
+    if args.skip_seed:
+        os.environ["DATABASE_URL"] = args.database_url
+        import app.db.base  # noqa - registers every model
+        from app.db.session import SessionLocal
+        from app.models.user import User
+        db = SessionLocal()
+        user_id = db.query(User.id).filter(User.email == "stream@example.com").scalar()
+        db.close()
+    else:
+        user_id = seed(args.database_url, args.videos, args.followers)
+
+    from app.core.security import create_access_token
+    token = create_access_token(data={"sub": str(user_id)})
+
+    results = []
+    for limit in (int(value) for value in args.limits.split(",")):
+        for name, path in (("videos", f"/api/v1/tiktok/videos?limit={limit}"),
+                           ("engaged_leads", f"/api/v1/engaged-leads/analyze?limit={limit}")):
+            results.append({
+                "endpoint": name,
+                "limit": limit,
+                "json": measure(args.database_url, token, path, "application/json"),
+                "ndjson": measure(args.database_url, token, path, NDJSON),
+            })
+            print(json.dumps(results[-1]), file=sys.stderr)
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
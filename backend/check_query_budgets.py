@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+
+"""
+Query budget check for TikTok Creator Compass
+Seeds a throwaway SQLite database, calls every endpoint listed in
+app.db.query_counter.QUERY_BUDGETS and exits non-zero if any endpoint
+exceeds its budget or repeats a statement N+1 style.
+"""
+
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+_db_dir = tempfile.mkdtemp(prefix="query-budget-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'budget.db')}"
+# Per-process cache so entries left by other databases can't mask queries
+os.environ["CACHE_BACKEND"] = "memory"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+from app.db.base import Base
+from app.db.session import engine, SessionLocal
+from app.db.query_counter import check_query_budgets, QueryBudgetExceeded
+from app.core.security import create_access_token
+from app.models.user import User
+from app.models.tiktok_profile import TikTokProfile
+from app.models.tiktok_video import TikTokVideo
+from app.models.analytics import CreatorRecommendation
+from app.models.niche_insight import NicheInsight
+from app.services.hashtag_index import HashtagIndex
+from app.services.creator_similarity import store_recommendation_tallies
+from app.services.follower_interactions import COMMENT, FollowerInteractionStore
+from app.main import app
+
+def seed_database() -> int:
+    """Create one onboarded user with enough data to exercise every endpoint"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        user = User(email="budget@example.com", name="Budget Check", tiktok_username="budget_check", niche="fashion")
+        db.add(user)
+        db.flush()
+
+        profile = TikTokProfile(
+            user_id=user.id,
+            tiktok_username="budget_check",
+            follower_count=12000,
+            likes_count=340000,
+            video_count=25,
+            last_scraped_at=datetime.utcnow()
+        )
+        db.add(profile)
+        db.flush()
+
+        now = datetime.utcnow()
+        videos = []
+        for i in range(25):
+            videos.append(TikTokVideo(
+                profile_id=profile.id,
+                video_id=f"budget-{i}",
+                video_url=f"https://www.tiktok.com/@budget_check/video/budget-{i}",
+                description=f"Outfit idea #{i} #ootd",
+                view_count=1000 * (i + 1),
+                like_count=80 * (i + 1),
+                comment_count=5 * i,
+                share_count=2 * i,
+                posted_at=now - timedelta(days=i)
+            ))
+        db.add_all(videos)
+        db.flush()
+        HashtagIndex(db).index_videos(videos)
+
+        recommendations = [
+            {
+                "user_id": user.id,
+                "recommended_username": f"creator_{i}",
+                "similarity_score": 0.9 - i * 0.1,
+                "success_factors": ["Consistent posting", "Storytelling"],
+                "content_themes": ["fashion"],
+                "is_active": 1
+            }
+            for i in range(5)
+        ]
+        db.execute(insert(CreatorRecommendation), recommendations)
+        store_recommendation_tallies(db, [user.id], recommendations)
+
+        FollowerInteractionStore(db).record(profile.id, [
+            {"username": f"fan_{i % 12}", "kind": COMMENT, "at": now - timedelta(days=i)}
+            for i in range(40)
+        ])
+
+        # Precomputed niche insight, as a worker would have stored it
+        db.add(NicheInsight(
+            niche="fashion",
+            best_practices=json.dumps({
+                "top_bio_elements": [{"element": "fashion", "frequency": 4}],
+                "most_successful_themes": [{"element": "fashion", "frequency": 9}],
+                "engagement_insights": {"viral_content": 3},
+                "follower_distribution": {"macro_influencer": 5}
+            }),
+            analyzed_creators=5,
+            computed_at=now
+        ))
+
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+def main() -> int:
+    user_id = seed_database()
+    token = create_access_token(data={"sub": str(user_id)})
+    client = TestClient(app)
+
+    try:
+        observed = check_query_budgets(client, engine, headers={"Authorization": f"Bearer {token}"})
+    except QueryBudgetExceeded as e:
+        print(f"Query budget check FAILED:\n{e}")
+        return 1
+
+    for (method, path), count in observed.items():
+        print(f"{method:6} {path:45} {count} queries")
+    print("Query budget check passed")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+"""
+Production server for TikTok Creator Compass
+Runs N uvicorn worker processes under gunicorn with the app preloaded in the
+master (workers fork with routes and config already imported) and recycles
+each worker after MAX_REQUESTS requests with a graceful shutdown.
+
+Workers merge their /metrics series through METRICS_DIR (a fresh temp
+directory by default), so any worker's /metrics covers all of them.
+
+Configuration comes from app.core.config.settings:
+    PORT, WEB_CONCURRENCY, MAX_REQUESTS, MAX_REQUESTS_JITTER,
+    GRACEFUL_TIMEOUT, WORKER_TIMEOUT, METRICS_DIR
+"""
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+from app.core.config import settings
+
+def worker_count() -> int:
+    return settings.WEB_CONCURRENCY or multiprocessing.cpu_count()
+
+def prepare_metrics_dir() -> None:
+    """Start every server run with an empty shared metrics directory"""
+    directory = settings.METRICS_DIR or os.path.join(tempfile.gettempdir(), "tiktok-compass-metrics")
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+    # Preloaded (gunicorn) workers read the settings, spawned (uvicorn) ones the environment
+    settings.METRICS_DIR = os.environ["METRICS_DIR"] = directory
+
+def post_fork(server, worker):
+    """Drop DB connections inherited from the preloading master"""
+    from app.db.session import engine
+    engine.dispose(close=False)
+
+def run_gunicorn() -> None:
+    from gunicorn.app.base import BaseApplication
+
+    class CompassApplication(BaseApplication):
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app.main import app
+            return app
+
+    CompassApplication({
+        "bind": f"0.0.0.0:{settings.PORT}",
+        "workers": worker_count(),
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": True,
+        "max_requests": settings.MAX_REQUESTS,
+        "max_requests_jitter": settings.MAX_REQUESTS_JITTER,
+        "graceful_timeout": settings.GRACEFUL_TIMEOUT,
+        "timeout": settings.WORKER_TIMEOUT,
+        "post_fork": post_fork,
+        "accesslog": "-",
+    }).run()
+
+def run_uvicorn() -> None:
+    """Fallback for platforms without gunicorn (e.g. Windows development)"""
+    import uvicorn
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=settings.PORT,
+        workers=worker_count(),
+        limit_max_requests=settings.MAX_REQUESTS or None,
+        timeout_graceful_shutdown=settings.GRACEFUL_TIMEOUT,
+    )
+
+if __name__ == "__main__":
+    prepare_metrics_dir()
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        run_uvicorn()
+    else:
+        run_gunicorn()
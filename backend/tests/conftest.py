@@ -0,0 +1,72 @@
+"""
+Test setup. Settings are read when the app is imported, so the environment
+is configured first: a throwaway SQLite database, the per-process cache and
+the filesystem Celery broker (messages are files, so the API and a worker
+can exchange them the way they do through Redis in production).
+"""
+import os
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix="tiktok-compass-tests-")
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{os.path.join(_tmp, 'test.db')}",
+    CACHE_BACKEND="memory",
+    CELERY_BROKER_URL="filesystem://",
+    CELERY_FILESYSTEM_DIR=os.path.join(_tmp, "broker"),
+)
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.security import create_access_token
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+from app.main import app
+from app.models.user import User
+
+
+@pytest.fixture(scope="session", autouse=True)
+def fake_scraper():
+    """No test opens a browser: scrapes return synthetic profiles and videos"""
+    from benchmarks.load_test import FakeTikTokScraper, install_fake_scraper
+    import app.services.scrape_jobs  # noqa: F401 - loaded so its scraper is replaced too
+    install_fake_scraper(0.0)
+    return FakeTikTokScraper
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def broker():
+    """The Celery app with an empty queue, so no test runs another test's messages"""
+    from app.worker import celery_app
+    celery_app.control.purge()
+    yield celery_app
+    celery_app.control.purge()
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def user(db):
+    user = User(email="creator@example.com", name="Creator")
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def auth_headers(user):
+    return {"Authorization": f"Bearer {create_access_token(data={'sub': str(user.id)})}"}
@@ -0,0 +1,14 @@
+"""Cache backends: an unreachable Redis degrades to cache misses instead of failing requests"""
+from app.core.cache import RedisCache
+
+
+def test_unreachable_redis_behaves_like_an_empty_cache():
+    # Nothing listens on port 1, so every command fails to connect
+    cache = RedisCache("redis://localhost:1/0")
+
+    assert cache.get("key") is None
+    cache.set("key", {"value": 1}, 60)
+    cache.delete("key")
+    # The claim can't be stored, so the caller does the work itself
+    assert cache.add("key", "pending", 60) is True
+    assert cache.get_or_set("key", lambda: {"value": 2}, 60) == {"value": 2}
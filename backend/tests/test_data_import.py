@@ -0,0 +1,100 @@
+"""Bulk import: field parsers, header aliases and a round trip through /export"""
+import io
+from datetime import date, datetime
+
+import pytest
+
+from app.models.tiktok_profile import TikTokProfile
+from app.models.tiktok_video import TikTokVideo
+from app.services.data_import import (
+    CSV, DATASETS, JSON, BulkImporter, RowError, parse_count, parse_date, parse_datetime, parse_float
+)
+
+
+@pytest.fixture
+def profile(db, user):
+    profile = TikTokProfile(user_id=user.id, tiktok_username="somecreator")
+    db.add(profile)
+    db.commit()
+    return profile
+
+
+@pytest.mark.parametrize("value, expected", [
+    (1234, 1234), ("1,234", 1234), ("1.2K", 1200), ("3m", 3_000_000), ("", None), (None, None),
+])
+def test_parse_count(value, expected):
+    assert parse_count(value) == expected
+
+
+@pytest.mark.parametrize("value", ["-3", "lots", True])
+def test_parse_count_rejects(value):
+    with pytest.raises(RowError):
+        parse_count(value)
+
+
+def test_parse_datetime_and_date():
+    assert parse_datetime("2024-01-02T10:00:00Z") == datetime(2024, 1, 2, 10)
+    assert parse_datetime("2024-01-02T12:00:00+02:00") == datetime(2024, 1, 2, 10)
+    assert parse_datetime(1700000000) == datetime(2023, 11, 14, 22, 13, 20)
+    assert parse_date("2024-01-02") == date(2024, 1, 2)
+    assert parse_float("4.5%") == 4.5
+    with pytest.raises(RowError):
+        parse_datetime("yesterday")
+
+
+def test_canonical_column_wins_over_alias(db, profile):
+    importer = BulkImporter(db)
+    row = importer._normalize(DATASETS["videos"], profile, {"id": "114", "video_id": "7301", "views": "2K"})
+    assert (row["video_id"], row["view_count"]) == ("7301", 2000)
+    row = importer._normalize(DATASETS["videos"], profile, {"id": "7302", "video_id": ""})
+    assert row["video_id"] == "7302"
+
+
+def test_truncated_json_keeps_rows_before_it(db, profile):
+    stream = io.StringIO('[{"video_id": "1", "views": 5}, {"video_id": "2", "views": ')
+    report = BulkImporter(db).run(profile, "videos", stream, JSON)
+    assert (report.imported, report.error_count) == (1, 1)
+
+
+def test_undated_videos_are_dated_from_their_id_for_the_engagement_trend(client, db, auth_headers, profile):
+    # Upload times (Unix seconds) in the upper 32 bits, a day apart, with rising engagement
+    rows = "\n".join(f"{(1700000000 + i * 86400) << 32},1000,{10 + 5 * i}" for i in range(6))
+    report = BulkImporter(db).run(profile, "videos", io.StringIO(f"id,views,likes\n{rows}\n"), CSV)
+    assert report.imported == 6
+    assert db.query(TikTokVideo).filter(TikTokVideo.posted_at.is_(None)).count() == 0
+
+    trend = client.get("/api/v1/analytics/engagement-trend", headers=auth_headers).json()
+    assert trend["videos"] == 6
+    assert trend["trend"] == "increasing"
+
+
+def test_exported_videos_import_back_unchanged(client, db, auth_headers, profile):
+    db.add_all(
+        TikTokVideo(profile_id=profile.id, video_id=f"73{i:02d}", video_url=f"https://www.tiktok.com/video/73{i:02d}",
+                    description=f"video {i} #ootd", hashtags='["ootd"]', view_count=1000 * i, like_count=10 * i,
+                    posted_at=datetime(2024, 1, i + 1, 18))
+        for i in range(5)
+    )
+    db.commit()
+    stored = lambda: sorted(
+        (video.video_id, video.view_count, video.like_count, video.posted_at.replace(tzinfo=None), video.hashtags)
+        for video in db.query(TikTokVideo).populate_existing()
+    )
+    before = stored()
+
+    exported = client.get("/api/v1/export/videos", headers=auth_headers)
+    assert exported.status_code == 200
+
+    # Importing the file again changes nothing: every row is a duplicate of itself
+    response = client.post("/api/v1/import/videos", files={"file": ("videos.csv", exported.content)},
+                           headers=auth_headers)
+    assert response.status_code == 200
+    assert (response.json()["imported"], response.json()["duplicates"]) == (0, 5)
+
+    # Into an empty profile it restores the same videos
+    db.query(TikTokVideo).delete()
+    db.commit()
+    response = client.post(f"/api/v1/import/videos?format={CSV}", files={"file": ("videos.csv", exported.content)},
+                           headers=auth_headers)
+    assert response.json()["imported"] == 5
+    assert stored() == before
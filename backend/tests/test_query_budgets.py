@@ -0,0 +1,24 @@
+"""Query budgets: every budgeted endpoint stays within QUERY_BUDGETS, as check_query_budgets.py checks"""
+import importlib
+import os
+
+from app.core import cache
+from app.core.security import create_access_token
+from app.db.query_counter import check_query_budgets
+from app.db.session import engine
+
+
+def test_endpoints_stay_within_query_budgets(db, client, monkeypatch):
+    # The script points the environment at its own database when imported; restore ours afterwards
+    for name in ("DATABASE_URL", "CACHE_BACKEND"):
+        monkeypatch.setenv(name, os.environ[name])
+    script = importlib.import_module("check_query_budgets")
+    # A fresh cache, so analytics cached by earlier tests for the same ids can't hide queries
+    monkeypatch.setattr(cache, "_cache", None)
+
+    user_id = script.seed_database()
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(user_id)})}"}
+
+    # Raises QueryBudgetExceeded listing every endpoint over budget, N+1 or not answering 2xx
+    observed = check_query_budgets(client, engine, headers=headers)
+    assert observed
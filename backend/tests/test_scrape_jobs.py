@@ -0,0 +1,145 @@
+"""Scrape jobs: queued by the API, run by a Celery worker, reported by /tiktok/jobs/{id}"""
+import time
+from datetime import datetime
+
+import pytest
+from celery.contrib.testing.worker import start_worker
+
+from app.models.scrape_job import ScrapeJob
+from app.models.tiktok_profile import TikTokProfile
+from app.models.tiktok_video import TikTokVideo
+from app.services.scrape_jobs import ScrapeJobQueue
+from app.services.scrape_scheduler import SCHEDULED
+from app.services.tiktok_scraper import video_posted_at
+from app.worker import run_scrape_job
+
+API = "/api/v1/tiktok"
+
+
+def get_job(client, headers, job_id):
+    response = client.get(f"{API}/jobs/{job_id}", headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def wait_for_job(client, headers, job_id, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = get_job(client, headers, job_id)
+        if job["status"] in (ScrapeJob.SUCCEEDED, ScrapeJob.FAILED):
+            return job
+        time.sleep(0.05)
+    pytest.fail(f"Job {job_id} did not finish: {job}")
+
+
+def start_video_scrape(client, headers):
+    response = client.post(f"{API}/scrape-profile", json={"username": "somecreator"}, headers=headers)
+    assert response.status_code == 200
+    return response.json()["job_id"]
+
+
+def test_worker_runs_queued_job_and_api_reports_progress(client, db, broker, auth_headers, fake_scraper, monkeypatch):
+    job_id = start_video_scrape(client, auth_headers)
+    job = get_job(client, auth_headers, job_id)
+    assert (job["status"], job["progress"], job["attempts"]) == (ScrapeJob.QUEUED, 0, 0)
+
+    # Record what the endpoint reports while the worker is inside the scrape
+    during_scrape = []
+    scrape = fake_scraper.get_recent_videos
+
+    async def observed_scrape(self, *args, **kwargs):
+        during_scrape.append(get_job(client, auth_headers, job_id))
+        return await scrape(self, *args, **kwargs)
+
+    monkeypatch.setattr(fake_scraper, "get_recent_videos", observed_scrape)
+
+    # A real worker consuming the broker's queues, as `celery -A app.worker worker` does
+    with start_worker(broker, pool="solo", perform_ping_check=False):
+        job = wait_for_job(client, auth_headers, job_id)
+
+    assert len(during_scrape) == 1
+    assert during_scrape[0]["status"] == ScrapeJob.RUNNING
+    assert during_scrape[0]["progress"] == 10
+    assert during_scrape[0]["message"] == "Scraping recent videos"
+    assert (job["status"], job["progress"], job["attempts"]) == (ScrapeJob.SUCCEEDED, 100, 1)
+    assert job["finished_at"] is not None
+    assert db.query(TikTokVideo).filter(TikTokVideo.profile_id == job["profile_id"]).count() == 20
+
+
+def test_scraped_videos_get_their_posting_time_from_the_video_id(client, db, broker, auth_headers):
+    job_id = start_video_scrape(client, auth_headers)
+    assert run_scrape_job.apply(args=[job_id]).get() == ScrapeJob.SUCCEEDED
+
+    # The upper 32 bits of a TikTok video id are its upload time in Unix seconds
+    for video in db.query(TikTokVideo):
+        assert video.posted_at == datetime.utcfromtimestamp(int(video.video_id) >> 32)
+    assert video_posted_at("syn1-42") is None
+    assert video_posted_at("7300000000000000000") == datetime(2023, 11, 11, 0, 48, 18)
+
+    patterns = client.get("/api/v1/analytics/insights/posting-patterns", headers=auth_headers).json()
+    assert patterns["heatmap"]["videos_analyzed"] == 20
+    assert patterns["cadence"]["posts_analyzed"] == 20
+
+
+def test_enqueueing_active_work_again_returns_the_same_job(client, db, broker, auth_headers):
+    start_video_scrape(client, auth_headers)
+    first = client.post(f"{API}/refresh-profile", headers=auth_headers).json()["job_id"]
+    second = client.post(f"{API}/refresh-profile", headers=auth_headers).json()["job_id"]
+    assert first == second
+    assert db.query(ScrapeJob).filter(ScrapeJob.job_type == ScrapeJob.PROFILE_UPDATE).count() == 1
+
+
+def test_redelivered_message_of_finished_job_is_a_no_op(client, db, broker, auth_headers):
+    job_id = start_video_scrape(client, auth_headers)
+
+    # apply() runs the task in this process, like task_always_eager
+    assert run_scrape_job.apply(args=[job_id]).get() == ScrapeJob.SUCCEEDED
+    # Late acknowledgement means a message can arrive again after the job ran
+    assert run_scrape_job.apply(args=[job_id]).get() is None
+
+    job = get_job(client, auth_headers, job_id)
+    assert (job["status"], job["attempts"]) == (ScrapeJob.SUCCEEDED, 1)
+    assert db.query(TikTokVideo).count() == 20
+
+
+def test_job_of_crashed_worker_is_rerun_on_redelivery(client, db, broker, auth_headers):
+    job_id = start_video_scrape(client, auth_headers)
+    # The worker claimed the job and died before finishing it
+    db.query(ScrapeJob).filter(ScrapeJob.id == job_id).update(
+        {ScrapeJob.status: ScrapeJob.RUNNING, ScrapeJob.attempts: 1}
+    )
+    db.commit()
+
+    assert run_scrape_job.apply(args=[job_id]).get() == ScrapeJob.SUCCEEDED
+
+    job = get_job(client, auth_headers, job_id)
+    assert (job["status"], job["progress"], job["attempts"]) == (ScrapeJob.SUCCEEDED, 100, 2)
+    assert db.query(TikTokVideo).count() == 20
+
+
+def test_scheduled_jobs_do_not_defer_the_users_own_refresh(client, db, broker, auth_headers, user):
+    job_id = start_video_scrape(client, auth_headers)
+    assert run_scrape_job.apply(args=[job_id]).get() == ScrapeJob.SUCCEEDED
+    profile = db.query(TikTokProfile).filter(TikTokProfile.user_id == user.id).one()
+
+    # The refresh planner queued background work for this profile
+    queue = ScrapeJobQueue(db)
+    for job_type in (ScrapeJob.VIDEO_SCRAPE, ScrapeJob.INTERACTION_SCRAPE):
+        queue.enqueue(job_type, profile, user.id, priority=SCHEDULED)
+
+    job_id = client.post(f"{API}/refresh-profile", headers=auth_headers).json()["job_id"]
+    assert get_job(client, auth_headers, job_id)["status"] == ScrapeJob.QUEUED
+
+
+def test_worker_requires_cache_shared_with_api(monkeypatch):
+    from app.core.config import settings
+    from app.worker import check_shared_cache
+
+    monkeypatch.setattr(settings, "CACHE_BACKEND", "shm")
+    with pytest.raises(RuntimeError, match="CACHE_BACKEND=redis"):
+        check_shared_cache("redis://redis:6379/0")
+    # The local stand-in brokers never leave the machine
+    check_shared_cache("filesystem://")
+
+    monkeypatch.setattr(settings, "CACHE_BACKEND", "redis")
+    check_shared_cache("redis://redis:6379/0")